@@ -0,0 +1,261 @@
+"""Headless rerun-latency benchmarks for dashboard_ultimate.py.
+
+Each case writes a generated daily/events dataset into a temporary columnar
+store and runs the dashboard through Streamlit's AppTest harness in a fresh
+subprocess (CF_DATA_DIR points at the fixture). The worker measures cold
+start, first render, warm render, per-widget rerun latency and peak RSS, and
+the results are written as a JSON report that can be compared across runs.
+
+    python benchmarks/run_benchmarks.py                                   # default size ladder
+    python benchmarks/run_benchmarks.py --cases 1000:10 100000:1000 --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json after.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, 'dashboard_ultimate.py')
+sys.path.insert(0, ROOT)
+
+# (daily rows, events) pairs, from 1k to 10M daily rows and 10 to 1M events
+DEFAULT_CASES = ['1000:10', '100000:1000', '1000000:100000', '10000000:1000000']
+MAX_DAYS = 3650  # larger daily sizes add stores instead of extending the date range
+FIXTURE_START = date(2016, 1, 1)
+RESULT_MARKER = 'BENCHMARK_RESULT '
+
+PROMOTIONS = ['Without promo', 'No promotion', '4th of July Event 7% OFF', 'Anniversary Sale Kick Off',
+              'Father Day Special 15% OFF', 'Labor Day Sale', 'Summer Clearance 20% OFF',
+              'Back to School Furniture', 'Fall Collection Launch']
+
+
+def parse_case(text):
+    daily_rows, events = text.split(':')
+    return int(daily_rows), int(events)
+
+
+def daily_shape(daily_rows):
+    """(days, stores) giving about `daily_rows` rows"""
+    days = max(1, min(daily_rows, MAX_DAYS))
+    return days, max(1, round(daily_rows / days))
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def write_fixture(root, daily_rows, events, seed=0):
+    """Stream a generated daily/events dataset into a ColumnarStore directory"""
+    import numpy as np
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.ipc
+
+    from cf_analytics.columnar_store import ColumnarStore
+    from cf_analytics.data_generator import DAY_NAMES, iter_daily_chunks
+    from cf_analytics.survey_metrics import METRIC_COLUMNS, METRIC_OFFSETS
+
+    store = ColumnarStore(root)
+    os.makedirs(root, exist_ok=True)
+    days, stores = daily_shape(daily_rows)
+    start = FIXTURE_START
+    end = start + timedelta(days=days - 1)
+
+    # Daily data is written chunk by chunk into one Arrow IPC file, so 10M rows never sit in memory twice
+    rows_written = 0
+    writer = None
+    with pa.OSFile(store.path('daily'), 'wb') as sink:
+        for chunk in iter_daily_chunks(start, end, stores=stores, metrics=METRIC_COLUMNS, seed=seed,
+                                       chunk_days=max(1, 200_000 // stores), metric_offsets=METRIC_OFFSETS):
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pa.ipc.new_file(sink, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows_written += len(chunk)
+        writer.close()
+
+    rng = np.random.default_rng(seed)
+    event_dates = pd.to_datetime(start) + pd.to_timedelta(np.sort(rng.integers(0, days, size=events)), unit='D')
+    failed = rng.integers(0, 9, size=events)
+    failure_percentage = failed / 8 * 100
+    events_df = pd.DataFrame({
+        'date': event_dates,
+        'day_of_week': DAY_NAMES[event_dates.weekday],
+        'failed_metrics': [f'{count}/8' for count in failed],
+        'failure_percentage': failure_percentage,
+        'promotion': np.asarray(PROMOTIONS, dtype=object)[rng.integers(0, len(PROMOTIONS), size=events)],
+        'severity': np.select([failure_percentage >= 75, failure_percentage >= 50, failure_percentage > 37.5],
+                              ['Critical', 'High', 'Medium'], default='Low')
+    })
+    store.save('events', events_df)
+    return {'daily_rows': rows_written, 'days': days, 'stores': stores, 'events': events,
+            'start': start.isoformat(), 'end': end.isoformat()}
+
+
+# ---------------------------------------------------------------------------
+# Worker (runs in a fresh process per case)
+# ---------------------------------------------------------------------------
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_worker(start, end, timeout):
+    """Drive the dashboard through AppTest and print one JSON result line"""
+    worker_started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    start = date.fromisoformat(start)
+    end = date.fromisoformat(end)
+    span = end - start
+    timings = {}
+    errors = {}
+
+    def rerun(name, at, change=None):
+        if change is not None:
+            change(at)
+        started = time.perf_counter()
+        at.run(timeout=timeout)
+        timings[name] = round(time.perf_counter() - started, 4)
+        if at.exception:
+            errors[name] = [exception.message for exception in at.exception]
+
+    at = AppTest.from_file(SCRIPT, default_timeout=timeout)
+    rerun('first_render', at)
+    timings['cold_start'] = round(time.perf_counter() - worker_started, 4)
+
+    # A second session in the same process reuses the st.cache_resource data and shared registry
+    rerun('warm_render', AppTest.from_file(SCRIPT, default_timeout=timeout))
+
+    steps = [
+        ('rerun_no_change', None),
+        ('date_filter', lambda at: (at.date_input(key='start_date_filter').set_value(start + span / 4),
+                                    at.date_input(key='end_date_filter').set_value(end - span / 4))),
+        ('month_filter', lambda at: at.selectbox(key='daily_month_filter').select_index(1)),
+        ('view_monthly', lambda at: at.radio(key='active_view').set_value('monthly')),
+        ('metric_selector', lambda at: at.selectbox(key='metric_selector').set_value('Overall Satisfaction')),
+        ('view_events', lambda at: at.radio(key='active_view').set_value('events')),
+        ('severity_filter', lambda at: at.multiselect(key='severity_filter_enhanced').set_value(['Critical', 'High'])),
+        ('view_risk', lambda at: at.radio(key='active_view').set_value('risk')),
+    ]
+    for name, change in steps:
+        try:
+            rerun(name, at, change)
+        except Exception as exc:  # a missing widget should not abort the remaining steps
+            errors[name] = [f'{type(exc).__name__}: {exc}']
+
+    print(RESULT_MARKER + json.dumps({'timings': timings, 'errors': errors, 'peak_rss_bytes': peak_rss_bytes()}))
+
+
+# ---------------------------------------------------------------------------
+# Orchestration and reporting
+# ---------------------------------------------------------------------------
+
+def environment():
+    versions = {}
+    for module in ('streamlit', 'pandas', 'numpy', 'plotly', 'pyarrow'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'git_commit': commit, 'packages': versions}
+
+
+def run_case(daily_rows, events, timeout):
+    with tempfile.TemporaryDirectory(prefix='cf_bench_') as data_dir:
+        started = time.perf_counter()
+        fixture = write_fixture(data_dir, daily_rows, events)
+        fixture_seconds = round(time.perf_counter() - started, 4)
+
+        env = dict(os.environ, CF_DATA_DIR=data_dir)
+        env.pop('CF_PROFILE', None)
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker', fixture['start'], fixture['end'],
+             '--timeout', str(timeout)],
+            env=env, cwd=ROOT, capture_output=True, text=True
+        )
+
+    case = {'requested': {'daily_rows': daily_rows, 'events': events}, 'fixture': fixture,
+            'fixture_seconds': fixture_seconds}
+    result_lines = [line for line in process.stdout.splitlines() if line.startswith(RESULT_MARKER)]
+    if process.returncode != 0 or not result_lines:
+        case['failed'] = process.stderr.strip().splitlines()[-20:]
+        return case
+    case.update(json.loads(result_lines[-1][len(RESULT_MARKER):]))
+    return case
+
+
+def case_key(case):
+    return f"{case['requested']['daily_rows']}:{case['requested']['events']}"
+
+
+def compare(before_path, after_path):
+    """Print per-case timing ratios (after / before) for two reports"""
+    with open(before_path) as handle:
+        before = {case_key(case): case for case in json.load(handle)['cases']}
+    with open(after_path) as handle:
+        after = {case_key(case): case for case in json.load(handle)['cases']}
+
+    for key in [key for key in after if key in before]:
+        print(f"case {key}")
+        old_timings = before[key].get('timings', {})
+        for name, seconds in after[key].get('timings', {}).items():
+            if name in old_timings and old_timings[name]:
+                print(f"  {name:<18} {old_timings[name]:>10.3f}s -> {seconds:>10.3f}s  x{seconds / old_timings[name]:.2f}")
+        old_rss, new_rss = before[key].get('peak_rss_bytes'), after[key].get('peak_rss_bytes')
+        if old_rss and new_rss:
+            print(f"  {'peak_rss_mb':<18} {old_rss / 2 ** 20:>10.1f}  -> {new_rss / 2 ** 20:>10.1f}   x{new_rss / old_rss:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', default=DEFAULT_CASES, metavar='DAILY_ROWS:EVENTS')
+    parser.add_argument('--output', default='benchmark_report.json')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds allowed per script run')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    parser.add_argument('--worker', nargs=2, metavar=('START', 'END'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(*args.worker, timeout=args.timeout)
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = {'generated_at': datetime.now().isoformat(timespec='seconds'), 'environment': environment(), 'cases': []}
+    for text in args.cases:
+        daily_rows, events = parse_case(text)
+        print(f"case {daily_rows:,} daily rows / {events:,} events ...", flush=True)
+        case = run_case(daily_rows, events, args.timeout)
+        report['cases'].append(case)
+        if 'failed' in case:
+            print('  failed:\n    ' + '\n    '.join(case['failed']), flush=True)
+        else:
+            print('  ' + ', '.join(f"{name}={seconds:.3f}s" for name, seconds in case['timings'].items()), flush=True)
+
+        # Rewrite after every case so a long run still leaves a usable report
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(f"report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+"""Headless analytics behind the customer satisfaction dashboard.
+
+Data generation, merging, dimension slices, rollups, event detection, risk
+scoring, ingestion and exports, with `pipeline` tying them together the way the
+dashboard does. Nothing in the package imports Streamlit or Plotly; run
+`python -m cf_analytics --help` for the command line interface.
+"""
+from .dimension_slices import ALL_SLICE, DimensionSlices
+from .merge_store import MergedDataset
+from .pipeline import (aggregate, build_dimension_slices, build_risk_engine, classify_upload, daily_dataset,
+                       events_dataset, filter_daily, ingest_files, load_data, risk_summary, save_datasets)
+from .risk_engine import RiskEngine
+from .rollup_cube import RollupCube
+
+__all__ = [
+    'ALL_SLICE', 'DimensionSlices', 'MergedDataset', 'RiskEngine', 'RollupCube',
+    'aggregate', 'build_dimension_slices', 'build_risk_engine', 'classify_upload', 'daily_dataset',
+    'events_dataset', 'filter_daily', 'ingest_files', 'load_data', 'risk_summary', 'save_datasets',
+]
@@ -0,0 +1,152 @@
+"""Command line interface to the analytics pipeline (no Streamlit needed).
+
+    python -m cf_analytics load                                   # what the dashboard would load
+    python -m cf_analytics ingest new_days.csv events.xlsx --save # merge files into the stored datasets
+    python -m cf_analytics filter --start 2025-07-01 --end 2025-07-31 --slice "Channel: web"
+    python -m cf_analytics aggregate --granularity week --output weekly.parquet
+    python -m cf_analytics risk --medium-gap 0.3 --high-gap 0.6
+
+Tables go to stdout as CSV unless --output names a .csv, .csv.gz or .parquet
+file; summaries are printed as JSON. --data-dir selects the columnar store
+(default: CF_DATA_DIR, as for the dashboard).
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+
+from . import pipeline
+from .columnar_store import DEFAULT_DATA_DIR, ColumnarStore
+from .dimension_slices import ALL_SLICE
+from .exports import EXPORT_FORMATS, write_frame
+from .ingestion import DEFAULT_PARSE_WORKERS, UploadParser
+from .risk_engine import DEFAULT_HIGH_GAP, DEFAULT_MEDIUM_GAP
+from .rollup_cube import GRANULARITIES
+from .survey_metrics import METRIC_COLUMNS
+
+
+def write_table(df, output=None, fmt=None):
+    """CSV to stdout, or the file `output` in `fmt` (inferred from the extension by default)"""
+    if output is None or output == '-':
+        df.to_csv(sys.stdout, index=False)
+        return
+    if fmt is None:
+        fmt = next((name for name, (_, extension, _) in EXPORT_FORMATS.items() if output.endswith(extension)), 'csv')
+    with open(output, 'wb') as sink:
+        write_frame(df, sink, fmt)
+    print(f"Wrote {len(df):,} rows to {output}", file=sys.stderr)
+
+
+def print_json(payload):
+    print(json.dumps(payload, indent=2, default=str))
+
+
+def _datasets(args):
+    daily_df, events_df = pipeline.load_data(ColumnarStore(args.data_dir))
+    return {'daily': pipeline.daily_dataset(daily_df), 'events': pipeline.events_dataset(events_df)}
+
+
+def _filtered_daily(args, parser):
+    slices = pipeline.build_dimension_slices(_datasets(args)['daily'].frame)
+    if args.slice not in slices.options:
+        parser.error(f"unknown slice {args.slice!r}; available: {', '.join(slices.options)}")
+    return pipeline.filter_daily(slices, args.slice, args.start, args.end, args.month)
+
+
+def cmd_load(args, parser):
+    store = ColumnarStore(args.data_dir)
+    datasets = _datasets(args)
+    daily = datasets['daily'].frame
+    slices = pipeline.build_dimension_slices(daily)
+    print_json({
+        'source': {name: 'persisted' if store.exists(name) else 'sample' for name in datasets},
+        'daily_rows': len(daily),
+        'days': len(slices.frame(ALL_SLICE)),
+        'first_date': daily['date'].min(),
+        'last_date': daily['date'].max(),
+        'events_rows': len(datasets['events']),
+        'slices': slices.options,
+    })
+    if args.output:
+        write_table(daily, args.output, args.format)
+
+
+def cmd_ingest(args, parser):
+    datasets = _datasets(args)
+    summaries = pipeline.ingest_files(datasets, args.files, UploadParser(args.workers))
+    saved = pipeline.save_datasets(datasets, ColumnarStore(args.data_dir)) if args.save else {}
+    print_json({'files': summaries, 'daily_rows': len(datasets['daily']), 'events_rows': len(datasets['events']),
+                'saved': saved})
+    return 1 if any('error' in summary for summary in summaries) else 0
+
+
+def cmd_filter(args, parser):
+    write_table(_filtered_daily(args, parser), args.output, args.format)
+
+
+def cmd_aggregate(args, parser):
+    write_table(pipeline.aggregate(_filtered_daily(args, parser), args.granularity, args.metric), args.output,
+                args.format)
+
+
+def cmd_risk(args, parser):
+    engine = pipeline.build_risk_engine(_filtered_daily(args, parser))
+    write_table(pipeline.risk_summary(engine, args.medium_gap, args.high_gap), args.output, args.format)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='cf_analytics', description='Customer satisfaction analytics without the dashboard')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='columnar store directory (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_output(command):
+        command.add_argument('--output', '-o', help="output file (.csv, .csv.gz, .parquet); CSV to stdout by default")
+        command.add_argument('--format', choices=list(EXPORT_FORMATS), help='output format (default: from the extension)')
+
+    def add_filters(command):
+        command.add_argument('--slice', default=ALL_SLICE, help='store/channel/region slice, e.g. "Store: Store 001"')
+        command.add_argument('--start', type=date.fromisoformat, help='first day (YYYY-MM-DD)')
+        command.add_argument('--end', type=date.fromisoformat, help='last day (YYYY-MM-DD)')
+        command.add_argument('--month', help='month label, e.g. "July 2025"')
+
+    load = commands.add_parser('load', help='summarize the datasets the dashboard starts from')
+    add_output(load)
+    load.set_defaults(handler=cmd_load)
+
+    ingest = commands.add_parser('ingest', help='merge CSV/Excel files into the datasets')
+    ingest.add_argument('files', nargs='+')
+    ingest.add_argument('--workers', type=int, default=DEFAULT_PARSE_WORKERS, help='parse processes (default: %(default)s)')
+    ingest.add_argument('--save', action='store_true', help='persist the merged datasets to the data directory')
+    ingest.set_defaults(handler=cmd_ingest)
+
+    filter_ = commands.add_parser('filter', help='daily rows of a slice and date range')
+    add_filters(filter_)
+    add_output(filter_)
+    filter_.set_defaults(handler=cmd_filter)
+
+    aggregate = commands.add_parser('aggregate', help='per-period metric means (or one metric in detail)')
+    add_filters(aggregate)
+    aggregate.add_argument('--granularity', choices=GRANULARITIES, default='month')
+    aggregate.add_argument('--metric', choices=METRIC_COLUMNS, help='full statistics of one metric')
+    add_output(aggregate)
+    aggregate.set_defaults(handler=cmd_aggregate)
+
+    risk = commands.add_parser('risk', help='risk summary per segment and metric')
+    add_filters(risk)
+    risk.add_argument('--medium-gap', type=float, default=DEFAULT_MEDIUM_GAP)
+    risk.add_argument('--high-gap', type=float, default=DEFAULT_HIGH_GAP)
+    add_output(risk)
+    risk.set_defaults(handler=cmd_risk)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args, parser) or 0
+    except BrokenPipeError:
+        # Output piped into a reader that stopped early (e.g. `| head`): exit without a traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
@@ -0,0 +1,96 @@
+"""Persistent on-disk columnar store for the merged datasets.
+
+Each dataset is written as an uncompressed Arrow IPC (Feather v2) file so it can
+be memory-mapped at startup instead of being regenerated or re-ingested. On
+load, numeric columns without nulls stay backed by the memory map (pages are
+read on first access and shared with the OS page cache); dictionary columns
+become categoricals and nullable ones are decoded, which copies only those.
+Writes go to a temporary file that is atomically renamed into place, so a
+crashed write never leaves a half-written dataset behind.
+"""
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # pyarrow is optional; without it the store is simply disabled
+    pa = None
+
+DEFAULT_DATA_DIR = os.environ.get(
+    "CF_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cf_data")
+)
+
+
+class ColumnarStore:
+    """Directory of named Arrow datasets (e.g. 'daily', 'events')"""
+
+    suffix = ".arrow"
+
+    def __init__(self, root=DEFAULT_DATA_DIR):
+        self.root = root
+
+    @property
+    def available(self):
+        return pa is not None
+
+    def path(self, name):
+        return os.path.join(self.root, f"{name}{self.suffix}")
+
+    def exists(self, name):
+        return self.available and os.path.exists(self.path(name))
+
+    def signature(self):
+        """Cheap (name, mtime, size) fingerprint of the stored datasets, usable as a cache key"""
+        if not self.available or not os.path.isdir(self.root):
+            return ()
+        entries = []
+        for filename in sorted(os.listdir(self.root)):
+            if filename.endswith(self.suffix):
+                stat = os.stat(os.path.join(self.root, filename))
+                entries.append((filename, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def save(self, name, df):
+        """Write a DataFrame as an Arrow IPC file (atomic replace)"""
+        if not self.available:
+            return False
+        os.makedirs(self.root, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        target = self.path(name)
+        tmp_path = f"{target}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, target)
+        return True
+
+    def load_table(self, name):
+        """Memory-map a stored dataset as an Arrow table (None when missing)"""
+        if not self.exists(name):
+            return None
+        source = pa.memory_map(self.path(name), "r")
+        return pa.ipc.open_file(source).read_all()
+
+    def load(self, name):
+        """Load a stored dataset as a DataFrame (None when missing).
+
+        One block per column, so numeric columns are zero-copy views of the memory map
+        (read-only) instead of being consolidated into freshly allocated 2D blocks.
+        """
+        table = self.load_table(name)
+        if table is None:
+            return None
+        return table.to_pandas(split_blocks=True)
+
+    def delete(self, name):
+        if os.path.exists(self.path(name)):
+            os.remove(self.path(name))
+
+    def clear(self):
+        """Remove every stored dataset"""
+        if not os.path.isdir(self.root):
+            return
+        for filename in os.listdir(self.root):
+            if filename.endswith(self.suffix):
+                os.remove(os.path.join(self.root, filename))
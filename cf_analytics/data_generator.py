@@ -0,0 +1,181 @@
+"""Vectorized synthetic data generator for the satisfaction dashboard.
+
+Builds the daily satisfaction frame with NumPy arrays and date masks instead of
+a per-day Python loop, so multi-year, multi-store fixtures can be produced (and
+streamed to disk in chunks) in seconds.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_METRICS = ['satisfaction_score']
+
+# Sales channels used when `channels=True`
+DEFAULT_CHANNELS = ['web', 'showroom', 'phone']
+
+# Score distribution used for every generated metric
+BASE_MEAN = 8.5
+BASE_STD = 1.2
+
+# Weekend effect (slightly lower satisfaction)
+WEEKEND_PENALTY = 0.3
+
+# Promotion periods (month, first day, last day, score lift)
+PROMOTION_WINDOWS = [
+    (6, 15, 20, 1.5),   # June promotion
+    (8, 1, 7, 1.2),     # August promotion
+    (9, 20, 26, 1.8),   # September promotion
+]
+
+# Special events (month, day, score change)
+SPECIAL_EVENTS = [
+    (7, 15, -2.5),      # System maintenance
+    (8, 20, -1.8),      # Store renovation
+]
+
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], dtype=object)
+
+
+def build_date_range(start_date, end_date=None, years=None):
+    """Return the daily DatetimeIndex covering start_date..end_date (or `years` years)"""
+    start = pd.Timestamp(start_date)
+    if end_date is None:
+        end = start + pd.DateOffset(years=years or 1) - pd.Timedelta(days=1)
+    else:
+        end = pd.Timestamp(end_date)
+    return pd.date_range(start, end, freq='D')
+
+
+def _store_labels(stores):
+    """Normalize the `stores` argument to an array of store ids (None for a single global series)"""
+    if stores is None or (isinstance(stores, int) and stores <= 1):
+        return None
+    if isinstance(stores, int):
+        return np.array([f"Store {i:03d}" for i in range(1, stores + 1)], dtype=object)
+    return np.asarray(list(stores), dtype=object)
+
+
+def _channel_labels(channels):
+    """Normalize the `channels` argument to an array of channel names (None for no channel column)"""
+    if channels is None or channels is False:
+        return None
+    if channels is True:
+        return np.asarray(DEFAULT_CHANNELS, dtype=object)
+    return np.asarray(list(channels), dtype=object)
+
+
+def _month_labels(dates, fmt):
+    """Format each date's month once per distinct month and broadcast back to every day"""
+    codes = dates.year.to_numpy() * 12 + dates.month.to_numpy() - 1
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    labels = np.array(
+        [pd.Timestamp(year=int(code // 12), month=int(code % 12) + 1, day=1).strftime(fmt) for code in unique_codes],
+        dtype=object,
+    )
+    return labels[inverse]
+
+
+def score_adjustments(dates):
+    """Vectorized weekend, promotion and special-event score adjustments for each date"""
+    month = dates.month.to_numpy()
+    day = dates.day.to_numpy()
+    weekday = dates.weekday.to_numpy()
+
+    adjustment = np.where(weekday >= 5, -WEEKEND_PENALTY, 0.0)
+    for promo_month, first_day, last_day, lift in PROMOTION_WINDOWS:
+        adjustment += np.where((month == promo_month) & (day >= first_day) & (day <= last_day), lift, 0.0)
+    for event_month, event_day, change in SPECIAL_EVENTS:
+        adjustment += np.where((month == event_month) & (day == event_day), change, 0.0)
+    return adjustment
+
+
+def _build_frame(dates, store_ids, metrics, rng, metric_offsets=None, channel_ids=None):
+    """Build one block of rows (every store and channel for every date in `dates`)"""
+    n_stores = 1 if store_ids is None else len(store_ids)
+    n_channels = 1 if channel_ids is None else len(channel_ids)
+    n_groups = n_stores * n_channels
+    n_rows = len(dates) * n_groups
+
+    # Row-major draws keep the random stream independent of the chunk size
+    base_scores = rng.normal(BASE_MEAN, BASE_STD, size=(n_rows, len(metrics)))
+    adjustment = np.repeat(score_adjustments(dates), n_groups)
+    offsets = np.array([(metric_offsets or {}).get(metric, 0.0) for metric in metrics])
+    scores = np.round(np.clip(base_scores + adjustment[:, None] + offsets, 0, 10), 1)
+
+    weekday = dates.weekday.to_numpy()
+    columns = {'date': np.repeat(dates.to_numpy(), n_groups)}
+    if store_ids is not None:
+        columns['store'] = np.tile(np.repeat(store_ids, n_channels), len(dates))
+    if channel_ids is not None:
+        columns['channel'] = np.tile(channel_ids, len(dates) * n_stores)
+    for i, metric in enumerate(metrics):
+        columns[metric] = scores[:, i]
+    columns['month'] = np.repeat(_month_labels(dates, '%B %Y'), n_groups)
+    columns['month_short'] = np.repeat(_month_labels(dates, '%b'), n_groups)
+    columns['day_name'] = np.repeat(DAY_NAMES[weekday], n_groups)
+    columns['is_weekend'] = np.repeat(weekday >= 5, n_groups)
+    columns['week'] = np.repeat(dates.isocalendar().week.to_numpy(dtype=np.int64), n_groups)
+    return pd.DataFrame(columns)
+
+
+def iter_daily_chunks(start_date, end_date=None, years=None, stores=1, metrics=None, seed=42, chunk_days=365,
+                      metric_offsets=None, channels=None):
+    """Yield the generated daily data as DataFrames of at most `chunk_days` days each"""
+    dates = build_date_range(start_date, end_date, years)
+    store_ids = _store_labels(stores)
+    channel_ids = _channel_labels(channels)
+    metrics = list(metrics or DEFAULT_METRICS)
+    rng = np.random.RandomState(seed)
+
+    for start in range(0, len(dates), chunk_days):
+        yield _build_frame(dates[start:start + chunk_days], store_ids, metrics, rng, metric_offsets, channel_ids)
+
+
+def generate_daily_data(start_date, end_date=None, years=None, stores=1, metrics=None, seed=42, metric_offsets=None,
+                        channels=None):
+    """Generate daily satisfaction data for every date (and store and channel) in one vectorized pass
+
+    `metric_offsets` optionally shifts individual metrics (e.g. {'checkout_process': -0.2}).
+    `channels=True` adds a `channel` column with one row per DEFAULT_CHANNELS entry (or pass the names).
+    """
+    dates = build_date_range(start_date, end_date, years)
+    store_ids = _store_labels(stores)
+    metrics = list(metrics or DEFAULT_METRICS)
+    return _build_frame(dates, store_ids, metrics, np.random.RandomState(seed), metric_offsets,
+                        _channel_labels(channels))
+
+
+def write_daily_data(path, start_date, end_date=None, years=None, stores=1, metrics=None, seed=42, chunk_days=365,
+                     metric_offsets=None, channels=None):
+    """Stream generated daily data to a CSV or Parquet file chunk by chunk; returns the row count"""
+    chunks = iter_daily_chunks(start_date, end_date, years, stores, metrics, seed, chunk_days, metric_offsets,
+                               channels)
+    total_rows = 0
+
+    if str(path).endswith('.parquet'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Writing Parquet fixtures requires pyarrow (pip install pyarrow)") from e
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                total_rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+        return total_rows
+
+    if os.path.exists(path):
+        os.remove(path)
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode='a', header=(i == 0), index=False, date_format='%Y-%m-%d')
+        total_rows += len(chunk)
+    return total_rows
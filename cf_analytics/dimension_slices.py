@@ -0,0 +1,115 @@
+"""Pre-aggregated slices of the daily data by store, channel and region.
+
+The daily feed can hold one row per timestamp (usually one per day) for every
+store and channel. `DimensionSlices` aggregates it once per data version into
+one row per timestamp for all data together and for every value of every
+dimension column, with `np.bincount` over (slice, timestamp) bins. The slices
+sit back to back in one frame, sorted by slice and date, so selecting a store
+is an O(1) positional slice and a date range inside it is a binary search --
+no groupby on a rerun.
+
+Metric columns hold the mean over the slice's rows for the timestamp; the
+other columns (month, weekday, ...) depend only on the date and are taken from
+the timestamp's first row. Data without dimension columns is served as is, so
+intraday rows reach the timeline unchanged.
+"""
+import numpy as np
+import pandas as pd
+
+from .merge_store import date_keys
+
+DIMENSION_COLUMNS = ['store', 'channel', 'region']
+ALL_SLICE = 'All'
+
+
+def slice_label(dimension, value):
+    return f"{dimension.title()}: {value}"
+
+
+class DimensionSlices:
+    """One per-timestamp frame for all data and for each store/channel/region value, stored contiguously"""
+
+    def __init__(self, daily_df, metrics, dimensions=DIMENSION_COLUMNS, date_col='date'):
+        self.date_col = date_col
+        self.metrics = [metric for metric in metrics if metric in daily_df.columns]
+        self.dimensions = [dimension for dimension in dimensions
+                           if dimension in daily_df.columns and daily_df[dimension].notna().any()]
+
+        if not self.dimensions:
+            # Nothing to aggregate over: the 'All' slice is the frame itself
+            self.options = [ALL_SLICE]
+            self._frame = daily_df
+            self._bounds = {ALL_SLICE: (0, len(daily_df))}
+            self._keys = date_keys(daily_df[date_col])
+            return
+
+        days = daily_df[date_col].to_numpy(dtype='datetime64[ns]')
+        unique_days, first_rows, day_codes = np.unique(days, return_index=True, return_inverse=True)
+        day_codes = day_codes.ravel()
+
+        # Slice 0 is all rows; every dimension value gets the next slice numbers
+        self.options = [ALL_SLICE]
+        slice_codes = [np.zeros(len(daily_df), dtype=np.int64)]
+        for dimension in self.dimensions:
+            codes, values = pd.factorize(daily_df[dimension], sort=True)
+            first_slice = len(self.options)
+            self.options.extend(slice_label(dimension, value) for value in values)
+            slice_codes.append(np.where(codes >= 0, codes + first_slice, -1))
+
+        n_days = len(unique_days)
+        slice_codes = np.concatenate(slice_codes)
+        row_days = np.tile(day_codes, len(slice_codes) // max(len(day_codes), 1))
+        usable = slice_codes >= 0
+        bins = slice_codes[usable] * n_days + row_days[usable]
+        n_bins = len(self.options) * n_days
+
+        rows = np.bincount(bins, minlength=n_bins)
+        present = np.flatnonzero(rows)
+        aggregated = {}
+        for metric in self.metrics:
+            column = np.tile(daily_df[metric].to_numpy(dtype=np.float64, na_value=np.nan),
+                             len(self.dimensions) + 1)[usable]
+            valid = ~np.isnan(column)
+            counts = np.bincount(bins, weights=valid, minlength=n_bins)[present]
+            sums = np.bincount(bins, weights=np.where(valid, column, 0.0), minlength=n_bins)[present]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                aggregated[metric] = np.where(counts > 0, sums / counts, np.nan)
+
+        # Date-only columns come from each timestamp's first row; bins are slice-major, so the result is
+        # sorted by slice and then by date
+        day_columns = [column for column in daily_df.columns
+                       if column not in self.metrics and column not in self.dimensions]
+        frame = daily_df[day_columns].iloc[first_rows[present % n_days]].reset_index(drop=True)
+        frame[date_col] = unique_days[present % n_days]
+        for metric in self.metrics:
+            frame[metric] = aggregated[metric]
+        self._frame = frame[[column for column in daily_df.columns if column not in self.dimensions]]
+
+        slice_of_row = present // n_days
+        bounds = np.searchsorted(slice_of_row, np.arange(len(self.options) + 1))
+        self._bounds = {label: (int(bounds[i]), int(bounds[i + 1])) for i, label in enumerate(self.options)}
+        self._keys = date_keys(self._frame[date_col])
+
+    def __len__(self):
+        return len(self._frame)
+
+    def frame(self, label=ALL_SLICE):
+        """Rows of one slice, sorted by date (a positional view of the stacked frame)"""
+        lo, hi = self._bounds[label]
+        return self._frame.iloc[lo:hi]
+
+    def date_slice(self, label=ALL_SLICE, start=None, end=None):
+        """Rows of one slice dated start..end (whole days, inclusive) found by binary search"""
+        lo, hi = self._bounds[label]
+        keys = self._keys[lo:hi]
+        first, last = 0, len(keys)
+        if start is not None:
+            first = np.searchsorted(keys, date_keys([pd.Timestamp(start).normalize()])[0], side='left')
+        if end is not None:
+            next_day = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+            last = np.searchsorted(keys, date_keys([next_day])[0], side='left')
+        return self._frame.iloc[lo + first:lo + max(first, last)]
+
+    @property
+    def nbytes(self):
+        return int(self._frame.memory_usage(index=True, deep=True).sum())
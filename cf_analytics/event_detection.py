@@ -0,0 +1,169 @@
+"""Critical-event detection from the daily metric matrix.
+
+For every day `EventDetector` counts how many tracked metrics fell below
+target, turns the failure percentage into a severity, and flags metrics whose
+value drops more than `z_threshold` standard deviations below their trailing
+`z_window`-day mean (rolling z-score from cumulative sums).
+
+The survey targets are aspirational (most days miss several of them), so a
+day becomes an event only when a metric drops anomalously or every tracked
+metric misses its target. Severity bands start at half the metrics failing, so
+an anomalous drop on an otherwise good day is reported as Low; on the bundled
+sample about one day in eight is an event. It works on the
+days x metrics `DailyMetricMatrix`, so its cost depends on the number of days,
+not on the number of raw rows behind them.
+
+Updates are incremental: the detector keeps the matrix it last saw, finds the
+first day whose values changed (typically the first uploaded day) and only
+recomputes from there, reusing the earlier days' results.
+"""
+import numpy as np
+import pandas as pd
+
+SEVERITY_LEVELS = np.array(['Low', 'Medium', 'High', 'Critical'], dtype=object)
+# Failure percentage at which Medium, High and Critical start
+SEVERITY_THRESHOLDS = (50.0, 75.0, 100.0)
+DEFAULT_Z_WINDOW = 30
+DEFAULT_Z_THRESHOLD = 2.5
+# Days below this failure percentage are only reported when a metric is anomalous
+DEFAULT_MIN_FAILURE_PERCENTAGE = 100.0
+
+NO_PROMOTION = 'No promotion'
+# Promotions running on each day (first day, last day, name)
+PROMOTION_CALENDAR = [
+    ('2025-06-15', '2025-06-15', 'Father Day Special 15% OFF'),
+    ('2025-06-29', '2025-07-04', '4th of July Event 7% OFF'),
+    ('2025-07-14', '2025-07-14', 'Anniversary Sale Kick Off'),
+    ('2025-07-20', '2025-07-20', 'Summer Clearance 20% OFF'),
+    ('2025-08-24', '2025-08-24', 'Back to School Furniture'),
+    ('2025-09-01', '2025-09-01', 'Labor Day Sale'),
+    ('2025-09-15', '2025-09-15', 'Fall Collection Launch'),
+]
+
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'], dtype=object)
+
+
+def severity_codes(failure_percentage):
+    """0..3 index into SEVERITY_LEVELS for each failure percentage"""
+    return np.searchsorted(np.array(SEVERITY_THRESHOLDS), failure_percentage, side='right')
+
+
+def promotion_labels(days, calendar=PROMOTION_CALENDAR):
+    """Name of the promotion running on each day (later calendar entries win), else NO_PROMOTION"""
+    labels = np.full(len(days), NO_PROMOTION, dtype=object)
+    for first_day, last_day, name in calendar:
+        labels[(days >= np.datetime64(first_day, 'D')) & (days <= np.datetime64(last_day, 'D'))] = name
+    return labels
+
+
+def rolling_z_scores(values, window, start=0, min_periods=None):
+    """z-score of rows start.. of `values` against the `window` rows before each one.
+
+    NaN where fewer than `min_periods` earlier values exist or they have no spread.
+    """
+    min_periods = min_periods or max(2, window // 2)
+    lo = max(0, start - window)
+    block = values[lo:].astype(np.float64)
+    valid = ~np.isnan(block)
+    filled = np.where(valid, block, 0.0)
+    zeros = np.zeros((1, block.shape[1]))
+    count = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    total = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    total_sq = np.concatenate([zeros, np.cumsum(filled * filled, axis=0)])
+
+    rows = np.arange(start - lo, len(block))
+    first = np.maximum(rows - window, 0)
+    n = count[rows] - count[first]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (total[rows] - total[first]) / n
+        std = np.sqrt(np.clip((total_sq[rows] - total_sq[first]) / n - mean * mean, 0, None))
+        z = (block[rows] - mean) / std
+    return np.where((n >= min_periods) & (std > 1e-9), z, np.nan)
+
+
+class EventDetector:
+    """Per-day failure counts, severities and rolling z-score anomalies, updated incrementally"""
+
+    def __init__(self, targets=None, z_window=DEFAULT_Z_WINDOW, z_threshold=DEFAULT_Z_THRESHOLD,
+                 min_failure_percentage=DEFAULT_MIN_FAILURE_PERCENTAGE, promotions=PROMOTION_CALENDAR):
+        self.targets = targets
+        self.z_window = z_window
+        self.z_threshold = z_threshold
+        self.min_failure_percentage = min_failure_percentage
+        self.promotions = promotions
+        self.metrics = None
+        self.start = None
+        self.values = None
+        self._days = None     # per-day results: DataFrame indexed by matrix row
+        self.full_builds = 0
+        self.rows_recomputed = 0
+
+    def update(self, matrix):
+        """Bring the results in line with `matrix`; returns the first recomputed row (len(matrix) if none)"""
+        if (self.values is None or matrix.metrics != self.metrics or matrix.start != self.start
+                or len(matrix) < len(self.values)):
+            first_changed = 0
+            self.full_builds += 1
+        else:
+            old, new = self.values, matrix.values[:len(self.values)]
+            changed = ~((old == new) | (np.isnan(old) & np.isnan(new))).all(axis=1)
+            first_changed = int(np.argmax(changed)) if changed.any() else len(self.values)
+
+        if first_changed < len(matrix):
+            tail = self._detect(matrix, first_changed)
+            head = self._days.iloc[:first_changed] if first_changed else None
+            self._days = tail if head is None else pd.concat([head, tail])
+            self.rows_recomputed += len(tail)
+        self.metrics = list(matrix.metrics)
+        self.start = matrix.start
+        self.values = matrix.values.copy()
+        return first_changed
+
+    def _detect(self, matrix, start):
+        values = matrix.values
+        target_row = matrix.target_row(self.targets)
+        block = values[start:]
+        tracked = np.count_nonzero(~np.isnan(block), axis=1)
+        failed = np.count_nonzero(block < target_row, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            failure_percentage = np.where(tracked > 0, failed * 100.0 / tracked, np.nan)
+
+        z = rolling_z_scores(values, self.z_window, start)
+        anomalous = z <= -self.z_threshold
+        anomaly_metrics = np.count_nonzero(anomalous, axis=1)
+        all_nan = np.isnan(z).all(axis=1)
+        min_z = np.full(len(z), np.nan)
+        min_z[~all_nan] = np.nanmin(z[~all_nan], axis=1)
+
+        # Severity follows the failure percentage (anomalies decide whether the day is an event)
+        severity = severity_codes(np.nan_to_num(failure_percentage))
+
+        days = matrix.dates[start:]
+        weekday = (days.astype(np.int64) + 3) % 7   # 1970-01-01 was a Thursday
+        return pd.DataFrame({
+            'date': days.astype('datetime64[ns]'),
+            'day_of_week': DAY_NAMES[weekday],
+            'failed_metrics_count': failed.astype(np.int8),
+            'metrics_evaluated': tracked.astype(np.int8),
+            'failure_percentage': failure_percentage.astype(np.float32),
+            'promotion': promotion_labels(days, self.promotions),
+            'severity': SEVERITY_LEVELS[severity],
+            'anomaly_metrics': anomaly_metrics.astype(np.int8),
+            'min_z_score': min_z.astype(np.float32)
+        }, index=np.arange(start, len(values)))
+
+    def events(self):
+        """Days with at least `min_failure_percentage` failing metrics or an anomalous drop, by date"""
+        if self._days is None:
+            return pd.DataFrame(columns=['date', 'day_of_week', 'failed_metrics_count', 'metrics_evaluated',
+                                         'failure_percentage', 'promotion', 'severity', 'anomaly_metrics',
+                                         'min_z_score'])
+        days = self._days
+        keep = (days['metrics_evaluated'] > 0) & (
+            (days['failure_percentage'] >= self.min_failure_percentage) | (days['anomaly_metrics'] > 0))
+        return days[keep].reset_index(drop=True)
+
+    @property
+    def stats(self):
+        return {'days': 0 if self._days is None else len(self._days), 'full_builds': self.full_builds,
+                'rows_recomputed': self.rows_recomputed}
@@ -0,0 +1,99 @@
+"""Encoded dataset exports (CSV, gzip CSV, Parquet) with a per-version cache.
+
+Frames are encoded chunk by chunk straight into a binary buffer, so a large
+export never exists as one giant CSV string next to its encoded bytes, and
+the encoded payload is cached per (dataset, version, format, filter) so
+repeated downloads of unchanged data skip the encoding entirely.
+"""
+import gzip
+import io
+from collections import OrderedDict
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; Parquet exports are simply not offered without it
+    pa = None
+
+DEFAULT_CHUNK_ROWS = 100_000
+
+# format -> (label, file extension, MIME type)
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def available_formats():
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pa is not None]
+
+
+def _write_csv(df, sink, chunk_rows):
+    text = io.TextIOWrapper(sink, encoding='utf-8', newline='')
+    for start in range(0, max(len(df), 1), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(text, header=(start == 0), index=False)
+    text.flush()
+    text.detach()  # leave the underlying binary sink open
+
+
+def _write_parquet(df, sink, chunk_rows):
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        # One row group per chunk
+        for start in range(0, max(len(df), 1), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(df.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+
+
+def write_frame(df, sink, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Encode `df` into the binary file-like `sink` in chunks of `chunk_rows` rows"""
+    if fmt == 'csv':
+        _write_csv(df, sink, chunk_rows)
+    elif fmt == 'csv.gz':
+        # mtime=0 keeps the output byte-identical for identical data
+        with gzip.GzipFile(fileobj=sink, mode='wb', mtime=0) as compressed:
+            _write_csv(df, compressed, chunk_rows)
+    elif fmt == 'parquet':
+        if pa is None:
+            raise ValueError('Parquet export requires pyarrow')
+        _write_parquet(df, sink, chunk_rows)
+    else:
+        raise ValueError(f'Unknown export format: {fmt}')
+
+
+def encode_frame(df, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+    buffer = io.BytesIO()
+    write_frame(df, buffer, fmt, chunk_rows)
+    return buffer.getvalue()
+
+
+class ExportCache:
+    """LRU cache of encoded export payloads, bounded by total size"""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._payloads = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, key):
+        payload = self._payloads.get(key)
+        if payload is not None:
+            self._payloads.move_to_end(key)
+        return payload
+
+    def get_or_encode(self, key, build_frame, fmt, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Cached payload for `key`, encoding build_frame() on a miss"""
+        payload = self.get(key)
+        if payload is None:
+            payload = encode_frame(build_frame(), fmt, chunk_rows)
+            self._payloads[key] = payload
+            self.total_bytes += len(payload)
+            # The newest payload is kept even when it alone exceeds the budget
+            while len(self._payloads) > 1 and self.total_bytes > self.max_bytes:
+                _, evicted = self._payloads.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return payload
+
+    def clear(self):
+        self._payloads.clear()
+        self.total_bytes = 0
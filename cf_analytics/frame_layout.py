@@ -0,0 +1,134 @@
+"""Compact dtype layout for the daily and events frames.
+
+Repeated labels (stores, channels, month names, weekdays, promotions,
+severities) become categoricals, `failed_metrics` strings such as "3/8" become
+two small integer columns, and other numbers are downcast where no value can
+change: integers to the smallest type that holds them, and `failure_percentage`
+to float32 (its values are eighths, which float32 represents exactly). Survey
+scores stay float64 because one-decimal values are not exact in float32 and
+would show up as 8.699999... in hovers and exports. Every function is
+idempotent, so already-compact frames pass through cheaply.
+"""
+import numpy as np
+import pandas as pd
+
+DAILY_CATEGORY_COLUMNS = ['store', 'channel', 'region', 'month', 'month_short', 'day_name']
+EVENTS_CATEGORY_COLUMNS = ['day_of_week', 'promotion', 'severity']
+DAILY_INTEGER_COLUMNS = ['week']
+EVENTS_FLOAT32_COLUMNS = ['failure_percentage']
+
+
+def _is_text(series):
+    return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+
+
+def to_category(series):
+    if isinstance(series.dtype, pd.CategoricalDtype) or not _is_text(series):
+        return series
+    return series.astype('category')
+
+
+def downcast_integer(series):
+    if not pd.api.types.is_integer_dtype(series.dtype) or series.empty:
+        return series
+    narrowed = pd.to_numeric(series, downcast='integer')
+    return series if narrowed.dtype == series.dtype else narrowed
+
+
+def to_float32(series):
+    """float32 when every value survives the round trip exactly"""
+    if not pd.api.types.is_float_dtype(series.dtype) or series.dtype == np.float32:
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(np.float64), values, equal_nan=True):
+        return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def split_failed_metrics(df):
+    """Replace "failed/evaluated" strings with `failed_metrics_count` and `metrics_evaluated` int8 columns"""
+    if 'failed_metrics' not in df.columns:
+        return df
+    parts = df['failed_metrics'].astype('string').str.extract(r'^\s*(\d+)\s*/\s*(\d+)\s*$')
+    df = df.drop(columns='failed_metrics')
+    df['failed_metrics_count'] = pd.to_numeric(parts[0]).astype('Int8')
+    df['metrics_evaluated'] = pd.to_numeric(parts[1]).astype('Int8')
+    # Plain int8 when no value is missing
+    for column in ('failed_metrics_count', 'metrics_evaluated'):
+        if not df[column].isna().any():
+            df[column] = df[column].astype(np.int8)
+    return df
+
+
+def failed_metrics_label(df):
+    """The "failed/evaluated" display strings for an events frame"""
+    if 'failed_metrics' in df.columns:
+        return df['failed_metrics'].astype(str)
+    label = df['failed_metrics_count'].astype('string') + '/' + df['metrics_evaluated'].astype('string')
+    return label.fillna('n/a').astype(str)
+
+
+def _compact(df, categories, integers=(), floats32=()):
+    converted = {}
+    for column in categories:
+        if column in df.columns:
+            converted[column] = to_category(df[column])
+    for column in integers:
+        if column in df.columns:
+            converted[column] = downcast_integer(df[column])
+    for column in floats32:
+        if column in df.columns:
+            converted[column] = to_float32(df[column])
+    changed = {column: series for column, series in converted.items() if series.dtype != df[column].dtype}
+    return df.assign(**changed) if changed else df
+
+
+def compact_daily(df):
+    return _compact(df, DAILY_CATEGORY_COLUMNS, DAILY_INTEGER_COLUMNS)
+
+
+def compact_events(df):
+    if 'failed_metrics' in df.columns:
+        df = split_failed_metrics(df.copy())
+    return _compact(df, EVENTS_CATEGORY_COLUMNS, floats32=EVENTS_FLOAT32_COLUMNS)
+
+
+def _default_layout(df, column):
+    """The column as pandas would hold it without this module (inferred strings, int64/float64)"""
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(series.cat.categories.dtype)
+    if pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+        return series.astype(np.int64)
+    if pd.api.types.is_float_dtype(series.dtype):
+        return series.astype(np.float64)
+    return series
+
+
+def memory_report(df):
+    """Per-column memory of `df` next to its size in pandas' default dtype layout.
+
+    Default-layout columns are materialized one at a time, so the report costs at most
+    one extra column of memory.
+    """
+    rows = []
+    for column in df.columns:
+        if column == 'metrics_evaluated' and 'failed_metrics_count' in df.columns:
+            continue
+        if column == 'failed_metrics_count':
+            # Both integer columns replace one "n/m" string column
+            compact_bytes = int(df[['failed_metrics_count', 'metrics_evaluated']].memory_usage(index=False, deep=True).sum())
+            default_bytes = int(failed_metrics_label(df).memory_usage(index=False, deep=True))
+            rows.append({'column': 'failed_metrics', 'dtype': f"2 x {df[column].dtype}",
+                         'bytes': compact_bytes, 'default_layout_bytes': default_bytes})
+            continue
+        rows.append({
+            'column': column,
+            'dtype': str(df[column].dtype),
+            'bytes': int(df[column].memory_usage(index=False, deep=True)),
+            'default_layout_bytes': int(_default_layout(df, column).memory_usage(index=False, deep=True))
+        })
+    report = pd.DataFrame(rows, columns=['column', 'dtype', 'bytes', 'default_layout_bytes'])
+    report['saved_bytes'] = report['default_layout_bytes'] - report['bytes']
+    return report
@@ -0,0 +1,392 @@
+"""Upload ingestion: eager parsing for small files, chunked streaming for large CSVs.
+
+Large CSV exports are parsed in fixed-size chunks by a single reader that
+reads every value as text. The schema (date columns, their format and the
+kind of every other column) is inferred once from the first chunk and every
+chunk is coerced to it, so a column cannot change type halfway through the
+file. Chunking bounds the parser's working memory, not the upload: Streamlit
+already holds an uploaded file in memory, and only files read from a path
+(e.g. by the CLI) are read incrementally.
+
+Smaller uploads in a batch are parsed concurrently by `UploadParser`, one
+file per worker process (openpyxl and the CSV parser are CPU-bound and hold
+the GIL). Workers are spawned rather than forked from the multi-threaded
+Streamlit server, and the pool is shut down at interpreter exit. Each file
+gets its own timing and error, so one bad file never aborts the rest of the
+batch, and results come back in upload order.
+
+`IngestionLedger` remembers every upload by content hash, so files that
+`st.file_uploader` keeps across reruns are never parsed or appended twice.
+"""
+import atexit
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from .memory_budget import DEFAULT_SESSION_BUDGET_BYTES, SpillPool
+
+# CSV uploads above this size are streamed in chunks instead of parsed in one go
+STREAMING_THRESHOLD_BYTES = 25 * 1024 * 1024
+DEFAULT_CHUNK_ROWS = 200_000
+DEFAULT_PARSE_WORKERS = int(os.environ.get('CF_INGEST_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def is_date_column(column):
+    return 'date' in str(column).lower()
+
+
+def read_upload(uploaded_file):
+    """Read a whole CSV/Excel upload and convert its date columns to datetime"""
+    if uploaded_file.name.endswith('.csv'):
+        df = pd.read_csv(uploaded_file)
+    else:  # Excel files
+        df = pd.read_excel(uploaded_file)
+
+    for date_col in [col for col in df.columns if is_date_column(col)]:
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    return df
+
+
+class ParsedUpload:
+    """Outcome of parsing one upload: the frame or an error message, plus the time it took"""
+
+    __slots__ = ('name', 'nbytes', 'df', 'error', 'seconds')
+
+    def __init__(self, name, nbytes, df, error, seconds):
+        self.name = name
+        self.nbytes = nbytes
+        self.df = df
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _parse_bytes(name, data):
+    """Worker entry point: parse one upload's bytes, returning (df, error, seconds)"""
+    start = time.perf_counter()
+    try:
+        source = io.BytesIO(data)
+        source.name = name
+        df, error = read_upload(source), None
+    except Exception as exc:  # any parser failure is reported for this file only
+        df, error = None, f"{type(exc).__name__}: {exc}"
+    return df, error, time.perf_counter() - start
+
+
+class UploadParser:
+    """Parses batches of uploads in a shared process pool (recreated if a worker dies)"""
+
+    def __init__(self, max_workers=DEFAULT_PARSE_WORKERS):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.last_batch_seconds = 0.0
+        atexit.register(self.shutdown)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Forking a process whose other threads may hold locks can deadlock the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def parse(self, uploads):
+        """Parse (name, bytes) pairs; returns one ParsedUpload per pair, in the same order.
+
+        A single file (or max_workers <= 1) is parsed in this process, which avoids
+        shipping the bytes and the frame between processes for nothing.
+        """
+        start = time.perf_counter()
+        if self.max_workers <= 1 or len(uploads) < 2:
+            results = [ParsedUpload(name, len(data), *_parse_bytes(name, data)) for name, data in uploads]
+        else:
+            executor = self._pool()
+            futures = [executor.submit(_parse_bytes, name, data) for name, data in uploads]
+            results = []
+            for (name, data), future in zip(uploads, futures):
+                try:
+                    outcome = future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. killed for memory); later batches get a fresh pool
+                    self._discard(executor)
+                    outcome = (None, 'BrokenProcessPool: the parser process exited unexpectedly', 0.0)
+                except Exception as exc:  # e.g. the parsed frame could not be sent back
+                    outcome = (None, f"{type(exc).__name__}: {exc}", 0.0)
+                results.append(ParsedUpload(name, len(data), *outcome))
+        self.batches += 1
+        self.last_batch_seconds = time.perf_counter() - start
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def source_size(source):
+    """Size in bytes of a path or file-like upload (None when unknown)"""
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    size = getattr(source, 'size', None)
+    if size is None and hasattr(source, 'seek'):
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    return size
+
+
+def should_stream(uploaded_file, threshold=STREAMING_THRESHOLD_BYTES):
+    """Large CSV uploads (or file paths) go through the chunked streaming path"""
+    size = source_size(uploaded_file)
+    name = os.fspath(uploaded_file) if isinstance(uploaded_file, (str, os.PathLike)) else uploaded_file.name
+    return name.endswith('.csv') and size is not None and size > threshold
+
+
+def _text_kind(values):
+    """Kind of a column read as text, following read_csv's own inference"""
+    text = values.dropna().astype(str).str.strip()
+    if text.empty:
+        return 'float' if values.isna().all() and len(values) else 'str'
+    if text.str.lower().isin(['true', 'false']).all():
+        return 'bool'
+    if text.str.fullmatch(r'[+-]?\d+').all() and len(text) == len(values):
+        return 'int'
+    if pd.to_numeric(text, errors='coerce').notna().all():
+        return 'float'
+    return 'str'
+
+
+def infer_schema(sample):
+    """Infer the column kinds (date/int/float/bool/str) and date formats from the first chunk.
+
+    The sample may be typed (as read_csv infers it) or read entirely as text.
+    """
+    schema = {}
+    for col in sample.columns:
+        values = sample[col]
+        if is_date_column(col):
+            first_value = values.dropna().astype(str).head(1)
+            fmt = guess_datetime_format(first_value.iloc[0]) if not first_value.empty else None
+            schema[col] = ('date', fmt)
+        elif pd.api.types.is_bool_dtype(values):
+            schema[col] = ('bool', None)
+        elif pd.api.types.is_integer_dtype(values):
+            schema[col] = ('int', None)
+        elif pd.api.types.is_float_dtype(values):
+            schema[col] = ('float', None)
+        else:
+            schema[col] = (_text_kind(values), None)
+    return schema
+
+
+def coerce_chunk(chunk, schema):
+    """Coerce one parsed chunk to the inferred schema (bad values become NaN/NaT)"""
+    for col, (kind, fmt) in schema.items():
+        if col not in chunk.columns:
+            continue
+        if kind == 'date':
+            chunk[col] = pd.to_datetime(chunk[col], format=fmt, errors='coerce')
+        elif kind in ('int', 'float'):
+            values = pd.to_numeric(chunk[col], errors='coerce')
+            # Integer columns fall back to float only when a chunk has missing values
+            if kind == 'int' and not values.isna().any():
+                values = values.astype('int64')
+            else:
+                values = values.astype('float64')
+            chunk[col] = values
+        elif kind == 'bool' and not pd.api.types.is_bool_dtype(chunk[col]):
+            flags = chunk[col].astype(str).str.strip().str.lower().map({'true': True, 'false': False})
+            chunk[col] = flags.astype(bool) if flags.notna().all() else flags.astype(object)
+    return chunk
+
+
+class CsvChunkStream:
+    """Chunked CSV reader that infers the schema once from the first chunk and yields coerced chunks.
+
+    `source` is a path or a binary file-like object. One `read_csv` reader is used for the
+    whole file, so quoted fields spanning several lines are parsed correctly.
+    """
+
+    def __init__(self, source, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self.total_bytes = source_size(source)
+        self.rows_read = 0
+        # Open paths ourselves so progress can be read from the handle
+        self._handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else None
+        self.source = self._handle if self._handle is not None else source
+
+        # Everything is read as text and converted by coerce_chunk, so every chunk gets the same types
+        self._reader = pd.read_csv(self.source, dtype=str, chunksize=chunk_rows)
+        first = next(self._reader)  # a header-only file still yields one empty chunk
+        self.columns = list(first.columns)
+        self.schema = infer_schema(first)
+        self._first = coerce_chunk(first, self.schema)
+
+    @property
+    def fraction_read(self):
+        """Approximate progress through the source (0..1)"""
+        if not self.total_bytes or not hasattr(self.source, 'tell') or getattr(self.source, 'closed', False):
+            return None
+        return min(1.0, self.source.tell() / self.total_bytes)
+
+    def __iter__(self):
+        first, self._first = self._first, None
+        if first is None:
+            raise RuntimeError("CsvChunkStream can only be iterated once")
+        try:
+            self.rows_read = len(first)
+            yield first
+            del first
+            for chunk in self._reader:
+                self.rows_read += len(chunk)
+                yield coerce_chunk(chunk, self.schema)
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the reader (and the file opened for a path); called once iteration ends"""
+        self._reader.close()
+        if self._handle is not None:
+            self._handle.close()
+
+    def ingest_into(self, dataset, progress=None):
+        """Upsert every chunk into a MergedDataset; progress(fraction, rows) is called per chunk"""
+        for chunk in self:
+            dataset.upsert(chunk)
+            if progress is not None:
+                progress(self.fraction_read, self.rows_read)
+        return self.rows_read
+
+
+def content_digest(source, block_size=1024 * 1024):
+    """SHA-256 of an upload's content, read block by block without copying the buffer"""
+    hasher = hashlib.sha256()
+    if hasattr(source, 'getbuffer'):
+        buffer = source.getbuffer()
+        for start in range(0, len(buffer), block_size):
+            hasher.update(buffer[start:start + block_size])
+        buffer.release()
+        return hasher.hexdigest()
+
+    with open(source, 'rb') if isinstance(source, (str, os.PathLike)) else _rewound(source) as handle:
+        for block in iter(lambda: handle.read(block_size), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+@contextmanager
+def _rewound(handle):
+    position = handle.tell()
+    handle.seek(0)
+    try:
+        yield handle
+    finally:
+        handle.seek(position)
+
+
+class IngestionLedger:
+    """Content-hash ledger of ingested uploads plus a small LRU cache of parsed frames"""
+
+    def __init__(self, max_cached_frames=8, accountant=None, max_cached_bytes=DEFAULT_SESSION_BUDGET_BYTES):
+        self.max_cached_frames = max_cached_frames
+        self.entries = {}             # digest -> summary of the ingested file
+        self._digests = {}            # upload identity -> digest, avoids re-hashing on reruns
+        self._handled = set()         # identities of uploads already ingested or counted as a hit
+        # digest -> parsed DataFrame; cold frames spill to disk over the session budget
+        self.buffers = SpillPool(accountant, max_bytes=max_cached_bytes, max_entries=max_cached_frames)
+        self.hits = 0
+        self.parse_cache_hits = 0
+        self.bytes_parsed = 0
+        self.parse_seconds = 0.0
+
+    @staticmethod
+    def _identity(uploaded_file):
+        return (getattr(uploaded_file, 'file_id', None), uploaded_file.name, source_size(uploaded_file))
+
+    def digest(self, uploaded_file):
+        """Content hash of an upload, computed once per uploaded file instance"""
+        identity = self._identity(uploaded_file)
+        if identity not in self._digests:
+            self._digests[identity] = content_digest(uploaded_file)
+        return self._digests[identity]
+
+    def is_ingested(self, digest, uploaded_file=None):
+        """True when this content was already applied.
+
+        A hit is counted once per upload event: files that stay in the uploader across
+        reruns (including the one that was ingested) are not counted again.
+        """
+        if digest not in self.entries:
+            return False
+        identity = self._identity(uploaded_file) if uploaded_file is not None else None
+        if identity not in self._handled:
+            self.hits += 1
+            if identity is not None:
+                self._handled.add(identity)
+        return True
+
+    def record(self, digest, summary, uploaded_file=None):
+        self.entries[digest] = summary
+        if uploaded_file is not None:
+            self._handled.add(self._identity(uploaded_file))
+
+    def cached_parse(self, digest):
+        df = self.buffers.get(digest)
+        if df is not None:
+            self.parse_cache_hits += 1
+        return df
+
+    def cache_parse(self, digest, df):
+        self.buffers.put(digest, df)
+
+    def account(self, nbytes, seconds):
+        """Add one parse's bytes and time (e.g. measured in a worker process)"""
+        self.parse_seconds += seconds
+        self.bytes_parsed += nbytes or 0
+
+    @contextmanager
+    def timing(self, nbytes):
+        """Account parse time and bytes for the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.account(nbytes, time.perf_counter() - start)
+
+    def forget_ingested(self):
+        """Mark everything as not ingested (parsed frames stay cached for re-ingestion)"""
+        self.entries = {}
+        self._handled = set()
+
+    @property
+    def stats(self):
+        return {
+            'files_ingested': len(self.entries),
+            'hits': self.hits,
+            'parse_cache_hits': self.parse_cache_hits,
+            'bytes_parsed': self.bytes_parsed,
+            'parse_seconds': self.parse_seconds
+        }
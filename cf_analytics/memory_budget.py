@@ -0,0 +1,249 @@
+"""Memory accounting with spill-to-disk for per-session upload buffers.
+
+Each session keeps its parsed uploads in a `SpillPool`. A pool tracks the
+in-memory size of its frames and, once it goes over the per-session budget,
+spills its least-recently-used frames to Arrow files on disk. The process-wide
+`MemoryAccountant` sums every live pool (plus any shared data it is told
+about, such as the dataset registry) and spills the coldest frames across all
+sessions when the global budget is exceeded. Spilled frames are reloaded
+lazily the next time they are requested.
+
+The merged datasets themselves cannot be spilled (every view reads them), so
+the budget is enforced on them at ingestion time: `reserve()` makes room by
+spilling buffers and reclaiming unused shared datasets, and refuses an upload
+with `MemoryError` when it still would not fit.
+
+Spilling needs pyarrow; without it cold frames are dropped instead (they are
+only parse caches and can be re-read from the upload).
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from .columnar_store import ColumnarStore
+
+MB = 1024 * 1024
+DEFAULT_SESSION_BUDGET_BYTES = int(float(os.environ.get('CF_SESSION_BUDGET_MB', 256)) * MB)
+DEFAULT_GLOBAL_BUDGET_BYTES = int(float(os.environ.get('CF_MEMORY_BUDGET_MB', 1024)) * MB)
+
+_spill_names = itertools.count(1)
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class SpillableFrame:
+    """A DataFrame that can be moved to an on-disk Arrow file and reloaded on demand"""
+
+    def __init__(self, df):
+        self._df = df
+        self.nbytes = frame_nbytes(df)
+        self.last_used = time.monotonic()
+        self._store = None
+        self._name = None
+        self._cleanup = None
+
+    @property
+    def resident(self):
+        return self._df is not None
+
+    @property
+    def spilled(self):
+        return self._df is None and self._name is not None
+
+    def load(self):
+        """The frame, read back from disk when it was spilled (None if it was dropped)"""
+        self.last_used = time.monotonic()
+        if self._df is None and self._name is not None:
+            self._df = self._store.load(self._name)
+        return self._df
+
+    def spill(self, store):
+        """Move the frame to `store` (or drop it when spilling is unavailable); returns bytes freed"""
+        if self._df is None:
+            return 0
+        if self._name is None and store is not None and store.available:
+            name = f"spill_{os.getpid()}_{next(_spill_names)}"
+            try:
+                saved = store.save(name, self._df)
+            except (TypeError, ValueError, OSError):  # e.g. mixed-type object columns Arrow cannot encode
+                saved = False
+            if saved:
+                self._store, self._name = store, name
+                self._cleanup = weakref.finalize(self, store.delete, name)
+        self._df = None
+        return self.nbytes
+
+    def discard(self):
+        self._df = None
+        if self._cleanup is not None:
+            self._cleanup()
+
+
+class SpillPool:
+    """One session's LRU of spillable frames with a resident-size budget"""
+
+    def __init__(self, accountant=None, max_bytes=DEFAULT_SESSION_BUDGET_BYTES, max_entries=None):
+        self.accountant = accountant
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._frames = OrderedDict()
+        self.spills = 0
+        self.reloads = 0
+        if accountant is not None:
+            accountant.register(self)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def get(self, key):
+        item = self._frames.get(key)
+        if item is None:
+            return None
+        self._frames.move_to_end(key)
+        was_spilled = item.spilled
+        df = item.load()
+        if df is None:
+            # Dropped without a spill file: behave like a cache miss
+            del self._frames[key]
+            return None
+        if was_spilled:
+            self.reloads += 1
+            self._enforce()
+        return df
+
+    def put(self, key, df):
+        if key in self._frames:
+            self._frames.pop(key).discard()
+        self._frames[key] = SpillableFrame(df)
+        while self.max_entries is not None and len(self._frames) > self.max_entries:
+            self._frames.popitem(last=False)[1].discard()
+        self._enforce()
+
+    def _enforce(self):
+        """Spill this session's coldest frames over its budget, then let the accountant check the global one"""
+        for key in list(self._frames):
+            if self.resident_bytes <= self.max_bytes:
+                break
+            # The most recently used frame always stays in memory
+            if key != next(reversed(self._frames)):
+                self.spill_frame(self._frames[key])
+        if self.accountant is not None:
+            self.accountant.enforce()
+
+    def spill_frame(self, item):
+        store = self.accountant.spill_store if self.accountant is not None else None
+        freed = item.spill(store)
+        if freed:
+            self.spills += 1
+        return freed
+
+    def resident_items(self):
+        return [item for item in self._frames.values() if item.resident]
+
+    @property
+    def resident_bytes(self):
+        return sum(item.nbytes for item in self._frames.values() if item.resident)
+
+    @property
+    def spilled_bytes(self):
+        return sum(item.nbytes for item in self._frames.values() if item.spilled)
+
+    def clear(self):
+        for item in self._frames.values():
+            item.discard()
+        self._frames.clear()
+
+    @property
+    def stats(self):
+        return {
+            'frames': len(self._frames),
+            'resident_bytes': self.resident_bytes,
+            'spilled_bytes': self.spilled_bytes,
+            'max_bytes': self.max_bytes,
+            'spills': self.spills,
+            'reloads': self.reloads
+        }
+
+
+class MemoryAccountant:
+    """Process-wide accounting across every session's pool, with a global budget"""
+
+    def __init__(self, max_bytes=DEFAULT_GLOBAL_BUDGET_BYTES, spill_dir=None, shared_usage=None, reclaim_shared=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir or os.environ.get('CF_SPILL_DIR')
+        if self.spill_dir is None:
+            # Own temporary directory: removed with the accountant, or at interpreter exit
+            self.spill_dir = tempfile.mkdtemp(prefix='cf_spill_')
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        self.spill_store = ColumnarStore(self.spill_dir)
+        self.shared_usage = shared_usage  # callable returning bytes held outside the pools
+        self.reclaim_shared = reclaim_shared  # callable(nbytes) freeing unused shared data, returns bytes freed
+        self.refused = 0
+        self._pools = weakref.WeakSet()
+        self._lock = threading.RLock()
+
+    def register(self, pool):
+        with self._lock:
+            self._pools.add(pool)
+
+    def session_bytes(self):
+        with self._lock:
+            return sum(pool.resident_bytes for pool in list(self._pools))
+
+    def total_bytes(self):
+        return self.session_bytes() + (self.shared_usage() if self.shared_usage is not None else 0)
+
+    def reserve(self, nbytes, what='this upload'):
+        """Make room for `nbytes` more under the global budget, or raise MemoryError.
+
+        Spills session buffers first, then asks the shared data to drop what no session uses.
+        """
+        with self._lock:
+            self.enforce(nbytes)
+            excess = self.total_bytes() + nbytes - self.max_bytes
+            if excess > 0 and self.reclaim_shared is not None:
+                excess -= self.reclaim_shared(excess)
+            if excess > 0:
+                self.refused += 1
+                raise MemoryError(
+                    f"Not enough memory for {what}: it needs about {nbytes / MB:,.1f} MB and the "
+                    f"{self.max_bytes / MB:,.0f} MB budget is {excess / MB:,.1f} MB short "
+                    "(see CF_MEMORY_BUDGET_MB)"
+                )
+
+    def enforce(self, extra=0):
+        """Spill the coldest resident frames across all sessions until the global budget
+        (less `extra` bytes about to be allocated) is met"""
+        with self._lock:
+            excess = self.total_bytes() + extra - self.max_bytes
+            if excess <= 0:
+                return
+            candidates = sorted(
+                ((item.last_used, id(item), pool, item) for pool in list(self._pools) for item in pool.resident_items()),
+                key=lambda candidate: candidate[:2]
+            )
+            for _, _, pool, item in candidates:
+                if excess <= 0:
+                    break
+                excess -= pool.spill_frame(item)
+
+    @property
+    def stats(self):
+        with self._lock:
+            pools = list(self._pools)
+            return {
+                'sessions': len(pools),
+                'session_bytes': sum(pool.resident_bytes for pool in pools),
+                'spilled_bytes': sum(pool.spilled_bytes for pool in pools),
+                'shared_bytes': self.shared_usage() if self.shared_usage is not None else 0,
+                'max_bytes': self.max_bytes,
+                'refused': self.refused,
+                'spill_dir': self.spill_dir
+            }
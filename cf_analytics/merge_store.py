@@ -0,0 +1,325 @@
+"""Incremental, date-indexed merge store for base data plus uploaded files.
+
+`MergedDataset` keeps a sorted index of date keys pointing into the frames it
+has received (the base frame and every upload). Each upload is applied as an
+upsert against that index, and the merged frame is only rebuilt when the data
+actually changed, as signalled by `version`. Versions come from a process-wide
+counter, so they never repeat even when a dataset is recreated.
+
+With `key_cols` (e.g. store and channel) rows are keyed by timestamp *and*
+those columns: each combination of values gets a stable code, kept in a second
+index array that orders rows within a timestamp. An upload for one store
+replaces that store's rows only, while the primary keys still sort by date and
+`date_slice` keeps working by binary search. Rows without any key column value
+cannot be merged into data that has them (the 'All' view would average the two
+levels); rows with values replace the dimension-less rows of their days.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+def date_keys(dates):
+    """Return datetime values as sortable int64 nanosecond keys"""
+    return np.asarray(dates, dtype='datetime64[ns]').view(np.int64)
+
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+_versions = itertools.count(1)
+
+
+class MergedDataset:
+    """Base data plus uploads, merged by date with uploaded rows taking precedence"""
+
+    def __init__(self, base_df, date_col='date', compact=None, key_cols=()):
+        self.date_col = date_col
+        self.compact = compact  # optional dtype normalization applied to every materialized frame
+        self.key_cols = tuple(key_cols)
+        self.version = next(_versions)
+        self._base_df = base_df
+        self._load_base()
+
+    def _load_base(self):
+        base = self._normalize(self._base_df)
+        if self.compact is not None:
+            base = self.compact(base)
+        self._combo_codes = {}
+        codes = self._row_codes(base, check=False)
+        keys = date_keys(base[self.date_col])
+        order = np.lexsort((codes, keys))
+        if np.array_equal(order, np.arange(len(order))):
+            # Already sorted (e.g. a persisted merged frame): keep its memory-mapped columns uncopied
+            base = base.reset_index(drop=True)
+        else:
+            base = base.iloc[order].reset_index(drop=True)
+
+        self._chunks = [base]
+        self._size = len(base)
+        self._keys = keys[order]
+        self._codes = codes[order]
+        self._chunk_ids = np.zeros(self._size, dtype=np.int32)
+        self._row_ids = np.arange(self._size, dtype=np.int64)
+        self._frame = base
+        self._frame_version = self.version
+
+    def _normalize(self, df):
+        """Parse the date column once and drop rows whose date could not be parsed"""
+        if not pd.api.types.is_datetime64_any_dtype(df[self.date_col]):
+            df = df.copy()
+            df[self.date_col] = pd.to_datetime(df[self.date_col], errors='coerce')
+        if df[self.date_col].isna().any():
+            df = df[df[self.date_col].notna()]
+        return df
+
+    def _row_codes(self, df, check=True):
+        """Stable code of each row's combination of key column values (0 when all are missing,
+        numbered as first seen).
+
+        With `check`, rows without key values are rejected once the dataset holds rows with them.
+        """
+        codes = np.zeros(len(df), dtype=np.int32)
+        present = [column for column in self.key_cols if column in df.columns]
+        if check and self._combo_codes and (not present or df[present].isna().all(axis=1).any()):
+            raise ValueError(f"Rows without {'/'.join(self.key_cols)} values cannot be merged into data "
+                             "that has them; add the columns or clear the data first")
+        if not present or df.empty:
+            return codes
+
+        # One mixed-radix number per row over the per-column value codes, then one dict lookup per combination
+        mixed = np.zeros(len(df), dtype=np.int64)
+        uniques = []
+        for column in present:
+            column_codes, values = pd.factorize(df[column])
+            mixed = mixed * (len(values) + 1) + (column_codes + 1)
+            uniques.append(values)
+        combos, inverse = np.unique(mixed, return_inverse=True)
+        mapped = np.zeros(len(combos), dtype=np.int32)
+        for i, combo in enumerate(combos.tolist()):
+            values = {}
+            for column, column_values in zip(reversed(present), reversed(uniques)):
+                combo, code = divmod(combo, len(column_values) + 1)
+                if code:
+                    values[column] = column_values[code - 1]
+            if values:
+                label = tuple(values.get(column) for column in self.key_cols)
+                mapped[i] = self._combo_codes.setdefault(label, len(self._combo_codes) + 1)
+        return mapped[inverse.ravel()]
+
+    def _locate(self, sorted_keys, sorted_codes, keys, codes):
+        """[lo, hi) positions of each (key, code) pair among rows sorted by (key, code)"""
+        lo = np.searchsorted(sorted_keys, keys, side='left')
+        hi = np.searchsorted(sorted_keys, keys, side='right')
+        if not self.key_cols or not len(sorted_keys):
+            return lo, hi
+        # Codes are sorted within each run of equal keys: offsetting them by the run's start makes one
+        # sorted array, so a single binary search finds the code inside its run
+        radix = int(max(sorted_codes.max(), codes.max())) + 1
+        run_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        run_of_row = np.repeat(run_starts, np.diff(np.r_[run_starts, len(sorted_keys)]))
+        combined = run_of_row * radix + sorted_codes
+        found = hi > lo
+        targets = lo[found] * radix + codes[found]
+        lo[found] = np.searchsorted(combined, targets, side='left')
+        hi[found] = np.searchsorted(combined, targets, side='right')
+        return lo, hi
+
+    def _superseded_rows(self, keys, codes):
+        """Mask of live dimension-less rows on the days of keyed uploaded rows (None when there are none)"""
+        if not self.key_cols or not self._size or not codes.any():
+            return None
+        dimensionless = self.codes == 0
+        if not dimensionless.any():
+            return None
+        upload_days = np.unique(keys[codes > 0] // NS_PER_DAY)
+        superseded = dimensionless & np.isin(self.keys // NS_PER_DAY, upload_days)
+        return superseded if superseded.any() else None
+
+    def _reserve(self, extra):
+        """Grow the index buffers geometrically so tail appends stay amortized O(new rows)"""
+        needed = self._size + extra
+        if needed <= len(self._keys):
+            return
+        capacity = max(needed, 2 * len(self._keys), 16)
+        for name in ('_keys', '_codes', '_chunk_ids', '_row_ids'):
+            old = getattr(self, name)
+            grown = np.empty(capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def keys(self):
+        """Sorted date keys of the live rows (a view, do not modify)"""
+        return self._keys[:self._size]
+
+    @property
+    def codes(self):
+        """Key column combination codes of the live rows, sorted within equal date keys (a view)"""
+        return self._codes[:self._size]
+
+    @property
+    def date_index(self):
+        """Sorted DatetimeIndex over the live rows (shares memory with the key index)"""
+        return pd.DatetimeIndex(self.keys.view('datetime64[ns]'))
+
+    def date_slice(self, start=None, end=None):
+        """Rows dated start..end (whole days, inclusive) found by binary search on the sorted keys.
+
+        Returns a positional slice of the merged frame rather than a masked copy, so the
+        cost is O(log n) regardless of how much history is loaded.
+        """
+        frame = self.frame
+        keys = self.keys
+        lo = 0
+        hi = len(keys)
+        if start is not None:
+            lo = np.searchsorted(keys, date_keys([pd.Timestamp(start).normalize()])[0], side='left')
+        if end is not None:
+            next_day = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+            hi = np.searchsorted(keys, date_keys([next_day])[0], side='left')
+        return frame.iloc[lo:max(lo, hi)]
+
+    def upsert(self, new_df):
+        """Apply an upload: rows replace existing rows with the same timestamp (and key column
+        values), new ones are inserted.
+
+        Cost is O(new rows) for uploads that only overwrite existing rows or extend the
+        history forward; inserting rows into the middle of the history also shifts the
+        (integer) index arrays. Returns True when the data changed. Raises ValueError for
+        rows without key column values when the dataset has them.
+        """
+        if new_df is None or new_df.empty or self.date_col not in new_df.columns:
+            return False
+        new_df = self._normalize(new_df)
+        if new_df.empty:
+            return False
+
+        # Within one upload the last row for a timestamp (and key values) wins, as across uploads
+        new_codes = self._row_codes(new_df)
+        new_keys = date_keys(new_df[self.date_col])
+        order = np.lexsort((new_codes, new_keys))
+        sorted_keys = new_keys[order]
+        sorted_codes = new_codes[order]
+        is_last = np.ones(len(sorted_keys), dtype=bool)
+        is_last[:-1] = (sorted_keys[1:] != sorted_keys[:-1]) | (sorted_codes[1:] != sorted_codes[:-1])
+        order = order[is_last]
+        sorted_keys = sorted_keys[is_last]
+        sorted_codes = sorted_codes[is_last]
+
+        chunk_id = len(self._chunks)
+        self._chunks.append(new_df.reset_index(drop=True))
+
+        keys = self.keys
+        codes = self.codes
+        superseded = self._superseded_rows(sorted_keys, sorted_codes)
+        extends = superseded is None and (self._size == 0 or
+                                          (sorted_keys[0], sorted_codes[0]) > (keys[-1], codes[-1]))
+        if not extends:
+            lo, hi = self._locate(keys, codes, sorted_keys, sorted_codes)
+            matched = hi - lo
+
+        if extends:
+            # Fast path: upload extends the history forward
+            self._reserve(len(sorted_keys))
+            end = self._size + len(sorted_keys)
+            self._keys[self._size:end] = sorted_keys
+            self._codes[self._size:end] = sorted_codes
+            self._chunk_ids[self._size:end] = chunk_id
+            self._row_ids[self._size:end] = order
+            self._size = end
+        elif superseded is None and np.all(matched == 1):
+            # Fast path: every uploaded row replaces exactly one existing row
+            self._chunk_ids[lo] = chunk_id
+            self._row_ids[lo] = order
+        else:
+            # General path: drop all rows matching the uploaded ones, insert the new ones
+            keep = np.ones(self._size, dtype=bool) if superseded is None else ~superseded
+            for start, stop in zip(lo[matched > 0], hi[matched > 0]):
+                keep[start:stop] = False
+            kept_keys = keys[keep]
+            kept_codes = codes[keep]
+            positions, _ = self._locate(kept_keys, kept_codes, sorted_keys, sorted_codes)
+            self._keys = np.insert(kept_keys, positions, sorted_keys)
+            self._codes = np.insert(kept_codes, positions, sorted_codes)
+            self._chunk_ids = np.insert(self._chunk_ids[:self._size][keep], positions, chunk_id)
+            self._row_ids = np.insert(self._row_ids[:self._size][keep], positions, order)
+            self._size = len(self._keys)
+
+        self.version = next(_versions)
+        return True
+
+    def fork(self):
+        """Independent copy that shares this dataset's merged frame (only the index arrays are copied).
+
+        Upserting into the fork never touches this dataset, so a shared dataset can be
+        extended copy-on-write.
+        """
+        frame = self.frame
+        clone = MergedDataset.__new__(MergedDataset)
+        clone.date_col = self.date_col
+        clone.compact = self.compact
+        clone.key_cols = self.key_cols
+        clone._combo_codes = dict(self._combo_codes)
+        clone._base_df = self._base_df
+        clone._chunks = [frame]
+        clone._size = self._size
+        clone._keys = self.keys.copy()
+        clone._codes = self.codes.copy()
+        clone._chunk_ids = np.zeros(self._size, dtype=np.int32)
+        clone._row_ids = np.arange(self._size, dtype=np.int64)
+        clone._frame = frame
+        clone.version = next(_versions)
+        clone._frame_version = clone.version
+        return clone
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the merged frame and the index arrays"""
+        return (int(self.frame.memory_usage(index=True, deep=True).sum()) +
+                self._keys.nbytes + self._codes.nbytes + self._chunk_ids.nbytes + self._row_ids.nbytes)
+
+    def reset(self):
+        """Drop every upload and return to the base data"""
+        self._load_base()
+        self.version = next(_versions)
+        self._frame_version = self.version
+
+    @property
+    def frame(self):
+        """Merged DataFrame sorted by date, rebuilt at most once per version"""
+        if self._frame_version != self.version:
+            self._frame = self._materialize()
+            if self.compact is not None:
+                self._frame = self.compact(self._frame)
+            self._frame_version = self.version
+            # Compact: the materialized frame becomes the only chunk
+            self._chunks = [self._frame]
+            self._keys = self._keys[:self._size].copy()
+            self._codes = self._codes[:self._size].copy()
+            self._chunk_ids = np.zeros(self._size, dtype=np.int32)
+            self._row_ids = np.arange(self._size, dtype=np.int64)
+        return self._frame
+
+    def _materialize(self):
+        chunk_ids = self._chunk_ids[:self._size]
+        row_ids = self._row_ids[:self._size]
+        parts = []
+        positions = []
+        for chunk_index, chunk in enumerate(self._chunks):
+            selected = np.flatnonzero(chunk_ids == chunk_index)
+            if selected.size:
+                parts.append(chunk.iloc[row_ids[selected]])
+                positions.append(selected)
+        if not parts:
+            return self._chunks[0].iloc[:0]
+
+        combined = pd.concat(parts, ignore_index=True)
+        # Inverse permutation puts every gathered row back at its sorted position in O(n)
+        inverse = np.empty(self._size, dtype=np.int64)
+        inverse[np.concatenate(positions)] = np.arange(self._size)
+        return combined.iloc[inverse].reset_index(drop=True)
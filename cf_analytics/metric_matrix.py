@@ -0,0 +1,113 @@
+"""Compact array-backed store for the daily survey metrics.
+
+`DailyMetricMatrix` keeps every metric in one contiguous float32 matrix of
+days x metrics over a shared, gap-free daily date axis, so a date maps to its
+row with simple arithmetic and cross-metric questions ("how many metrics were
+below target on each day?") are single vectorized reductions instead of one
+DataFrame per metric.
+"""
+import numpy as np
+
+from .survey_metrics import DEFAULT_TARGET
+
+
+def _days_between(first_day, last_day):
+    return int((last_day - first_day).astype(np.int64))
+
+
+class DailyMetricMatrix:
+    """float32 matrix of days x metrics; missing values are NaN"""
+
+    def __init__(self, metrics):
+        self.metrics = list(metrics)
+        self._columns = {metric: i for i, metric in enumerate(self.metrics)}
+        self.start = None
+        self.values = np.full((0, len(self.metrics)), np.nan, dtype=np.float32)
+
+    @classmethod
+    def from_frame(cls, df, metrics, date_col='date'):
+        matrix = cls(metrics)
+        matrix.fill(df, date_col)
+        return matrix
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def dates(self):
+        """Shared date axis (datetime64[D]), one entry per matrix row"""
+        if self.start is None:
+            return np.array([], dtype='datetime64[D]')
+        return self.start + np.arange(len(self.values))
+
+    def positions(self, dates):
+        """Row index of each date (may fall outside the matrix for unknown dates)"""
+        days = np.asarray(dates, dtype='datetime64[D]')
+        return (days - self.start).astype(np.int64)
+
+    def _ensure_range(self, first_day, last_day):
+        """Grow the date axis (reallocating once) so first_day..last_day have rows"""
+        if self.start is None:
+            self.start = first_day
+            self.values = np.full((_days_between(first_day, last_day) + 1, len(self.metrics)), np.nan, dtype=np.float32)
+            return
+        end = self.start + len(self.values) - 1
+        if first_day >= self.start and last_day <= end:
+            return
+        new_start = min(first_day, self.start)
+        new_end = max(last_day, end)
+        grown = np.full((_days_between(new_start, new_end) + 1, len(self.metrics)), np.nan, dtype=np.float32)
+        offset = _days_between(new_start, self.start)
+        grown[offset:offset + len(self.values)] = self.values
+        self.start = new_start
+        self.values = grown
+
+    def fill(self, df, date_col='date'):
+        """Write every metric column of `df` (matched by name) at its dates.
+
+        Rows sharing a day are averaged, and missing values never overwrite existing data.
+        Returns the number of distinct days written.
+        """
+        columns = [metric for metric in self.metrics if metric in df.columns]
+        if not columns or df.empty:
+            return 0
+
+        days = df[date_col].to_numpy(dtype='datetime64[D]')
+        known = ~np.isnat(days)
+        if not known.any():
+            return 0
+        days = days[known]
+        self._ensure_range(days.min(), days.max())
+
+        rows, inverse = np.unique(self.positions(days), return_inverse=True)
+        for metric in columns:
+            column = df[metric].to_numpy(dtype=np.float64, na_value=np.nan)[known]
+            valid = ~np.isnan(column)
+            sums = np.bincount(inverse, weights=np.where(valid, column, 0.0), minlength=len(rows))
+            counts = np.bincount(inverse, weights=valid, minlength=len(rows))
+            has_value = counts > 0
+            self.values[rows[has_value], self._columns[metric]] = sums[has_value] / counts[has_value]
+        return len(rows)
+
+    def column(self, metric):
+        """One metric's daily values (a view into the matrix)"""
+        return self.values[:, self._columns[metric]]
+
+    def target_row(self, targets=None):
+        return np.array([(targets or {}).get(metric, DEFAULT_TARGET) for metric in self.metrics], dtype=np.float32)
+
+    def below_target_counts(self, targets=None):
+        """Number of metrics below target on each day"""
+        return np.count_nonzero(self.values < self.target_row(targets), axis=1)
+
+    def tracked_counts(self):
+        """Number of metrics with a value on each day"""
+        return np.count_nonzero(~np.isnan(self.values), axis=1)
+
+    def lookup(self, dates, per_day):
+        """Gather a per-day array at the given dates (-1 where a date is outside the matrix)"""
+        positions = self.positions(dates)
+        inside = (positions >= 0) & (positions < len(self.values))
+        result = np.full(len(positions), -1, dtype=per_day.dtype)
+        result[inside] = per_day[positions[inside]]
+        return result
@@ -0,0 +1,211 @@
+"""Load, ingest, filter, aggregate and score the survey data without a UI.
+
+These are the steps the dashboard runs on every session, as plain functions
+over the package's data structures. Nothing here imports Streamlit or Plotly,
+so nightly jobs and the `python -m cf_analytics` CLI get the same numbers as
+the dashboard without starting it.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .columnar_store import ColumnarStore
+from .data_generator import generate_daily_data
+from .dimension_slices import ALL_SLICE, DIMENSION_COLUMNS, DimensionSlices
+from .frame_layout import compact_daily, compact_events
+from .ingestion import CsvChunkStream, UploadParser, should_stream
+from .merge_store import MergedDataset
+from .metric_matrix import DailyMetricMatrix
+from .risk_engine import DEFAULT_HIGH_GAP, DEFAULT_MEDIUM_GAP, RiskEngine
+from .rollup_cube import RollupCube
+from .survey_metrics import METRIC_COLUMNS, METRIC_NAMES, METRIC_OFFSETS, metric_targets
+
+SAMPLE_START = datetime(2025, 5, 30)
+SAMPLE_END = datetime(2025, 9, 30)
+
+
+def sample_daily_data():
+    """Generated daily scores of every survey metric from May 30 to Sept 30, 2025"""
+    # Weekend, promotion and special-event effects are applied with vectorized date masks
+    daily_df = generate_daily_data(SAMPLE_START, SAMPLE_END, seed=42)
+
+    # The other seven survey metrics use their own random stream so satisfaction_score is unchanged
+    other_metrics = METRIC_COLUMNS[1:]
+    metrics_df = generate_daily_data(SAMPLE_START, SAMPLE_END, metrics=other_metrics, seed=7,
+                                     metric_offsets=METRIC_OFFSETS)
+    daily_df[other_metrics] = metrics_df[other_metrics]
+    return daily_df
+
+
+def empty_events():
+    """Events frame without rows: events are detected from the daily data (see event_detection.py),
+    and the events dataset only holds uploaded events files"""
+    return pd.DataFrame({
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'day_of_week': pd.Series(dtype=object),
+        'failed_metrics': pd.Series(dtype=object),
+        'failure_percentage': pd.Series(dtype=np.float64),
+        'promotion': pd.Series(dtype=object),
+        'severity': pd.Series(dtype=object)
+    })
+
+
+def load_data(store=None):
+    """(daily, events) frames in the compact layout (see frame_layout.py).
+
+    Datasets persisted in `store` (default: the CF_DATA_DIR columnar store) are
+    memory-mapped and used as the base; missing ones fall back to the sample data.
+    """
+    store = ColumnarStore() if store is None else store
+    daily_df = store.load("daily") if store.exists("daily") else sample_daily_data()
+    events_df = store.load("events") if store.exists("events") else empty_events()
+    return compact_daily(daily_df), compact_events(events_df)
+
+
+def daily_dataset(daily_df):
+    """Merged daily dataset keyed by day and store/channel/region"""
+    return MergedDataset(daily_df, compact=compact_daily, key_cols=DIMENSION_COLUMNS)
+
+
+def events_dataset(events_df):
+    return MergedDataset(events_df, compact=compact_events)
+
+
+def classify_upload(name, columns):
+    """(target, file type, problem) of an upload from its columns and file name.
+
+    `target` is 'daily' or 'events'; it is None when the file cannot be used, with
+    `problem` saying why (`file_type` is also None when the type is unknown).
+    """
+    lowered = name.lower()
+    if 'satisfaction_score' in columns or 'daily' in lowered:
+        if 'date' not in columns:
+            return None, 'Daily Data', "Daily data files must include a 'date' column"
+        return 'daily', 'Daily Data', None
+    if 'severity' in columns or 'event' in lowered:
+        if 'date' not in columns:
+            return None, 'Events Data', "Events data files must include a 'date' column"
+        return 'events', 'Events Data', None
+    if 'date' in columns and len(columns) >= 3:
+        # Default to daily data if ambiguous
+        return 'daily', 'Daily Data (auto-detected)', None
+    return None, None, ("Could not determine file type. Include 'satisfaction_score' for daily data "
+                        "or 'severity' for events data.")
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as handle:
+        return handle.read()
+
+
+def ingest_files(datasets, paths, parser=None):
+    """Upsert CSV/Excel files into `datasets` ({'daily': ..., 'events': ...}) in the given order.
+
+    Files are parsed concurrently by `parser` (an UploadParser); large CSVs are streamed
+    in chunks instead. A file that cannot be read, classified or merged is skipped. Returns one
+    summary per file, with an 'error' entry for skipped files.
+    """
+    parser = UploadParser() if parser is None else parser
+    to_parse = [path for path in paths if not should_stream(path)]
+    results = dict(zip(to_parse, parser.parse([(os.path.basename(path), _read_bytes(path)) for path in to_parse])))
+
+    summaries = []
+    for path in paths:
+        name = os.path.basename(path)
+        result = results.get(path)
+        if result is not None and not result.ok:
+            summaries.append({'name': name, 'error': f"could not be read ({result.error})"})
+            continue
+        stream = CsvChunkStream(path) if result is None else None
+        columns = stream.columns if stream is not None else list(result.df.columns)
+        target, file_type, problem = classify_upload(name, columns)
+        if target is None:
+            if stream is not None:
+                stream.close()
+            summaries.append({'name': name, 'error': problem})
+            continue
+        # Streamed chunks go into a copy so a file failing halfway leaves no partial rows
+        dataset = datasets[target].fork() if stream is not None else datasets[target]
+        try:
+            if stream is not None:
+                rows = stream.ingest_into(dataset)
+            else:
+                dataset.upsert(result.df)
+                rows = len(result.df)
+        except ValueError as exc:
+            summaries.append({'name': name, 'error': str(exc)})
+            continue
+        datasets[target] = dataset
+        summaries.append({'name': name, 'type': file_type, 'rows': rows, 'columns': len(columns),
+                          'parse_seconds': round(result.seconds, 3) if result is not None else None})
+    return summaries
+
+
+def save_datasets(datasets, store=None):
+    """Persist merged datasets to the columnar store so the dashboard starts from them"""
+    store = ColumnarStore() if store is None else store
+    return {name: store.save(name, dataset.frame) for name, dataset in datasets.items()}
+
+
+def build_dimension_slices(daily_df):
+    return DimensionSlices(daily_df, METRIC_COLUMNS)
+
+
+def filter_daily(slices, dimension=ALL_SLICE, start=None, end=None, month=None):
+    """Per-day rows of one store/channel slice, optionally limited to start..end and a month label"""
+    if start is not None or end is not None:
+        frame = slices.date_slice(dimension, start, end)
+    else:
+        frame = slices.frame(dimension)
+    if month is not None:
+        frame = frame[frame['month'] == month]
+    return frame
+
+
+def build_rollup(daily_df):
+    return RollupCube(daily_df, METRIC_COLUMNS, metric_targets())
+
+
+def build_metric_matrix(daily_df):
+    return DailyMetricMatrix.from_frame(daily_df, METRIC_COLUMNS)
+
+
+def aggregate(daily_df, granularity='month', metric=None):
+    """Mean of every metric per period, or with `metric` that metric's full period statistics"""
+    cube = build_rollup(daily_df)
+    if metric is not None:
+        return cube.frame(granularity, metric)
+    means = cube.means(granularity).dropna(how='all')
+    return means.rename_axis('period_start').reset_index()
+
+
+def detect_events(detector, matrix, uploaded_events):
+    """Events detected from `matrix` (incrementally, see EventDetector.update), with the uploaded
+    events taking precedence on their dates"""
+    detector.update(matrix)
+    dataset = MergedDataset(detector.events(), compact=compact_events)
+    dataset.upsert(uploaded_events)
+    return dataset
+
+
+def day_type_segments(frame):
+    return np.where(frame['date'].dt.dayofweek.to_numpy() >= 5, 'Weekend', 'Weekday')
+
+
+def build_risk_engine(daily_df):
+    """Monthly gap, trend slope and volatility of every metric for all days, weekdays and weekends"""
+    return RiskEngine(daily_df, METRIC_COLUMNS, metric_targets(), segments=day_type_segments(daily_df))
+
+
+def risk_summary(engine, medium_gap=DEFAULT_MEDIUM_GAP, high_gap=DEFAULT_HIGH_GAP):
+    """One row per segment and metric with data, metrics under their display names"""
+    summaries = []
+    for segment in engine.segments:
+        summary = engine.summary(segment, medium_gap, high_gap)
+        summary.insert(0, 'Segment', segment)
+        summaries.append(summary)
+    summary = pd.concat(summaries, ignore_index=True)
+    summary.insert(1, 'Metric', summary.pop('metric').map(METRIC_NAMES))
+    return summary
@@ -0,0 +1,190 @@
+"""Vectorized risk scoring for every metric x period x segment.
+
+`RiskEngine` bins the daily rows by (segment, period) once and accumulates
+count, sum and sum of squares for every metric with `np.bincount`, giving
+arrays shaped segments x periods x metrics. Period means, the gap to target,
+within-period volatility and a rolling least-squares trend slope all follow
+from those arrays without touching the rows again. The first segment is
+always 'All' (the sum over the other segments).
+
+Risk levels are not stored: `risk_levels()` classifies gaps against the
+thresholds passed in, so changing the thresholds never re-scans the data.
+"""
+import numpy as np
+import pandas as pd
+
+from .rollup_cube import period_codes, period_starts
+from .survey_metrics import DEFAULT_TARGET
+
+RISK_LEVELS = np.array(['Low Risk', 'Medium Risk', 'High Risk'], dtype=object)
+DEFAULT_MEDIUM_GAP = 0.2
+DEFAULT_HIGH_GAP = 0.5
+DEFAULT_TREND_WINDOW = 3
+ALL_SEGMENTS = 'All'
+
+
+def risk_levels(gaps, medium_gap=DEFAULT_MEDIUM_GAP, high_gap=DEFAULT_HIGH_GAP):
+    """'High Risk' above high_gap, 'Medium Risk' above medium_gap, else 'Low Risk' (NaN gaps are low)"""
+    gaps = np.asarray(gaps, dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        return RISK_LEVELS[(gaps > medium_gap).astype(np.int8) + (gaps > high_gap)]
+
+
+def _window_sums(values, window):
+    """Sums over the trailing `window` entries along axis 1 (shorter at the start)"""
+    cumulative = np.cumsum(values, axis=1)
+    shifted = np.zeros_like(cumulative)
+    shifted[:, window:] = cumulative[:, :-window]
+    return cumulative - shifted
+
+
+def least_squares_slope(means, window=None):
+    """Slope of a least-squares line through the non-NaN means along axis 1.
+
+    With `window`, the slope at each period uses the trailing `window` periods;
+    without it, one slope per row over all periods. Needs two points, else NaN.
+    """
+    valid = ~np.isnan(means)
+    x = np.broadcast_to(np.arange(means.shape[1], dtype=np.float64).reshape(1, -1, 1), means.shape)
+    y = np.where(valid, means, 0.0)
+    x = np.where(valid, x, 0.0)
+    terms = (valid.astype(np.float64), x, y, x * y, x * x)
+    if window is None:
+        n, sx, sy, sxy, sxx = (term.sum(axis=1) for term in terms)
+    else:
+        n, sx, sy, sxy, sxx = (_window_sums(term, window) for term in terms)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (n * sxy - sx * sy) / denominator
+    return np.where((n >= 2) & (denominator > 0), slope, np.nan)
+
+
+class RiskEngine:
+    """Gap, volatility and trend of every metric per period and segment, from one pass over the rows"""
+
+    def __init__(self, daily_df, metrics, targets=None, granularity='month', segments=None,
+                 trend_window=DEFAULT_TREND_WINDOW, date_col='date'):
+        self.metrics = [metric for metric in metrics if metric in daily_df.columns]
+        self.granularity = granularity
+        self.trend_window = trend_window
+        self.target_row = np.array([(targets or {}).get(metric, DEFAULT_TARGET) for metric in self.metrics])
+
+        dates = daily_df[date_col].to_numpy(dtype='datetime64[ns]')
+        known = ~np.isnat(dates)
+        codes = period_codes(dates.view(np.int64), granularity)
+        first_code = codes[known].min() if known.any() else 0
+        n_periods = int(codes[known].max() - first_code + 1) if known.any() else 0
+        self.periods = period_starts(np.arange(first_code, first_code + n_periods), granularity)
+
+        # Segment 0 is 'All'; row segments are numbered from 1
+        if segments is None:
+            segment_codes = np.zeros(len(daily_df), dtype=np.int64)
+            labels = []
+        else:
+            segment_codes, labels = pd.factorize(pd.Series(segments), sort=True)
+        self.segments = [ALL_SEGMENTS] + [str(label) for label in labels]
+        n_row_segments = max(len(labels), 1)
+        usable = known & (segment_codes >= 0)
+
+        bins = segment_codes[usable] * n_periods + (codes[usable] - first_code)
+        n_bins = n_row_segments * n_periods
+        shape = (n_row_segments, n_periods, len(self.metrics))
+        count = np.zeros(shape)
+        total = np.zeros(shape)
+        total_sq = np.zeros(shape)
+        for i, metric in enumerate(self.metrics):
+            column = pd.to_numeric(daily_df[metric], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)[usable]
+            valid = ~np.isnan(column)
+            filled = np.where(valid, column, 0.0)
+            count[..., i] = np.bincount(bins, weights=valid, minlength=n_bins).reshape(shape[:2])
+            total[..., i] = np.bincount(bins, weights=filled, minlength=n_bins).reshape(shape[:2])
+            total_sq[..., i] = np.bincount(bins, weights=filled * filled, minlength=n_bins).reshape(shape[:2])
+        if segments is not None:
+            count, total, total_sq = (np.concatenate([array.sum(axis=0, keepdims=True), array])
+                                      for array in (count, total, total_sq))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = total / count
+            variance = total_sq / count - self.mean * self.mean
+        self.count = count.astype(np.int64)
+        self.volatility = np.sqrt(np.clip(variance, 0, None))  # std of the rows within each period
+        self.gap = self.target_row - self.mean
+        self.slope = least_squares_slope(self.mean, trend_window)  # score change per period, trailing window
+
+    def _index(self, segment, metric):
+        return self.segments.index(segment), self.metrics.index(metric)
+
+    def has_data(self, metric, segment=ALL_SEGMENTS):
+        if metric not in self.metrics or segment not in self.segments:
+            return False
+        s, m = self._index(segment, metric)
+        return bool(self.count[s, :, m].any())
+
+    def metric_frame(self, metric, segment=ALL_SEGMENTS, medium_gap=DEFAULT_MEDIUM_GAP, high_gap=DEFAULT_HIGH_GAP):
+        """Per-period scores and risk of one metric in one segment (periods without data are dropped)"""
+        s, m = self._index(segment, metric)
+        result = pd.DataFrame({
+            'period_start': pd.DatetimeIndex(self.periods),
+            'count': self.count[s, :, m],
+            'Score': self.mean[s, :, m],
+            'Target': self.target_row[m],
+            'Gap': self.gap[s, :, m],
+            'Trend_Slope': self.slope[s, :, m],
+            'Volatility': self.volatility[s, :, m],
+            'Risk_Level': risk_levels(self.gap[s, :, m], medium_gap, high_gap)
+        })
+        return result[result['count'] > 0].reset_index(drop=True)
+
+    def summary(self, segment=ALL_SEGMENTS, medium_gap=DEFAULT_MEDIUM_GAP, high_gap=DEFAULT_HIGH_GAP):
+        """One row per metric with data: latest, average and first-to-latest change of the period means,
+        the overall trend slope and the period-to-period volatility"""
+        s = self.segments.index(segment)
+        means = self.mean[s]                      # periods x metrics
+        if not len(means):
+            means = np.full((1, len(self.metrics)), np.nan)
+        valid = ~np.isnan(means)
+        has_data = valid.any(axis=0)
+        columns = np.arange(len(self.metrics))
+        first = np.argmax(valid, axis=0)
+        last = len(means) - 1 - np.argmax(valid[::-1], axis=0)
+        current = means[last, columns]
+        gap = self.target_row - current
+        change = current - means[first, columns]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(has_data, np.where(valid, means, 0.0).sum(axis=0) / valid.sum(axis=0), np.nan)
+            spread = np.where(valid, means - average, 0.0)
+            period_volatility = np.sqrt((spread * spread).sum(axis=0) / valid.sum(axis=0))
+        result = pd.DataFrame({
+            'metric': self.metrics,
+            'Current_Score': current,
+            'Average_Score': average,
+            'Target_Score': self.target_row,
+            'Performance_Gap': gap,
+            'Trend_Direction': change,
+            'Trend_Slope': least_squares_slope(means[np.newaxis])[0],
+            'Volatility': period_volatility,
+            'Risk_Level': risk_levels(gap, medium_gap, high_gap)
+        })
+        return result[has_data].reset_index(drop=True)
+
+    def means(self, segment=ALL_SEGMENTS):
+        """Period means of every metric in one segment as a periods x metrics DataFrame"""
+        s = self.segments.index(segment)
+        return pd.DataFrame(self.mean[s], index=pd.DatetimeIndex(self.periods), columns=self.metrics)
+
+    def table(self, medium_gap=DEFAULT_MEDIUM_GAP, high_gap=DEFAULT_HIGH_GAP):
+        """Long table of every segment x period x metric with data"""
+        n_segments, n_periods, n_metrics = self.mean.shape
+        result = pd.DataFrame({
+            'segment': np.repeat(self.segments, n_periods * n_metrics),
+            'period_start': np.tile(np.repeat(pd.DatetimeIndex(self.periods), n_metrics), n_segments),
+            'metric': np.tile(self.metrics, n_segments * n_periods),
+            'count': self.count.ravel(),
+            'score': self.mean.ravel(),
+            'target': np.tile(self.target_row, n_segments * n_periods),
+            'gap': self.gap.ravel(),
+            'trend_slope': self.slope.ravel(),
+            'volatility': self.volatility.ravel(),
+            'risk_level': risk_levels(self.gap.ravel(), medium_gap, high_gap)
+        })
+        return result[result['count'] > 0].reset_index(drop=True)
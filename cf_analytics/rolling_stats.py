@@ -0,0 +1,161 @@
+"""Incrementally maintained rolling statistics over a daily series.
+
+`RollingStats` keeps running (cumulative) count, sum and sum of squares of a
+series on a gap-free daily axis, plus its EWMA. The mean and standard
+deviation of any trailing window are then two subtractions per day, for any
+window length and any slice of days, so the same state serves the 7- and
+30-day overlays of every month filter.
+
+Appending days costs O(new days): the buffers grow geometrically and the
+cumulative sums and the EWMA continue from the last stored day. When earlier
+days change (an upload overwriting history), only the days from the first
+changed one onward are recomputed.
+"""
+import numpy as np
+
+DEFAULT_WINDOWS = (7, 30)
+DEFAULT_EWMA_SPAN = 14
+EWMA_BLOCK = 128
+
+
+def _ewma_block(values, alpha, previous):
+    """EWMA of a NaN-free block continuing from `previous`, as one lower-triangular decay-matrix product.
+
+    s[j] = alpha * sum_k<=j (1 - alpha)**(j - k) * x[k] + (1 - alpha)**(j + 1) * previous
+    """
+    n = len(values)
+    powers = (1.0 - alpha) ** np.arange(n + 1)
+    lags = np.subtract.outer(np.arange(n), np.arange(n))
+    weights = np.where(lags >= 0, powers[np.clip(lags, 0, n)], 0.0)
+    return alpha * (weights @ values) + powers[1:] * previous
+
+
+def ewma(values, span, previous=np.nan):
+    """EWMA (adjust=False) over the non-NaN values, carried forward across NaN days.
+
+    Continues from `previous`; without one the first value seeds the average, as in
+    pandas' `ewm(span=span, adjust=False)`. Blocks of EWMA_BLOCK values keep the decay
+    powers well inside float range.
+    """
+    alpha = 2.0 / (span + 1.0)
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(values))
+    smoothed = np.empty(len(valid))
+    state = values[valid[0]] if np.isnan(previous) and len(valid) else previous
+    for start in range(0, len(valid), EWMA_BLOCK):
+        block = values[valid[start:start + EWMA_BLOCK]]
+        smoothed[start:start + len(block)] = _ewma_block(block, alpha, state)
+        state = smoothed[start + len(block) - 1]
+    # Each day takes the EWMA of the last valid day up to it
+    last_valid = np.searchsorted(valid, np.arange(len(values)), side='right') - 1
+    result = np.full(len(values), previous, dtype=np.float64)
+    seen = last_valid >= 0
+    result[seen] = smoothed[last_valid[seen]]
+    return result
+
+
+class RollingStats:
+    """Running sums and EWMA of one daily series, with O(1)-per-day window queries"""
+
+    def __init__(self, ewma_span=DEFAULT_EWMA_SPAN):
+        self.ewma_span = ewma_span
+        self.start = None
+        self._size = 0
+        self._values = np.empty(0)
+        self._count = np.zeros(1)      # prefix sums: entry i covers days [0, i)
+        self._sum = np.zeros(1)
+        self._sum_sq = np.zeros(1)
+        self._ewma = np.empty(0)
+        self.days_recomputed = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def dates(self):
+        if self.start is None:
+            return np.array([], dtype='datetime64[D]')
+        return self.start + np.arange(self._size)
+
+    def _reserve(self, size):
+        """Grow the buffers geometrically so appends stay amortized O(new days)"""
+        if size <= len(self._values):
+            return
+        capacity = max(size, 2 * len(self._values), 64)
+        for name in ('_values', '_ewma'):
+            grown = np.empty(capacity)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+        for name in ('_count', '_sum', '_sum_sq'):
+            grown = np.zeros(capacity + 1)
+            grown[:self._size + 1] = getattr(self, name)[:self._size + 1]
+            setattr(self, name, grown)
+
+    def _recompute_from(self, position, values):
+        """Overwrite days position.. with `values` and extend the running sums and EWMA from there"""
+        end = position + len(values)
+        self._reserve(end)
+        self._values[position:end] = values
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        self._count[position + 1:end + 1] = self._count[position] + np.cumsum(valid)
+        self._sum[position + 1:end + 1] = self._sum[position] + np.cumsum(filled)
+        self._sum_sq[position + 1:end + 1] = self._sum_sq[position] + np.cumsum(filled * filled)
+        previous = self._ewma[position - 1] if position else np.nan
+        self._ewma[position:end] = ewma(values, self.ewma_span, previous)
+        self._size = end
+        self.days_recomputed += len(values)
+
+    def append(self, values):
+        """Add the days following the last stored day (O(len(values)))"""
+        self._recompute_from(self._size, np.asarray(values, dtype=np.float64))
+
+    def sync(self, start, values):
+        """Match the series `values` starting on day `start`, recomputing only from the first changed day.
+
+        Returns the first recomputed position (len(values) when nothing changed).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.start is None or start != self.start or len(values) < self._size:
+            self.start = start
+            self._size = 0
+            first_changed = 0
+        else:
+            old, new = self._values[:self._size], values[:self._size]
+            changed = ~((old == new) | (np.isnan(old) & np.isnan(new)))
+            first_changed = int(np.argmax(changed)) if changed.any() else self._size
+        if first_changed < len(values):
+            self._recompute_from(first_changed, values[first_changed:])
+        return first_changed
+
+    def positions(self, dates):
+        """Day index of each date (may fall outside the series for unknown dates)"""
+        return (np.asarray(dates, dtype='datetime64[D]') - self.start).astype(np.int64)
+
+    def _rows(self, positions):
+        return np.arange(self._size) if positions is None else np.asarray(positions, dtype=np.int64)
+
+    def _window(self, window, positions):
+        end = self._rows(positions) + 1
+        first = np.maximum(end - window, 0)
+        return (self._count[end] - self._count[first], self._sum[end] - self._sum[first],
+                self._sum_sq[end] - self._sum_sq[first])
+
+    def mean(self, window, positions=None, min_periods=None):
+        """Trailing `window`-day mean at each day position (all days by default).
+
+        NaN where the window holds fewer than `min_periods` values (default window // 2).
+        """
+        n, total, _ = self._window(window, positions)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(n >= (min_periods or max(1, window // 2)), total / n, np.nan)
+
+    def std(self, window, positions=None, min_periods=None):
+        """Trailing `window`-day sample standard deviation at each day position"""
+        n, total, total_sq = self._window(window, positions)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = (total_sq - total * total / n) / (n - 1)
+        return np.where(n >= max(2, min_periods or window // 2), np.sqrt(np.clip(variance, 0, None)), np.nan)
+
+    def ewma(self, positions=None):
+        return self._ewma[self._rows(positions)]
@@ -0,0 +1,126 @@
+"""Pre-computed multi-granularity rollups of the daily metric data.
+
+`RollupCube` aggregates every metric at day, week, month and quarter grain in a
+single vectorized pass over the date-sorted daily frame (`np.add.reduceat` over
+period boundaries). Each cell holds count, sum, sum of squares, min, max and the
+number of days below target, so means and standard deviations for any period
+come from O(periods) work instead of a scan of the raw rows.
+"""
+import numpy as np
+import pandas as pd
+
+from .survey_metrics import DEFAULT_TARGET
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+def period_codes(keys, granularity):
+    """Integer period code of each int64 nanosecond date key (non-decreasing for sorted keys)"""
+    days = keys // NS_PER_DAY
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+        return (days + 3) // 7
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    if granularity == 'month':
+        return months
+    if granularity == 'quarter':
+        return months // 3
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def period_starts(codes, granularity):
+    """First calendar day of each period code"""
+    if granularity == 'day':
+        return codes.astype('datetime64[D]')
+    if granularity == 'week':
+        return (codes * 7 - 3).astype('datetime64[D]')
+    if granularity == 'month':
+        return codes.astype('datetime64[M]').astype('datetime64[D]')
+    return (codes * 3).astype('datetime64[M]').astype('datetime64[D]')
+
+
+class _Rollup:
+    """Aggregates of every metric at one granularity (arrays shaped periods x metrics)"""
+
+    def __init__(self, keys, values, targets, granularity):
+        codes = period_codes(keys, granularity)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.int64)
+        ends = np.r_[starts[1:], len(codes)] - 1
+
+        self.codes = codes[starts]
+        self.period_start = period_starts(self.codes, granularity)
+        self.first_date = keys[starts].astype('datetime64[ns]')
+        self.last_date = keys[ends].astype('datetime64[ns]')
+
+        if len(starts) == 0:
+            empty = np.zeros((0, values.shape[1]))
+            self.count = self.sum = self.sum_sq = self.min = self.max = self.below = empty
+            return
+
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        self.count = np.add.reduceat(valid, starts, axis=0).astype(np.int64)
+        self.sum = np.add.reduceat(filled, starts, axis=0)
+        self.sum_sq = np.add.reduceat(filled * filled, starts, axis=0)
+        self.min = np.fmin.reduceat(values, starts, axis=0)
+        self.max = np.fmax.reduceat(values, starts, axis=0)
+        self.below = np.add.reduceat(valid & (values < targets), starts, axis=0).astype(np.int64)
+
+
+class RollupCube:
+    """Metric x day/week/month/quarter aggregates computed in one pass over the daily data"""
+
+    def __init__(self, daily_df, metrics, targets=None, date_col='date'):
+        self.metrics = [metric for metric in metrics if metric in daily_df.columns]
+        self.targets = {metric: (targets or {}).get(metric, DEFAULT_TARGET) for metric in self.metrics}
+
+        dates = daily_df[date_col].to_numpy(dtype='datetime64[ns]')
+        order = None if np.all(dates[1:] >= dates[:-1]) else np.argsort(dates, kind='stable')
+        keys = dates.view(np.int64) if order is None else dates.view(np.int64)[order]
+
+        values = np.empty((len(keys), len(self.metrics)))
+        for i, metric in enumerate(self.metrics):
+            column = pd.to_numeric(daily_df[metric], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            values[:, i] = column if order is None else column[order]
+        target_row = np.array([self.targets[metric] for metric in self.metrics])
+
+        self._rollups = {
+            granularity: _Rollup(keys, values, target_row, granularity) for granularity in GRANULARITIES
+        }
+
+    def has_metric(self, metric):
+        return metric in self.metrics
+
+    def frame(self, granularity, metric):
+        """Per-period aggregates of one metric as a DataFrame (periods without data are dropped)"""
+        rollup = self._rollups[granularity]
+        i = self.metrics.index(metric)
+        count = rollup.count[:, i]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = rollup.sum[:, i] / count
+            variance = rollup.sum_sq[:, i] / count - mean * mean
+        result = pd.DataFrame({
+            'period_start': rollup.period_start,
+            'first_date': rollup.first_date,
+            'last_date': rollup.last_date,
+            'count': count,
+            'sum': rollup.sum[:, i],
+            'sum_sq': rollup.sum_sq[:, i],
+            'mean': mean,
+            'std': np.sqrt(np.clip(variance, 0, None)),
+            'min': rollup.min[:, i],
+            'max': rollup.max[:, i],
+            'days_below_target': rollup.below[:, i]
+        })
+        return result[result['count'] > 0].reset_index(drop=True)
+
+    def means(self, granularity):
+        """Mean of every metric per period as a periods x metrics DataFrame"""
+        rollup = self._rollups[granularity]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = rollup.sum / rollup.count
+        return pd.DataFrame(means, index=pd.DatetimeIndex(rollup.period_start), columns=self.metrics)
@@ -0,0 +1,36 @@
+"""Catalogue of the eight survey metrics tracked by the dashboard."""
+
+DEFAULT_TARGET = 9.0
+
+# Display name -> daily data column
+SURVEY_METRICS = {
+    'Overall Satisfaction': 'satisfaction_score',
+    'Likelihood to Buy Again': 'likelihood_to_buy_again',
+    'Likelihood to Recommend': 'likelihood_to_recommend',
+    'Site Design': 'site_design',
+    'Ease of Finding': 'ease_of_finding',
+    'Product Information Clarity': 'product_information_clarity',
+    'Charges Stated Clearly': 'charges_stated_clearly',
+    'Checkout Process': 'checkout_process'
+}
+
+METRIC_COLUMNS = list(SURVEY_METRICS.values())
+# Daily data column -> display name
+METRIC_NAMES = {column: name for name, column in SURVEY_METRICS.items()}
+
+# Typical offset of each metric from overall satisfaction, used for the generated sample data
+METRIC_OFFSETS = {
+    'satisfaction_score': 0.0,
+    'likelihood_to_buy_again': 0.0,
+    'likelihood_to_recommend': 0.0,
+    'site_design': 0.18,
+    'ease_of_finding': 0.12,
+    'product_information_clarity': 0.09,
+    'charges_stated_clearly': 0.0,
+    'checkout_process': -0.18
+}
+
+
+def metric_targets(columns=METRIC_COLUMNS, target=DEFAULT_TARGET):
+    """Target score for each metric column"""
+    return {column: target for column in columns}
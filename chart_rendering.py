@@ -0,0 +1,24 @@
+"""Rendering policy for large scatter/line charts.
+
+SVG traces become unusable (slow draw, laggy hover) past roughly ten thousand
+points, so above a configurable threshold charts switch to WebGL (`Scattergl`).
+Markers, colors and hovertemplates are passed through unchanged.
+"""
+import plotly.graph_objects as go
+
+WEBGL_POINT_THRESHOLD = 10_000
+
+
+def use_webgl(n_points, threshold=WEBGL_POINT_THRESHOLD):
+    return n_points > threshold
+
+
+def scatter_trace(n_points, threshold=WEBGL_POINT_THRESHOLD, **trace_kwargs):
+    """go.Scatter, or go.Scattergl when the figure has more than `threshold` points"""
+    trace_class = go.Scattergl if use_webgl(n_points, threshold) else go.Scatter
+    return trace_class(**trace_kwargs)
+
+
+def render_mode(n_points, threshold=WEBGL_POINT_THRESHOLD):
+    """`render_mode` argument for plotly.express scatter/line charts"""
+    return 'webgl' if use_webgl(n_points, threshold) else 'svg'
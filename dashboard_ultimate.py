@@ -5,7 +5,25 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta
-import io
+import os
+import time
+
+from cf_analytics import pipeline
+from cf_analytics.columnar_store import ColumnarStore
+from cf_analytics.dimension_slices import ALL_SLICE
+from cf_analytics.event_detection import SEVERITY_THRESHOLDS, EventDetector
+from cf_analytics.exports import EXPORT_FORMATS, ExportCache, available_formats
+from cf_analytics.frame_layout import failed_metrics_label, memory_report
+from cf_analytics.ingestion import CsvChunkStream, IngestionLedger, UploadParser, should_stream
+from cf_analytics.memory_budget import MemoryAccountant, frame_nbytes
+from cf_analytics.risk_engine import DEFAULT_HIGH_GAP, DEFAULT_MEDIUM_GAP
+from cf_analytics.rolling_stats import DEFAULT_EWMA_SPAN, RollingStats
+from cf_analytics.survey_metrics import METRIC_NAMES, SURVEY_METRICS, metric_targets
+from chart_rendering import WEBGL_POINT_THRESHOLD, render_mode, scatter_trace
+from dataset_registry import DatasetRegistry, derived_key, frame_digest
+from downsampling import downsample_indices
+from figure_cache import FigureBudget, FigureCache
+from rerun_profiler import DEFAULT_LOG_PATH, RerunProfiler, append_log
 
 # Configure page
 st.set_page_config(
@@ -15,6 +33,11 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Rerun profiler: times each named section of the script (enabled from the sidebar
+# performance panel, or for every session with CF_PROFILE=1)
+profiler = RerunProfiler(enabled=st.session_state.get("show_profiler", False) or os.environ.get("CF_PROFILE") == "1")
+profiler.section("setup")
+
 # Initialize session state for new data uploads
 if "new_data" not in st.session_state:
     st.session_state["new_data"] = {"daily_uploads": [], "events_uploads": []}
@@ -122,117 +145,148 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Generate sample data for the dashboard
-@st.cache_data
-def load_data():
-    # Daily satisfaction scores from May 30 to Sept 30, 2025
-    start_date = datetime(2025, 5, 30)
-    end_date = datetime(2025, 9, 30)
-    date_range = pd.date_range(start_date, end_date, freq='D')
-
-    # Generate realistic daily satisfaction scores
-    np.random.seed(42)
-    base_scores = np.random.normal(8.5, 1.2, len(date_range))
-
-    # Add seasonal trends and promotion effects
-    daily_data = []
-    for i, date in enumerate(date_range):
-        score = base_scores[i]
-
-        # Weekend effect (slightly lower satisfaction)
-        if date.weekday() >= 5:
-            score -= 0.3
-
-        # Promotion periods (higher satisfaction)
-        if date.month == 6 and date.day in range(15, 21):  # June promotion
-            score += 1.5
-        if date.month == 8 and date.day in range(1, 8):    # August promotion
-            score += 1.2
-        if date.month == 9 and date.day in range(20, 27):  # September promotion
-            score += 1.8
-
-        # Special events (mixed effects)
-        if date.month == 7 and date.day == 15:  # System maintenance
-            score -= 2.5
-        if date.month == 8 and date.day == 20:  # Store renovation
-            score -= 1.8
-
-        # Ensure realistic bounds
-        score = max(0, min(10, score))
-
-        daily_data.append({
-            'date': date,
-            'satisfaction_score': round(score, 1),
-            'month': date.strftime('%B %Y'),
-            'month_short': date.strftime('%b'),
-            'day_name': date.strftime('%A'),
-            'is_weekend': date.weekday() >= 5,
-            'week': date.isocalendar()[1]
-        })
-
-    daily_df = pd.DataFrame(daily_data)
-
-    # Enhanced events data with more comprehensive information
-    enhanced_events_data = [
-        # Critical Events
-        {'date': datetime(2025, 8, 11), 'day_of_week': 'Tuesday', 'failed_metrics': '7/8', 'failure_percentage': 87.5, 'promotion': 'Without promo', 'severity': 'Critical'},
-        {'date': datetime(2025, 8, 13), 'day_of_week': 'Saturday', 'failed_metrics': '6/8', 'failure_percentage': 75.0, 'promotion': 'No promotion', 'severity': 'High'},
-        {'date': datetime(2025, 6, 29), 'day_of_week': 'Monday', 'failed_metrics': '6/8', 'failure_percentage': 75.0, 'promotion': '4th of July Event 7% OFF', 'severity': 'High'},
-        {'date': datetime(2025, 8, 7), 'day_of_week': 'Sunday', 'failed_metrics': '4/8', 'failure_percentage': 50.0, 'promotion': 'No promotion', 'severity': 'Medium'},
-        {'date': datetime(2025, 8, 25), 'day_of_week': 'Thursday', 'failed_metrics': '4/8', 'failure_percentage': 50.0, 'promotion': 'Without promo', 'severity': 'Medium'},
-        {'date': datetime(2025, 9, 22), 'day_of_week': 'Tuesday', 'failed_metrics': '4/8', 'failure_percentage': 50.0, 'promotion': 'Without promo', 'severity': 'Medium'},
-
-        # Additional Events (Non-Critical)
-        {'date': datetime(2025, 7, 14), 'day_of_week': 'Tuesday', 'failed_metrics': '3/8', 'failure_percentage': 37.5, 'promotion': 'Anniversary Sale Kick Off', 'severity': 'Low'},
-        {'date': datetime(2025, 7, 8), 'day_of_week': 'Wednesday', 'failed_metrics': '3/8', 'failure_percentage': 37.5, 'promotion': 'No promotion', 'severity': 'Low'},
-        {'date': datetime(2025, 8, 2), 'day_of_week': 'Sunday', 'failed_metrics': '3/8', 'failure_percentage': 37.5, 'promotion': 'No promotion', 'severity': 'Low'},
-        {'date': datetime(2025, 8, 13), 'day_of_week': 'Thursday', 'failed_metrics': '3/8', 'failure_percentage': 37.5, 'promotion': 'No promotion', 'severity': 'Low'},
-        {'date': datetime(2025, 8, 18), 'day_of_week': 'Monday', 'failed_metrics': '3/8', 'failure_percentage': 37.5, 'promotion': 'No promotion', 'severity': 'Low'},
-
-        # Good Performance Events (for context)
-        {'date': datetime(2025, 6, 15), 'day_of_week': 'Monday', 'failed_metrics': '2/8', 'failure_percentage': 25.0, 'promotion': 'Father Day Special 15% OFF', 'severity': 'Low'},
-        {'date': datetime(2025, 9, 1), 'day_of_week': 'Tuesday', 'failed_metrics': '2/8', 'failure_percentage': 25.0, 'promotion': 'Labor Day Sale', 'severity': 'Low'},
-        {'date': datetime(2025, 7, 20), 'day_of_week': 'Monday', 'failed_metrics': '1/8', 'failure_percentage': 12.5, 'promotion': 'Summer Clearance 20% OFF', 'severity': 'Low'},
-        {'date': datetime(2025, 8, 24), 'day_of_week': 'Sunday', 'failed_metrics': '1/8', 'failure_percentage': 12.5, 'promotion': 'Back to School Furniture', 'severity': 'Low'},
-        {'date': datetime(2025, 9, 15), 'day_of_week': 'Friday', 'failed_metrics': '0/8', 'failure_percentage': 0.0, 'promotion': 'Fall Collection Launch', 'severity': 'Low'},
-    ]
-
-    events_df = pd.DataFrame(enhanced_events_data)
-
-    return daily_df, events_df
-
-# Load base data
-base_daily_df, base_events_df = load_data()
-
-# Function to merge uploaded data with base data
-def merge_data_with_uploads(base_df, uploaded_dfs, df_type="daily"):
-    """Merge base data with uploaded data, removing duplicates"""
-    if not uploaded_dfs:
-        return base_df
-
-    # Combine all uploaded data
-    all_uploaded = pd.concat(uploaded_dfs, ignore_index=True)
-
-    # Combine with base data
-    combined = pd.concat([base_df, all_uploaded], ignore_index=True)
-
-    # Remove duplicates based on date column
-    date_col = 'date'
-    if date_col in combined.columns:
-        # Convert to datetime if needed
-        if not pd.api.types.is_datetime64_any_dtype(combined[date_col]):
-            combined[date_col] = pd.to_datetime(combined[date_col], errors='coerce')
-        # Remove duplicates, keeping the last occurrence (uploaded data takes precedence)
-        combined = combined.drop_duplicates(subset=[date_col], keep='last')
-        # Sort by date
-        combined = combined.sort_values(date_col).reset_index(drop=True)
+# Persistent columnar store for the base datasets (survives restarts and new sessions). It is
+# shared by every session, so writing it is an admin action: uploads stay in the session unless
+# CF_ALLOW_PERSIST=1 enables saving them as the new base data
+dataset_store = ColumnarStore()
+persist_enabled = os.environ.get("CF_ALLOW_PERSIST") == "1"
+
+# Base data: the persisted datasets when present, else the generated sample data (see
+# cf_analytics.pipeline.load_data); store_signature only serves as the cache key so a new save
+# invalidates this cache. cache_resource hands every session the same (read-only) frames, whose
+# numeric columns stay memory-mapped, and only the current store state is kept
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_data(store_signature=()):
+    return pipeline.load_data(dataset_store)
+
+# Process-wide registry of merged datasets keyed by content hash: sessions hold small
+# handles, so sessions looking at the same data share one copy
+@st.cache_resource
+def dataset_registry():
+    return DatasetRegistry()
+
+# Process-wide memory accounting: per-session upload buffers spill to disk over their
+# session budget, and the coldest ones across all sessions once the global budget
+# (which also counts the shared registry) is exceeded; uploads whose merged data would
+# not fit even after that (and after dropping unused shared datasets) are refused
+@st.cache_resource
+def memory_accountant():
+    return MemoryAccountant(shared_usage=lambda: dataset_registry().total_bytes,
+                            reclaim_shared=lambda nbytes: dataset_registry().reclaim(nbytes))
+
+# Byte budget shared by every session's figure cache
+@st.cache_resource
+def figure_budget():
+    return FigureBudget()
+
+# Process pool shared by all sessions for parsing upload batches concurrently
+@st.cache_resource
+def upload_parser():
+    return UploadParser()
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def base_dataset_keys(store_signature=()):
+    """Content keys of the base datasets, hashed once per process and store state"""
+    base_daily, base_events = load_data(store_signature)
+    return {"daily": frame_digest(base_daily), "events": frame_digest(base_events)}
+
+def build_base_dataset(name, store_signature):
+    base_daily, base_events = load_data(store_signature)
+    if name == "daily":
+        dataset = pipeline.daily_dataset(base_daily)
+    else:
+        dataset = pipeline.events_dataset(base_events)
+    dataset.frame  # compacted up front: shared datasets are only ever read
+    return dataset
+
+profiler.section("load_data")
+registry = dataset_registry()
+store_signature = dataset_store.signature()
+
+profiler.section("merge_data")
+# Merged datasets keep a sorted date index; uploads are applied as upserts into a fork of
+# the shared dataset, which is then registered under a key derived from the upload
+if "ingestion_ledger" not in st.session_state:
+    st.session_state["ingestion_ledger"] = IngestionLedger(accountant=memory_accountant())
+dataset_handles = st.session_state.get("dataset_handles")
+if dataset_handles is None or not all(registry.valid(handle) for handle in dataset_handles.values()):
+    base_keys = base_dataset_keys(store_signature)
+    dataset_handles = {
+        name: registry.acquire(key, lambda name=name: build_base_dataset(name, store_signature))
+        for name, key in base_keys.items()
+    }
+    st.session_state["dataset_handles"] = dataset_handles
+    st.session_state["base_rows"] = {name: len(handle.value) for name, handle in dataset_handles.items()}
+
+merged_daily = dataset_handles["daily"].value
+merged_events = dataset_handles["events"].value
+
+# Only the merged datasets are shared between sessions. What is derived from them (dimension
+# slices, rollup cube, metric matrix, event detector, risk engine, rolling statistics) is still
+# built and held by every session, even when several sessions look at the same data
+def derived_state(name, version, build):
+    """Session-cached structure derived from the data, rebuilt only when `version` changes"""
+    cached = st.session_state.get(name)
+    if cached is None or cached[0] != version:
+        cached = (version, build())
+        st.session_state[name] = cached
+    return cached[1]
+
+# Per-day totals for all data and for every store/channel/region value, aggregated once per data
+# version; the sidebar selector (rendered further down, read here first) picks a precomputed slice
+dimension_slices = derived_state(
+    "dimension_slices", merged_daily.version,
+    lambda: pipeline.build_dimension_slices(merged_daily.frame)
+)
+if st.session_state.get("dimension_slice", ALL_SLICE) not in dimension_slices.options:
+    st.session_state["dimension_slice"] = ALL_SLICE
+dimension_slice = st.session_state.get("dimension_slice", ALL_SLICE)
+
+# Get final merged datasets (one row per day of the selected slice)
+daily_df = dimension_slices.frame(dimension_slice)
+daily_version = (merged_daily.version, dimension_slice)
+data_version = (daily_version, merged_events.version)
+
+profiler.section("derived_state")
+# Built figures are memoized per session, keyed by data version and the widget values
+# that shape them, so reruns from unrelated widgets skip the figure rebuild; their memory
+# counts against one process-wide budget (CF_FIGURE_BUDGET_MB)
+if "figure_cache" not in st.session_state:
+    st.session_state["figure_cache"] = FigureCache(budget=figure_budget())
+figure_cache = st.session_state["figure_cache"]
+figure_cache.begin_rerun()
+
+# Rollup cube of every survey metric (day/week/month/quarter)
+rollup_cube = derived_state(
+    "rollup_cube", daily_version,
+    lambda: pipeline.build_rollup(daily_df)
+)
 
-    return combined
+# Compact float32 days x metrics matrix (uploaded metric columns are matched by name)
+metric_matrix = derived_state(
+    "metric_matrix", daily_version,
+    lambda: pipeline.build_metric_matrix(daily_df)
+)
+metrics_below_target = metric_matrix.below_target_counts(metric_targets())
+metrics_tracked = metric_matrix.tracked_counts()
+
+# Critical events detected from the metric matrix: failing-metric counts, severity and rolling
+# z-score drops. The detector only recomputes from the first day whose metrics changed, and
+# uploaded events files override the detected rows on their dates
+if "event_detector" not in st.session_state:
+    st.session_state["event_detector"] = EventDetector(metric_targets())
+
+events_dataset = derived_state(
+    "events_dataset", data_version,
+    lambda: pipeline.detect_events(st.session_state["event_detector"], metric_matrix, merged_events.frame)
+)
+events_df = events_dataset.frame
 
-# Get final merged datasets
-daily_df = merge_data_with_uploads(base_daily_df, st.session_state["new_data"]["daily_uploads"])
-events_df = merge_data_with_uploads(base_events_df, st.session_state["new_data"]["events_uploads"])
+# Monthly gap, trend slope and volatility of every metric for all days, weekdays and weekends
+# (feeds the Risk tab and the risk export; thresholds are applied when reading)
+risk_engine = derived_state("risk_engine", daily_version, lambda: pipeline.build_risk_engine(daily_df))
 
+profiler.section("sidebar")
 # Enhanced Sidebar with modern navigation
 st.sidebar.markdown("### 📊 Dashboard Navigation")
 st.sidebar.markdown("---")
@@ -246,18 +300,52 @@ navigation_options = [
     ("📂", "Data Upload", "upload")
 ]
 
+view_labels = {key: f"{icon} {label}" for icon, label, key in navigation_options}
+if "active_view" not in st.session_state:
+    st.session_state["active_view"] = "daily"
+
+# Only the active view's code runs. Streamlit forgets the values of widgets that are not
+# rendered, so re-assign the other views' widget values to keep them across view switches.
+view_widget_keys = [
+    "daily_month_filter", "show_weekends", "show_target", "timeline_overlays",
+    "metric_selector", "monthly_comparison_enhanced",
+    "failure_filter", "promotion_filter_enhanced", "severity_filter_enhanced",
+    "events_sort_enhanced", "events_order_enhanced", "events_page_size", "events_page",
+    "risk_metric_selector", "risk_segment"
+]
+for widget_key in view_widget_keys:
+    if widget_key in st.session_state:
+        st.session_state[widget_key] = st.session_state[widget_key]
+
+def seed_widget(key, value):
+    """Initial value of a widget set through session state; these widgets must not also pass a default"""
+    if key not in st.session_state:
+        st.session_state[key] = value
+
+def select_view(view):
+    st.session_state["active_view"] = view
+
 st.sidebar.markdown("#### Quick Navigation")
-selected_nav = None
 for icon, label, key in navigation_options:
-    if st.sidebar.button(f"{icon} {label}", key=f"nav_{key}", use_container_width=True):
-        selected_nav = key
-        if key == "upload":
-            st.experimental_rerun()
+    st.sidebar.button(f"{icon} {label}", key=f"nav_{key}", use_container_width=True,
+                      on_click=select_view, args=(key,))
 
 # Add data summary in sidebar
 st.sidebar.markdown("---")
 st.sidebar.markdown("#### 📊 Data Overview")
 
+# Store/channel/region slice shown by every view (only offered when the data has those columns)
+if len(dimension_slices.options) > 1:
+    st.sidebar.selectbox(
+        "🏬 Store / Channel",
+        options=dimension_slices.options,
+        key="dimension_slice",
+        help="Every view shows the daily averages of the selected store, channel or region; "
+             "the per-day totals of each value are precomputed once per data version"
+    )
+    st.sidebar.caption(f"{len(dimension_slices.options) - 1} store/channel slices pre-aggregated "
+                       f"({dimension_slices.nbytes / 1024:,.0f} KB)")
+
 # Calculate data range
 min_date = daily_df['date'].min()
 max_date = daily_df['date'].max()
@@ -274,6 +362,59 @@ st.sidebar.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# Chart rendering settings
+st.sidebar.markdown("#### ⚙️ Chart Settings")
+timeline_resolution = st.sidebar.number_input(
+    "Timeline resolution (px)",
+    min_value=200,
+    max_value=8000,
+    value=1200,
+    step=100,
+    key="timeline_resolution",
+    help="Longer histories are downsampled (LTTB) to about one point per pixel; below-target days and extremes are always kept"
+)
+webgl_threshold = st.sidebar.number_input(
+    "WebGL threshold (points)",
+    min_value=0,
+    value=WEBGL_POINT_THRESHOLD,
+    step=1000,
+    key="webgl_threshold",
+    help="Scatter and line charts with more points than this are drawn with WebGL instead of SVG"
+)
+# Filled in after the active view has run, so the counters include this rerun
+figure_cache_status = st.sidebar.empty()
+st.sidebar.checkbox(
+    "🩺 Performance panel",
+    key="show_profiler",
+    help=f"Time each script section, measure chart payloads and the peak process memory (RSS, sampled at every section), "
+         f"and append every rerun to {DEFAULT_LOG_PATH}"
+)
+
+# Risk classification thresholds (used by the Risk view and the risk export)
+st.sidebar.markdown("#### 🎯 Risk Thresholds")
+risk_medium_gap = st.sidebar.number_input(
+    "Medium risk gap",
+    min_value=0.0,
+    max_value=10.0,
+    value=DEFAULT_MEDIUM_GAP,
+    step=0.05,
+    key="risk_medium_gap",
+    help="A month scoring more than this below target is Medium Risk"
+)
+risk_high_gap = st.sidebar.number_input(
+    "High risk gap",
+    min_value=0.0,
+    max_value=10.0,
+    value=DEFAULT_HIGH_GAP,
+    step=0.05,
+    key="risk_high_gap",
+    help="A month scoring more than this below target is High Risk"
+)
+if risk_high_gap < risk_medium_gap:
+    st.sidebar.warning("⚠️ High risk gap is below the medium risk gap: every gap above it counts as High Risk")
+risk_thresholds = (risk_medium_gap, risk_high_gap)
+
+profiler.section("date_filter")
 # Main header
 st.markdown('<h1 class="main-header">🏢 City Furniture - Advanced Customer Satisfaction Analytics</h1>', 
            unsafe_allow_html=True)
@@ -316,19 +457,17 @@ with filter_col3:
         st.session_state.end_date_filter = None
         st.experimental_rerun()
 
-# Apply date filtering to datasets
-filtered_daily_df = daily_df.copy()
-filtered_events_df = events_df.copy()
+# Apply date filtering to datasets (the merged frames are shared read-only, no copies needed)
+filtered_daily_df = daily_df
+filtered_events_df = events_df
+date_filter_key = None  # part of the figure cache keys for charts built from the filtered data
 
 if start_date_filter and end_date_filter:
     if start_date_filter <= end_date_filter:
-        # Filter daily data
-        mask_daily = (filtered_daily_df['date'].dt.date >= start_date_filter) & (filtered_daily_df['date'].dt.date <= end_date_filter)
-        filtered_daily_df = filtered_daily_df[mask_daily]
-
-        # Filter events data  
-        mask_events = (filtered_events_df['date'].dt.date >= start_date_filter) & (filtered_events_df['date'].dt.date <= end_date_filter)
-        filtered_events_df = filtered_events_df[mask_events]
+        date_filter_key = (start_date_filter, end_date_filter)
+        # Binary search on the sorted date index returns a slice instead of a masked copy
+        filtered_daily_df = dimension_slices.date_slice(dimension_slice, start_date_filter, end_date_filter)
+        filtered_events_df = events_dataset.date_slice(start_date_filter, end_date_filter)
 
         # Show active filter info
         st.info(f"📊 **Active Filter:** {start_date_filter.strftime('%b %d, %Y')} to {end_date_filter.strftime('%b %d, %Y')} | "
@@ -352,12 +491,111 @@ print("🎨 Enhanced CSS and navigation implemented")
 print("🔄 Data merging logic ready")
 
 
-
-# Create enhanced tabs with modern navigation
-tab1, tab2, tab3, tab4 = st.tabs(["📈 Daily Timeline", "📊 Monthly Comparison", "⚠️ Critical Events", "🎯 Risk Analysis"])
+# Risk analysis options per metric (module level: the Risk view and the sidebar export both use them)
+risk_metric_options = {
+    'Overall Satisfaction': {
+        'target': 9.0,
+        'risk_factors': ['Service delays', 'Product quality issues', 'Delivery problems'],
+        'business_impact': 'Directly affects customer loyalty and retention rates. A decline in overall satisfaction can lead to reduced customer lifetime value and negative word-of-mouth marketing.',
+        'recommendations': [
+            'Implement proactive customer service monitoring with real-time alerts',
+            'Establish quality control checkpoints throughout the customer journey',
+            'Create customer feedback loops for rapid issue identification and resolution',
+            'Deploy sentiment analysis tools to monitor customer communications'
+        ]
+    },
+    'Likelihood to Buy Again': {
+        'target': 9.0,
+        'risk_factors': ['Competitive pricing', 'Product availability', 'Customer service experience'],
+        'business_impact': 'Critical for revenue retention and customer lifetime value. Low scores indicate potential revenue leakage and increased customer acquisition costs.',
+        'recommendations': [
+            'Develop comprehensive customer loyalty programs with personalized incentives',
+            'Monitor competitor pricing strategies and implement dynamic pricing models',
+            'Improve inventory management systems to reduce stockouts',
+            'Create predictive models to identify at-risk customers for proactive retention efforts'
+        ]
+    },
+    'Likelihood to Recommend': {
+        'target': 9.0,
+        'risk_factors': ['Word-of-mouth reputation', 'Social media presence', 'Customer advocacy'],
+        'business_impact': 'Affects organic growth and brand reputation in the market. Low recommendation scores can significantly impact new customer acquisition through referrals.',
+        'recommendations': [
+            'Create structured referral incentive programs with clear rewards',
+            'Monitor and actively respond to online reviews and social media mentions',
+            'Develop customer ambassador programs to leverage satisfied customers',
+            'Implement Net Promoter Score (NPS) tracking with follow-up actions for detractors'
+        ]
+    },
+    'Site Design': {
+        'target': 9.0,
+        'risk_factors': ['User interface complexity', 'Mobile responsiveness', 'Loading speed'],
+        'business_impact': 'Influences first impressions and user engagement rates. Poor site design can lead to high bounce rates and reduced conversion rates.',
+        'recommendations': [
+            'Conduct regular UX/UI testing with A/B testing for continuous optimization',
+            'Implement mobile-first design principles with responsive layouts',
+            'Optimize site performance and loading times (target <3 seconds)',
+            'Use heatmap analysis to identify user behavior patterns and pain points'
+        ]
+    },
+    'Ease of Finding': {
+        'target': 9.0,
+        'risk_factors': ['Search functionality', 'Product categorization', 'Navigation structure'],
+        'business_impact': 'Affects conversion rates and user satisfaction during shopping. Poor findability leads to increased cart abandonment and reduced sales.',
+        'recommendations': [
+            'Enhance search algorithm with AI-powered search suggestions and auto-complete',
+            'Improve product categorization and tagging with detailed filters',
+            'Implement intelligent product recommendations based on user behavior',
+            'Add visual search capabilities and improved site navigation structure'
+        ]
+    },
+    'Product Information Clarity': {
+        'target': 9.0,
+        'risk_factors': ['Product descriptions accuracy', 'Image quality', 'Specification completeness'],
+        'business_impact': 'Reduces returns and increases purchase confidence. Clear product information directly correlates with reduced customer service inquiries and returns.',
+        'recommendations': [
+            'Standardize product information templates with consistent formatting',
+            'Implement 360-degree product views and high-resolution image galleries',
+            'Add customer Q&A sections and user-generated content for each product',
+            'Create detailed size guides and compatibility charts for furniture items'
+        ]
+    },
+    'Charges Stated Clearly': {
+        'target': 9.0,
+        'risk_factors': ['Hidden fees', 'Shipping cost transparency', 'Tax calculation accuracy'],
+        'business_impact': 'Critical for trust and completing transactions without abandonment. Unclear pricing is a major cause of cart abandonment and customer complaints.',
+        'recommendations': [
+            'Display all fees upfront in the shopping process with no hidden costs',
+            'Implement transparent pricing calculator showing taxes, shipping, and fees',
+            'Provide clear breakdown of all charges before checkout with explanations',
+            'Add shipping cost estimator on product pages based on customer location'
+        ]
+    },
+    'Checkout Process': {
+        'target': 9.0,
+        'risk_factors': ['Process complexity', 'Payment security', 'Guest checkout availability'],
+        'business_impact': 'Directly affects conversion rates and cart abandonment. Complex checkout processes can result in up to 70% cart abandonment rates.',
+        'recommendations': [
+            'Simplify checkout to minimum required steps (target: 3 steps or fewer)',
+            'Offer multiple payment options including digital wallets (Apple Pay, Google Pay)',
+            'Implement guest checkout and save-for-later options',
+            'Add progress indicators and clear security badges to build trust'
+        ]
+    }
+}
+
+# View navigation: only the selected view is built on each rerun
+active_view = st.radio(
+    "View",
+    options=list(view_labels),
+    format_func=view_labels.get,
+    horizontal=True,
+    key="active_view",
+    label_visibility="collapsed"
+)
+profiler.section(f"view:{active_view}")
 
 # TAB 1: Daily Timeline (Your original code - UNCHANGED except using filtered data)
-with tab1:
+if active_view == "daily":
     st.header("Daily Satisfaction Timeline")
 
     # Filters
@@ -370,77 +608,177 @@ with tab1:
         )
 
     with col2:
-        show_weekends = st.checkbox("Highlight Weekends", value=True)
+        seed_widget("show_weekends", True)
+        show_weekends = st.checkbox("Highlight Weekends", key="show_weekends")
 
     with col3:
-        show_target = st.checkbox("Show Target Line (9.0)", value=True)
+        seed_widget("show_target", True)
+        show_target = st.checkbox("Show Target Line (9.0)", key="show_target")
+
+    TIMELINE_OVERLAYS = ["7-day mean", "30-day mean", "30-day ±1σ band", f"EWMA ({DEFAULT_EWMA_SPAN}-day span)"]
+    seed_widget("timeline_overlays", ["7-day mean", "30-day mean"])
+    timeline_overlays = st.multiselect(
+        "Rolling overlays:",
+        options=TIMELINE_OVERLAYS,
+        key="timeline_overlays"
+    )
 
     # Filter data based on selection (using filtered dataset)
-    filtered_daily = daily_df_display.copy()
+    filtered_daily = daily_df_display
     if month_filter != "All Months":
         filtered_daily = daily_df_display[daily_df_display['month'] == month_filter]
 
+    # Rolling statistics of daily satisfaction over the full history. The component keeps running
+    # sums and the EWMA state, so new days only extend it, and every date or month filter reads
+    # its days from the same state (windows reach back before the filtered range)
+    if "timeline_rolling" not in st.session_state:
+        st.session_state["timeline_rolling"] = RollingStats()
+
+    def sync_timeline_rolling():
+        rolling = st.session_state["timeline_rolling"]
+        rolling.sync(metric_matrix.start, metric_matrix.column('satisfaction_score'))
+        return rolling
+
+    timeline_rolling = derived_state("timeline_rolling_version", daily_version, sync_timeline_rolling)
+
+    def add_rolling_overlays(fig):
+        """Draw the selected rolling statistics at the filtered days (thinned to the chart width)"""
+        days = np.unique(filtered_daily['date'].to_numpy(dtype='datetime64[D]'))
+        positions = timeline_rolling.positions(days) if len(timeline_rolling) else np.array([], dtype=np.int64)
+        inside = (positions >= 0) & (positions < len(timeline_rolling))
+        days, positions = days[inside], positions[inside]
+        step = max(1, -(-len(positions) // int(timeline_resolution)))
+        days, positions = days[::step], positions[::step]
+        if not len(positions):
+            return
+        x = days.astype('datetime64[ns]')
+        hover = '<b>%{x|%B %d, %Y}</b><br>%{fullData.name}: %{y:.2f}<extra></extra>'
+
+        if "30-day ±1σ band" in timeline_overlays:
+            mean_30 = timeline_rolling.mean(30, positions)
+            std_30 = timeline_rolling.std(30, positions)
+            fig.add_trace(scatter_trace(
+                len(positions), webgl_threshold, x=x, y=mean_30 + std_30, mode='lines',
+                line=dict(width=0), showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(scatter_trace(
+                len(positions), webgl_threshold, x=x, y=mean_30 - std_30, mode='lines',
+                name='30-day ±1σ', line=dict(width=0), fill='tonexty',
+                fillcolor='rgba(140, 86, 75, 0.15)', customdata=std_30,
+                hovertemplate='<b>%{x|%B %d, %Y}</b><br>30-day σ: %{customdata:.2f}<extra></extra>'
+            ))
+        for label, window, color in (("7-day mean", 7, '#9467bd'), ("30-day mean", 30, '#8c564b')):
+            if label in timeline_overlays:
+                fig.add_trace(scatter_trace(
+                    len(positions), webgl_threshold, x=x, y=timeline_rolling.mean(window, positions),
+                    mode='lines', name=label, line=dict(color=color, width=2), hovertemplate=hover
+                ))
+        if f"EWMA ({DEFAULT_EWMA_SPAN}-day span)" in timeline_overlays:
+            fig.add_trace(scatter_trace(
+                len(positions), webgl_threshold, x=x, y=timeline_rolling.ewma(positions),
+                mode='lines', name=f"EWMA ({DEFAULT_EWMA_SPAN}-day span)",
+                line=dict(color='#17becf', width=2, dash='dot'), hovertemplate=hover
+            ))
+
     # Create timeline chart (Your original logic)
-    fig_timeline = go.Figure()
-
-    # Main satisfaction line
-    fig_timeline.add_trace(go.Scatter(
-        x=filtered_daily['date'],
-        y=filtered_daily['satisfaction_score'],
-        mode='lines+markers',
-        name='Daily Satisfaction',
-        line=dict(color='#1f77b4', width=2),
-        marker=dict(
-            size=6,
-            color=np.where(filtered_daily['satisfaction_score'] < 9.0, 'red', '#1f77b4'),
-            line=dict(width=1, color='white')
-        ),
-        hovertemplate='<b>%{x|%B %d, %Y}</b><br>' +
-                      'Satisfaction: %{y}<br>' +
-                      '<extra></extra>'
-    ))
-
-    # Add target line
-    if show_target:
-        fig_timeline.add_hline(
-            y=9.0,
-            line_dash="dash",
-            line_color="green",
-            annotation_text="Target (9.0)",
-            annotation_position="bottom right"
-        )
+    def build_timeline():
+        fig_timeline = go.Figure()
+
+        # Per-day count of survey metrics below target, gathered from the metric matrix
+        below_target_info = np.column_stack([
+            metric_matrix.lookup(filtered_daily['date'], metrics_below_target),
+            metric_matrix.lookup(filtered_daily['date'], metrics_tracked)
+        ])
+
+        # Downsample long histories to the chart's pixel width (below-target days and extremes are kept)
+        timeline_points = filtered_daily
+        if len(filtered_daily) > timeline_resolution:
+            keep_rows = downsample_indices(
+                filtered_daily['date'].to_numpy(dtype='datetime64[ns]').view(np.int64),
+                filtered_daily['satisfaction_score'].to_numpy(dtype=np.float64, na_value=np.nan),
+                int(timeline_resolution),
+                threshold=9.0
+            )
+            timeline_points = filtered_daily.iloc[keep_rows]
+            below_target_info = below_target_info[keep_rows]
+
+        # Main satisfaction line (WebGL above the configured point count)
+        timeline_point_count = len(timeline_points)
+        fig_timeline.add_trace(scatter_trace(
+            timeline_point_count,
+            webgl_threshold,
+            x=timeline_points['date'],
+            y=timeline_points['satisfaction_score'],
+            mode='lines+markers',
+            name='Daily Satisfaction',
+            line=dict(color='#1f77b4', width=2),
+            marker=dict(
+                size=6,
+                color=np.where(timeline_points['satisfaction_score'] < 9.0, 'red', '#1f77b4'),
+                line=dict(width=1, color='white')
+            ),
+            customdata=below_target_info,
+            hovertemplate='<b>%{x|%B %d, %Y}</b><br>' +
+                          'Satisfaction: %{y}<br>' +
+                          'Metrics below target: %{customdata[0]}/%{customdata[1]}<br>' +
+                          '<extra></extra>'
+        ))
 
-    # Highlight weekends
-    if show_weekends:
-        weekend_data = filtered_daily[filtered_daily['is_weekend']]
-        if not weekend_data.empty:
-            fig_timeline.add_trace(go.Scatter(
-                x=weekend_data['date'],
-                y=weekend_data['satisfaction_score'],
-                mode='markers',
-                name='Weekends',
-                marker=dict(size=8, color='orange', symbol='diamond'),
-                hovertemplate='<b>%{x|%B %d, %Y} (Weekend)</b><br>' +
-                              'Satisfaction: %{y}<br>' +
-                              '<extra></extra>'
-            ))
+        add_rolling_overlays(fig_timeline)
 
-    # Update layout for responsiveness
-    fig_timeline.update_layout(
-        title="Daily Customer Satisfaction Scores",
-        xaxis_title="Date",
-        yaxis_title="Satisfaction Score",
-        hovermode='closest',
-        height=500,
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
+        # Add target line
+        if show_target:
+            fig_timeline.add_hline(
+                y=9.0,
+                line_dash="dash",
+                line_color="green",
+                annotation_text="Target (9.0)",
+                annotation_position="bottom right"
+            )
 
-    # Make responsive
-    fig_timeline.update_layout(
-        autosize=True,
-        margin=dict(l=0, r=0, t=50, b=0),
+        # Highlight weekends
+        if show_weekends:
+            weekend_data = timeline_points[timeline_points['is_weekend']]
+            if not weekend_data.empty:
+                fig_timeline.add_trace(scatter_trace(
+                    timeline_point_count,
+                    webgl_threshold,
+                    x=weekend_data['date'],
+                    y=weekend_data['satisfaction_score'],
+                    mode='markers',
+                    name='Weekends',
+                    marker=dict(size=8, color='orange', symbol='diamond'),
+                    hovertemplate='<b>%{x|%B %d, %Y} (Weekend)</b><br>' +
+                                  'Satisfaction: %{y}<br>' +
+                                  '<extra></extra>'
+                ))
+
+        # Update layout for responsiveness
+        fig_timeline.update_layout(
+            title="Daily Customer Satisfaction Scores",
+            xaxis_title="Date",
+            yaxis_title="Satisfaction Score",
+            hovermode='closest',
+            height=500,
+            showlegend=True,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+
+        # Make responsive
+        fig_timeline.update_layout(
+            autosize=True,
+            margin=dict(l=0, r=0, t=50, b=0),
+        )
+        return fig_timeline
+
+    fig_timeline = figure_cache.get_or_build(
+        "timeline",
+        (daily_version, date_filter_key, month_filter, show_weekends, show_target,
+         tuple(timeline_overlays), int(timeline_resolution), int(webgl_threshold)),
+        build_timeline
     )
+    if len(filtered_daily) > timeline_resolution:
+        st.caption(f"📉 Showing {len(fig_timeline.data[0].x):,} of {len(filtered_daily):,} points (LTTB downsampled to the chart width)")
 
     st.plotly_chart(fig_timeline, use_container_width=True)
 
@@ -469,7 +807,7 @@ with tab1:
             st.metric("Lowest Score", "N/A")
 
 # TAB 2: Monthly Comparison (Your original code - UNCHANGED except using filtered data)
-with tab2:
+if active_view == "monthly":
     st.header("Monthly Performance Comparison")
 
     # Enhanced metric selector (same as your original)
@@ -484,87 +822,57 @@ with tab2:
         'Checkout Process': {'target': 9.0, 'format': '{:.2f}'}
     }
 
+    seed_widget("metric_selector", "Charges Stated Clearly")
     selected_metric = st.selectbox(
         "Select Metric:",
         options=list(metric_options.keys()),
-        index=6,  # Default to "Charges Stated Clearly"
         key="metric_selector"
     )
 
     target_score = metric_options[selected_metric]['target']
     score_format = metric_options[selected_metric]['format']
 
-    # Generate realistic data for the selected metric (Your original function)
-    @st.cache_data
+    # Monthly figures for the selected metric, read from the rollup cube (O(months), no row scan)
     def generate_metric_data(metric_name):
-        # Base scores for different months (realistic patterns)
-        month_data = {
-            'May-June 2025': {
-                'period': '2025-05-30 to 2025-06-30',
-                'total_days': 32,
-                'base_score': 9.48
-            },
-            'July 2025': {
-                'period': '2025-07-01 to 2025-07-31', 
-                'total_days': 31,
-                'base_score': 9.22
-            },
-            'August 2025': {
-                'period': '2025-08-01 to 2025-08-31',
-                'total_days': 31,
-                'base_score': 9.16
-            },
-            'September 2025': {
-                'period': '2025-09-01 to 2025-09-30',
-                'total_days': 30,
-                'base_score': 9.43
-            }
-        }
-
-        # Add some variation for different metrics
-        metric_variations = {
-            'Overall Satisfaction': [0, -0.1, -0.2, 0.05],
-            'Likelihood to Buy Again': [0.1, -0.05, -0.15, 0.08],
-            'Likelihood to Recommend': [-0.05, 0.03, -0.1, 0.12],
-            'Site Design': [0.2, 0.15, 0.1, 0.25],
-            'Ease of Finding': [0.15, 0.08, 0.05, 0.18],
-            'Product Information Clarity': [0.12, 0.06, 0.02, 0.15],
-            'Charges Stated Clearly': [0, 0, 0, 0],  # Base scores
-            'Checkout Process': [-0.2, -0.15, -0.25, -0.12]
-        }
-
-        variations = metric_variations.get(metric_name, [0, 0, 0, 0])
-
-        enhanced_data = []
-        for i, (month, data) in enumerate(month_data.items()):
-            score = data['base_score'] + variations[i]
-            days_below = max(0, int((target_score - score) * data['total_days'] / 2))
-
-            enhanced_data.append({
-                'month': month,
-                'period': data['period'],
-                'total_days': data['total_days'],
-                'average_score': score,
-                'days_below_target': days_below,
-                'days_below_percentage': (days_below / data['total_days']) * 100,
-                'performance_vs_target': score - target_score,
-                'classification': 'Excellent' if score >= target_score else 'Good' if score >= target_score - 0.5 else 'Needs Improvement'
-            })
-
-        return pd.DataFrame(enhanced_data)
+        column = SURVEY_METRICS[metric_name]
+        if not rollup_cube.has_metric(column):
+            return pd.DataFrame(columns=['month', 'period', 'total_days', 'average_score', 'days_below_target',
+                                         'days_below_percentage', 'performance_vs_target', 'classification'])
+
+        monthly = rollup_cube.frame('month', column)
+        score = monthly['mean']
+        return pd.DataFrame({
+            'month': monthly['period_start'].dt.strftime('%B %Y'),
+            'period': monthly['first_date'].dt.strftime('%Y-%m-%d') + ' to ' + monthly['last_date'].dt.strftime('%Y-%m-%d'),
+            'total_days': monthly['count'],
+            'average_score': score,
+            'days_below_target': monthly['days_below_target'],
+            'days_below_percentage': monthly['days_below_target'] / monthly['count'] * 100,
+            'performance_vs_target': score - target_score,
+            'classification': np.select(
+                [score >= target_score, score >= target_score - 0.5],
+                ['Excellent', 'Good'],
+                default='Needs Improvement'
+            )
+        })
 
     metric_data = generate_metric_data(selected_metric)
 
     # Monthly selector for comparison
+    seed_widget("monthly_comparison_enhanced", metric_data['month'].tolist())
+    # Months the current metric has no data for cannot stay selected
+    st.session_state["monthly_comparison_enhanced"] = [
+        month for month in st.session_state["monthly_comparison_enhanced"] if month in set(metric_data['month'])
+    ]
     comparison_months = st.multiselect(
         "Select months to compare:",
         options=metric_data['month'].tolist(),
-        default=metric_data['month'].tolist(),
         key="monthly_comparison_enhanced"
     )
 
     if comparison_months:
         comparison_data = metric_data[metric_data['month'].isin(comparison_months)]
+        monthly_figure_key = (daily_version, selected_metric, tuple(comparison_months))
 
         # Enhanced Monthly Performance Cards (Your original logic)
         st.subheader(f"Monthly Performance Cards - {selected_metric}")
@@ -611,61 +919,69 @@ with tab2:
 
         with col1:
             # Bar chart with target line and color coding
-            fig_bar_enhanced = px.bar(
-                comparison_data,
-                x='month',
-                y='average_score',
-                title=f"Monthly Comparison - {selected_metric}",
-                color='classification',
-                color_discrete_map={
-                    'Excellent': '#00aa00',
-                    'Good': '#ffaa00', 
-                    'Needs Improvement': '#ff4444'
-                },
-                text='average_score',
-                hover_data=['days_below_target', 'days_below_percentage']
-            )
+            def build_monthly_bar():
+                fig_bar_enhanced = px.bar(
+                    comparison_data,
+                    x='month',
+                    y='average_score',
+                    title=f"Monthly Comparison - {selected_metric}",
+                    color='classification',
+                    color_discrete_map={
+                        'Excellent': '#00aa00',
+                        'Good': '#ffaa00', 
+                        'Needs Improvement': '#ff4444'
+                    },
+                    text='average_score',
+                    hover_data=['days_below_target', 'days_below_percentage']
+                )
 
-            # Add target line
-            fig_bar_enhanced.add_hline(
-                y=target_score, 
-                line_dash="dash", 
-                line_color="red", 
-                annotation_text=f"Target ({target_score})",
-                annotation_position="top right"
-            )
+                # Add target line
+                fig_bar_enhanced.add_hline(
+                    y=target_score, 
+                    line_dash="dash", 
+                    line_color="red", 
+                    annotation_text=f"Target ({target_score})",
+                    annotation_position="top right"
+                )
 
-            # Update text format
-            fig_bar_enhanced.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig_bar_enhanced.update_layout(
-                height=450,
-                showlegend=True,
-                yaxis_title="Average Score",
-                xaxis_title="Period"
-            )
+                # Update text format
+                fig_bar_enhanced.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+                fig_bar_enhanced.update_layout(
+                    height=450,
+                    showlegend=True,
+                    yaxis_title="Average Score",
+                    xaxis_title="Period"
+                )
+                return fig_bar_enhanced
+
+            fig_bar_enhanced = figure_cache.get_or_build("monthly_bar", monthly_figure_key, build_monthly_bar)
             st.plotly_chart(fig_bar_enhanced, use_container_width=True)
 
         with col2:
             # Performance vs Target analysis
-            fig_performance = px.bar(
-                comparison_data,
-                x='month',
-                y='performance_vs_target',
-                title=f"Performance vs Target - {selected_metric}",
-                color='performance_vs_target',
-                color_continuous_scale='RdYlGn',
-                text='performance_vs_target'
-            )
+            def build_monthly_performance():
+                fig_performance = px.bar(
+                    comparison_data,
+                    x='month',
+                    y='performance_vs_target',
+                    title=f"Performance vs Target - {selected_metric}",
+                    color='performance_vs_target',
+                    color_continuous_scale='RdYlGn',
+                    text='performance_vs_target'
+                )
 
-            # Add zero line
-            fig_performance.add_hline(y=0, line_dash="solid", line_color="black", line_width=1)
+                # Add zero line
+                fig_performance.add_hline(y=0, line_dash="solid", line_color="black", line_width=1)
 
-            fig_performance.update_traces(texttemplate='%{text:+.2f}', textposition='outside')
-            fig_performance.update_layout(
-                height=450,
-                yaxis_title="Difference from Target",
-                xaxis_title="Period"
-            )
+                fig_performance.update_traces(texttemplate='%{text:+.2f}', textposition='outside')
+                fig_performance.update_layout(
+                    height=450,
+                    yaxis_title="Difference from Target",
+                    xaxis_title="Period"
+                )
+                return fig_performance
+
+            fig_performance = figure_cache.get_or_build("monthly_performance", monthly_figure_key, build_monthly_performance)
             st.plotly_chart(fig_performance, use_container_width=True)
 
         # Detailed performance summary (Your original logic continues...)
@@ -700,23 +1016,27 @@ with tab2:
             st.subheader("Trend Analysis")
 
             # Line chart showing trend over time
-            fig_trend = px.line(
-                comparison_data,
-                x='month',
-                y='average_score',
-                title=f"Performance Trend - {selected_metric}",
-                markers=True,
-                line_shape='linear'
-            )
+            def build_monthly_trend():
+                fig_trend = px.line(
+                    comparison_data,
+                    x='month',
+                    y='average_score',
+                    title=f"Performance Trend - {selected_metric}",
+                    markers=True,
+                    line_shape='linear'
+                )
 
-            fig_trend.add_hline(
-                y=target_score,
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"Target ({target_score})"
-            )
+                fig_trend.add_hline(
+                    y=target_score,
+                    line_dash="dash",
+                    line_color="red",
+                    annotation_text=f"Target ({target_score})"
+                )
+
+                fig_trend.update_layout(height=400)
+                return fig_trend
 
-            fig_trend.update_layout(height=400)
+            fig_trend = figure_cache.get_or_build("monthly_trend", monthly_figure_key, build_monthly_trend)
             st.plotly_chart(fig_trend, use_container_width=True)
 
             # Trend direction
@@ -750,39 +1070,43 @@ with tab2:
 print("✅ Part 2 created - First two tabs with original logic!")
 
 # TAB 3: Critical Events (Your original code - UNCHANGED except using filtered data)
-with tab3:
+if active_view == "events":
     st.header("Critical Events Analysis")
 
     # Enhanced filters with more options (Your original filters)
     col1, col2, col3 = st.columns(3)
 
     with col1:
+        seed_widget("failure_filter", 0)
         failure_threshold = st.slider(
             "Filter by Failure %:",
             min_value=0,
             max_value=100,
-            value=0,
             step=5,
             key="failure_filter"
         )
 
     with col2:
+        # Promotions present in the events (detected from the promotion calendar, or uploaded)
+        promotion_options = ['All promotions'] + sorted(events_df['promotion'].dropna().astype(str).unique())
+        if st.session_state.get("promotion_filter_enhanced", 'All promotions') not in promotion_options:
+            st.session_state["promotion_filter_enhanced"] = 'All promotions'
         promotion_filter = st.selectbox(
             "Filter by Promotion:",
-            options=['All promotions', 'Without promo', 'No promotion', '4th of July Event 7% OFF', 'Anniversary Sale Kick Off', 'Father Day Special 15% OFF', 'Labor Day Sale', 'Summer Clearance 20% OFF', 'Back to School Furniture', 'Fall Collection Launch'],
+            options=promotion_options,
             key="promotion_filter_enhanced"
         )
 
     with col3:
+        seed_widget("severity_filter_enhanced", ['Critical', 'High', 'Medium', 'Low'])
         severity_filter = st.multiselect(
             "Filter by Severity:",
             options=['Critical', 'High', 'Medium', 'Low'],
-            default=['Critical', 'High', 'Medium', 'Low'],
             key="severity_filter_enhanced"
         )
 
     # Apply filters (using filtered dataset)
-    filtered_events = events_df_display.copy()
+    filtered_events = events_df_display
 
     # Filter by failure percentage
     filtered_events = filtered_events[filtered_events['failure_percentage'] >= failure_threshold]
@@ -794,6 +1118,9 @@ with tab3:
     # Filter by severity
     filtered_events = filtered_events[filtered_events['severity'].isin(severity_filter)]
 
+    # Event charts depend on the filters above but not on the table sort order
+    events_figure_key = (events_dataset.version, date_filter_key, failure_threshold, promotion_filter, tuple(severity_filter))
+
     # Sort options (Your original logic)
     sort_options = st.columns(2)
     with sort_options[0]:
@@ -818,10 +1145,9 @@ with tab3:
         sorted_events = filtered_events.sort_values('failure_percentage', ascending=(sort_order == 'Ascending'))
     else:  # severity
         severity_order = {'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
-        sorted_events = filtered_events.copy()
-        sorted_events['severity_num'] = sorted_events['severity'].map(severity_order)
-        sorted_events = sorted_events.sort_values('severity_num', ascending=(sort_order == 'Ascending'))
-        sorted_events = sorted_events.drop('severity_num', axis=1)
+        sorted_events = filtered_events.sort_values(
+            'severity', key=lambda severity: severity.astype(str).map(severity_order), ascending=(sort_order == 'Ascending')
+        )
 
     # Display results summary (Your original logic)
     st.subheader(f"Events Analysis Results ({len(sorted_events)} events found)")
@@ -858,11 +1184,62 @@ with tab3:
             }
             return colors.get(severity, '⚪')
 
-        # Display table with enhanced formatting (Your original expandable cards)
-        for idx, (_, event) in enumerate(sorted_events.iterrows()):
+        # Paginated table: only the current page is sliced out and sent to the browser,
+        # so render cost depends on the page size rather than on the number of events
+        page_cols = st.columns([1, 1, 2])
+        with page_cols[0]:
+            seed_widget("events_page_size", 25)
+            page_size = st.selectbox("Rows per page:", options=[10, 25, 50, 100], key="events_page_size")
+        page_count = max(1, -(-len(sorted_events) // page_size))
+        seed_widget("events_page", 1)
+        if st.session_state["events_page"] > page_count:
+            st.session_state["events_page"] = page_count
+        with page_cols[1]:
+            page_number = st.number_input("Page:", min_value=1, max_value=page_count, step=1, key="events_page")
+        page_start = (page_number - 1) * page_size
+        page_events = sorted_events.iloc[page_start:page_start + page_size]
+        with page_cols[2]:
+            st.markdown("<br>", unsafe_allow_html=True)  # Spacing
+            st.caption(f"Showing events {page_start + 1:,}-{page_start + len(page_events):,} of {len(sorted_events):,} "
+                       f"(page {page_number} of {page_count})")
+
+        st.dataframe(
+            pd.DataFrame({
+                'Severity': page_events['severity'].astype(str).map(get_severity_color) + ' ' + page_events['severity'].astype(str),
+                'Date': page_events['date'].dt.strftime('%m/%d/%Y'),
+                'Day': page_events['day_of_week'],
+                'Failure %': page_events['failure_percentage'].round(1),
+                'Failed Metrics': failed_metrics_label(page_events),
+                'Anomalies': page_events['anomaly_metrics'] if 'anomaly_metrics' in page_events.columns else None,
+                'Promotion': page_events['promotion']
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
+        # Event details on demand (one detail panel instead of one expander per event). The choice is
+        # keyed on the event date, so paging, sorting or filtering never silently shows another event
+        page_dates = page_events['date'].dt.strftime('%Y-%m-%d').tolist()
+        if st.session_state.get("events_detail_date") not in page_dates:
+            st.session_state["events_detail_date"] = None
+        detail_date = st.selectbox(
+            "Event details:",
+            options=page_dates,
+            index=None,
+            format_func=lambda day: (f"{get_severity_color(page_events['severity'].iloc[page_dates.index(day)])} "
+                                     f"{pd.Timestamp(day).strftime('%m/%d/%Y')} - "
+                                     f"{page_events['failure_percentage'].iloc[page_dates.index(day)]:.1f}% Failure"),
+            placeholder="Select an event on this page",
+            key="events_detail_date"
+        )
+        if detail_date is not None:
+            detail_row = page_dates.index(detail_date)
+            event = page_events.iloc[detail_row]
             severity_icon = get_severity_color(event['severity'])
 
-            with st.expander(f"{severity_icon} {event['date'].strftime('%m/%d/%Y')} - {event['day_of_week']} - {event['failure_percentage']:.1f}% Failure ({event['severity']} Risk)"):
+            with st.container():
+                st.markdown(f"**{severity_icon} {event['date'].strftime('%m/%d/%Y')} - {event['day_of_week']} - "
+                            f"{event['failure_percentage']:.1f}% Failure ({event['severity']} Risk)**")
 
                 col1, col2, col3 = st.columns(3)
 
@@ -871,15 +1248,18 @@ with tab3:
                     st.write(f"**Day:** {event['day_of_week']}")
 
                 with col2:
-                    st.write(f"**Failed Metrics:** {event['failed_metrics']}")
+                    st.write(f"**Failed Metrics:** {failed_metrics_label(page_events.iloc[[detail_row]]).iloc[0]}")
                     st.write(f"**Failure Rate:** {event['failure_percentage']:.1f}%")
 
                 with col3:
                     st.write(f"**Promotion:** {event['promotion']}")
+                    if pd.notna(event.get('anomaly_metrics')) and event['anomaly_metrics'] > 0:
+                        st.write(f"**Anomalous Drops:** {int(event['anomaly_metrics'])} metric(s), "
+                                 f"lowest z-score {event['min_z_score']:.2f}")
                     st.write(f"**Severity:** {event['severity']}")
 
                 # Action button for timeline highlighting
-                if st.button(f"🔍 Highlight {event['date'].strftime('%m/%d')} in Timeline", key=f"highlight_enhanced_{idx}"):
+                if st.button(f"🔍 Highlight {event['date'].strftime('%m/%d')} in Timeline", key="highlight_event_detail"):
                     st.success(f"✅ Date {event['date'].strftime('%Y-%m-%d')} highlighted in timeline!")
                     st.balloons()
 
@@ -887,36 +1267,39 @@ with tab3:
         st.subheader("Events Impact Visualization")
 
         # Create scatter plot
-        fig_events_enhanced = px.scatter(
-            sorted_events,
-            x='date',
-            y='failure_percentage',
-            color='severity',
-            size='failure_percentage',
-            hover_data=['day_of_week', 'failed_metrics', 'promotion'],
-            title="Event Risk Analysis Over Time",
-            color_discrete_map={
-                'Critical': '#ff0000',
-                'High': '#ff8800', 
-                'Medium': '#ffaa00',
-                'Low': '#00aa00'
-            },
-            labels={'failure_percentage': 'Failure Percentage (%)', 'date': 'Date'}
-        )
+        def build_events_scatter():
+            fig_events_enhanced = px.scatter(
+                sorted_events.assign(failed_metrics=failed_metrics_label(sorted_events)),
+                x='date',
+                y='failure_percentage',
+                color='severity',
+                size='failure_percentage',
+                hover_data=['day_of_week', 'failed_metrics', 'promotion'],
+                title="Event Risk Analysis Over Time",
+                color_discrete_map={
+                    'Critical': '#ff0000',
+                    'High': '#ff8800', 
+                    'Medium': '#ffaa00',
+                    'Low': '#00aa00'
+                },
+                labels={'failure_percentage': 'Failure Percentage (%)', 'date': 'Date'},
+                render_mode=render_mode(len(sorted_events), webgl_threshold)
+            )
 
-        # Add risk threshold lines
-        fig_events_enhanced.add_hline(y=75, line_dash="dash", line_color="red", 
-                                    annotation_text="Critical Risk (75%+)")
-        fig_events_enhanced.add_hline(y=50, line_dash="dash", line_color="orange", 
-                                    annotation_text="High Risk (50%+)")
-        fig_events_enhanced.add_hline(y=25, line_dash="dash", line_color="yellow", 
-                                    annotation_text="Medium Risk (25%+)")
+            # Add risk threshold lines (where the detector's severity bands start)
+            for threshold, level, line_color in zip(reversed(SEVERITY_THRESHOLDS), ['Critical', 'High', 'Medium'],
+                                                    ['red', 'orange', 'yellow']):
+                fig_events_enhanced.add_hline(y=threshold, line_dash="dash", line_color=line_color,
+                                              annotation_text=f"{level} Risk ({threshold:.0f}%+)")
 
-        fig_events_enhanced.update_layout(
-            height=500,
-            showlegend=True,
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
+            fig_events_enhanced.update_layout(
+                height=500,
+                showlegend=True,
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            )
+            return fig_events_enhanced
+
+        fig_events_enhanced = figure_cache.get_or_build("events_scatter", events_figure_key + (int(webgl_threshold),), build_events_scatter)
 
         st.plotly_chart(fig_events_enhanced, use_container_width=True)
 
@@ -925,36 +1308,44 @@ with tab3:
 
         with col1:
             # Severity distribution
-            severity_counts = sorted_events['severity'].value_counts()
-            fig_severity = px.pie(
-                values=severity_counts.values,
-                names=severity_counts.index,
-                title="Events by Severity Level",
-                color_discrete_map={
-                    'Critical': '#ff0000',
-                    'High': '#ff8800', 
-                    'Medium': '#ffaa00',
-                    'Low': '#00aa00'
-                }
-            )
+            def build_events_severity():
+                severity_counts = sorted_events['severity'].value_counts()
+                fig_severity = px.pie(
+                    values=severity_counts.values,
+                    names=severity_counts.index,
+                    title="Events by Severity Level",
+                    color_discrete_map={
+                        'Critical': '#ff0000',
+                        'High': '#ff8800', 
+                        'Medium': '#ffaa00',
+                        'Low': '#00aa00'
+                    }
+                )
+                return fig_severity
+
+            fig_severity = figure_cache.get_or_build("events_severity", events_figure_key, build_events_severity)
             st.plotly_chart(fig_severity, use_container_width=True)
 
         with col2:
             # Failure rate by day of week
             if not sorted_events.empty:
-                day_analysis = sorted_events.groupby('day_of_week')['failure_percentage'].mean().reset_index()
-                day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-                day_analysis['day_of_week'] = pd.Categorical(day_analysis['day_of_week'], categories=day_order, ordered=True)
-                day_analysis = day_analysis.sort_values('day_of_week')
-
-                fig_days = px.bar(
-                    day_analysis,
-                    x='day_of_week',
-                    y='failure_percentage',
-                    title="Average Failure Rate by Day of Week",
-                    color='failure_percentage',
-                    color_continuous_scale='Reds'
-                )
+                def build_events_days():
+                    day_analysis = sorted_events.groupby('day_of_week', observed=True)['failure_percentage'].mean().reset_index()
+                    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+                    day_analysis['day_of_week'] = pd.Categorical(day_analysis['day_of_week'], categories=day_order, ordered=True)
+                    day_analysis = day_analysis.sort_values('day_of_week')
+
+                    fig_days = px.bar(
+                        day_analysis,
+                        x='day_of_week',
+                        y='failure_percentage',
+                        title="Average Failure Rate by Day of Week",
+                        color='failure_percentage',
+                        color_continuous_scale='Reds'
+                    )
+                    return fig_days
+
+                fig_days = figure_cache.get_or_build("events_days", events_figure_key, build_events_days)
                 st.plotly_chart(fig_days, use_container_width=True)
 
     else:
@@ -966,125 +1357,39 @@ print("✅ Part 2-3 continuation created!")
 
 
 # TAB 4: Risk Analysis (Your original code - UNCHANGED, all your advanced risk analysis logic)
-with tab4:
+if active_view == "risk":
     st.header("Advanced Risk Analysis Dashboard")
 
-    # Enhanced metric selector for risk analysis (Your original comprehensive risk options)
-    risk_metric_options = {
-        'Overall Satisfaction': {
-            'target': 9.0,
-            'current_scores': [9.48, 9.38, 9.36, 9.48],
-            'risk_factors': ['Service delays', 'Product quality issues', 'Delivery problems'],
-            'business_impact': 'Directly affects customer loyalty and retention rates. A decline in overall satisfaction can lead to reduced customer lifetime value and negative word-of-mouth marketing.',
-            'recommendations': [
-                'Implement proactive customer service monitoring with real-time alerts',
-                'Establish quality control checkpoints throughout the customer journey',
-                'Create customer feedback loops for rapid issue identification and resolution',
-                'Deploy sentiment analysis tools to monitor customer communications'
-            ]
-        },
-        'Likelihood to Buy Again': {
-            'target': 9.0,
-            'current_scores': [9.58, 9.33, 9.21, 9.56],
-            'risk_factors': ['Competitive pricing', 'Product availability', 'Customer service experience'],
-            'business_impact': 'Critical for revenue retention and customer lifetime value. Low scores indicate potential revenue leakage and increased customer acquisition costs.',
-            'recommendations': [
-                'Develop comprehensive customer loyalty programs with personalized incentives',
-                'Monitor competitor pricing strategies and implement dynamic pricing models',
-                'Improve inventory management systems to reduce stockouts',
-                'Create predictive models to identify at-risk customers for proactive retention efforts'
-            ]
-        },
-        'Likelihood to Recommend': {
-            'target': 9.0,
-            'current_scores': [9.43, 9.25, 9.06, 9.60],
-            'risk_factors': ['Word-of-mouth reputation', 'Social media presence', 'Customer advocacy'],
-            'business_impact': 'Affects organic growth and brand reputation in the market. Low recommendation scores can significantly impact new customer acquisition through referrals.',
-            'recommendations': [
-                'Create structured referral incentive programs with clear rewards',
-                'Monitor and actively respond to online reviews and social media mentions',
-                'Develop customer ambassador programs to leverage satisfied customers',
-                'Implement Net Promoter Score (NPS) tracking with follow-up actions for detractors'
-            ]
-        },
-        'Site Design': {
-            'target': 9.0,
-            'current_scores': [9.68, 9.37, 9.26, 9.73],
-            'risk_factors': ['User interface complexity', 'Mobile responsiveness', 'Loading speed'],
-            'business_impact': 'Influences first impressions and user engagement rates. Poor site design can lead to high bounce rates and reduced conversion rates.',
-            'recommendations': [
-                'Conduct regular UX/UI testing with A/B testing for continuous optimization',
-                'Implement mobile-first design principles with responsive layouts',
-                'Optimize site performance and loading times (target <3 seconds)',
-                'Use heatmap analysis to identify user behavior patterns and pain points'
-            ]
-        },
-        'Ease of Finding': {
-            'target': 9.0,
-            'current_scores': [9.63, 9.30, 9.21, 9.66],
-            'risk_factors': ['Search functionality', 'Product categorization', 'Navigation structure'],
-            'business_impact': 'Affects conversion rates and user satisfaction during shopping. Poor findability leads to increased cart abandonment and reduced sales.',
-            'recommendations': [
-                'Enhance search algorithm with AI-powered search suggestions and auto-complete',
-                'Improve product categorization and tagging with detailed filters',
-                'Implement intelligent product recommendations based on user behavior',
-                'Add visual search capabilities and improved site navigation structure'
-            ]
-        },
-        'Product Information Clarity': {
-            'target': 9.0,
-            'current_scores': [9.60, 9.28, 9.18, 9.63],
-            'risk_factors': ['Product descriptions accuracy', 'Image quality', 'Specification completeness'],
-            'business_impact': 'Reduces returns and increases purchase confidence. Clear product information directly correlates with reduced customer service inquiries and returns.',
-            'recommendations': [
-                'Standardize product information templates with consistent formatting',
-                'Implement 360-degree product views and high-resolution image galleries',
-                'Add customer Q&A sections and user-generated content for each product',
-                'Create detailed size guides and compatibility charts for furniture items'
-            ]
-        },
-        'Charges Stated Clearly': {
-            'target': 9.0,
-            'current_scores': [9.48, 9.22, 9.16, 9.43],
-            'risk_factors': ['Hidden fees', 'Shipping cost transparency', 'Tax calculation accuracy'],
-            'business_impact': 'Critical for trust and completing transactions without abandonment. Unclear pricing is a major cause of cart abandonment and customer complaints.',
-            'recommendations': [
-                'Display all fees upfront in the shopping process with no hidden costs',
-                'Implement transparent pricing calculator showing taxes, shipping, and fees',
-                'Provide clear breakdown of all charges before checkout with explanations',
-                'Add shipping cost estimator on product pages based on customer location'
-            ]
-        },
-        'Checkout Process': {
-            'target': 9.0,
-            'current_scores': [9.28, 9.07, 8.91, 9.31],
-            'risk_factors': ['Process complexity', 'Payment security', 'Guest checkout availability'],
-            'business_impact': 'Directly affects conversion rates and cart abandonment. Complex checkout processes can result in up to 70% cart abandonment rates.',
-            'recommendations': [
-                'Simplify checkout to minimum required steps (target: 3 steps or fewer)',
-                'Offer multiple payment options including digital wallets (Apple Pay, Google Pay)',
-                'Implement guest checkout and save-for-later options',
-                'Add progress indicators and clear security badges to build trust'
-            ]
-        }
-    }
-
-    # Metric selector for detailed risk analysis (Your original selector)
-    selected_risk_metric = st.selectbox(
-        "Select Metric for Detailed Risk Analysis:",
-        options=list(risk_metric_options.keys()),
-        key="risk_metric_selector"
-    )
+    selector_col1, selector_col2 = st.columns([3, 1])
+    with selector_col2:
+        risk_segment = st.selectbox(
+            "Segment:",
+            options=risk_engine.segments,
+            key="risk_segment",
+            help="Score every metric over all days, weekdays only or weekends only"
+        )
+    with selector_col1:
+        # Metric selector for detailed risk analysis (only metrics with daily data can be analyzed)
+        selected_risk_metric = st.selectbox(
+            "Select Metric for Detailed Risk Analysis:",
+            options=[metric for metric in risk_metric_options
+                     if risk_engine.has_data(SURVEY_METRICS[metric], risk_segment)],
+            key="risk_metric_selector"
+        )
+    if selected_risk_metric is None:
+        st.info("📭 No metric has data for this segment yet. Pick another segment or upload data for it.")
 
+if active_view == "risk" and selected_risk_metric is not None:
     metric_info = risk_metric_options[selected_risk_metric]
-    target_score = metric_info['target']
-    monthly_scores = metric_info['current_scores']
-    months = ['May-June 2025', 'July 2025', 'August 2025', 'September 2025']
-
-    # Calculate risk metrics (Your original calculations)
-    performance_gaps = [target_score - score for score in monthly_scores]
-    risk_levels = ['High Risk' if gap > 0.5 else 'Medium Risk' if gap > 0.2 else 'Low Risk' for gap in performance_gaps]
-    trend_direction = monthly_scores[-1] - monthly_scores[0]
+    # Monthly scores, gaps, trend slopes and risk levels come from the risk engine
+    trend_df = risk_engine.metric_frame(SURVEY_METRICS[selected_risk_metric], risk_segment, *risk_thresholds)
+    target_score = trend_df['Target'].iloc[0]
+    trend_df['Month'] = trend_df['period_start'].dt.strftime('%B %Y')
+    monthly_scores = trend_df['Score']
+    performance_gaps = trend_df['Gap']
+    trend_direction = monthly_scores.iloc[-1] - monthly_scores.iloc[0]
+    risk_view_key = (daily_version, risk_segment, risk_thresholds)
+    risk_figure_key = risk_view_key + (selected_risk_metric,)
 
     # Create comprehensive risk dashboard (Your original dashboard)
     st.subheader(f"Risk Analysis: {selected_risk_metric}")
@@ -1093,7 +1398,7 @@ with tab4:
     col1, col2, col3, col4 = st.columns(4)
 
     with col1:
-        current_score = monthly_scores[-1]
+        current_score = monthly_scores.iloc[-1]
         delta_value = current_score - target_score
         st.metric(
             "Current Score",
@@ -1102,80 +1407,84 @@ with tab4:
         )
 
     with col2:
-        avg_score = sum(monthly_scores) / len(monthly_scores)
-        st.metric("Average Score", f"{avg_score:.2f}")
+        avg_score = monthly_scores.mean()
+        st.metric("Average Score", f"{avg_score:.2f}",
+                  help=f"Month-to-month volatility: {monthly_scores.std(ddof=0):.2f}")
 
     with col3:
-        max_gap = max(performance_gaps)
-        risk_status = 'High' if max_gap > 0.5 else 'Medium' if max_gap > 0.2 else 'Low'
+        max_gap = performance_gaps.max()
+        risk_status = 'High' if max_gap > risk_high_gap else 'Medium' if max_gap > risk_medium_gap else 'Low'
         st.metric("Risk Level", risk_status)
 
     with col4:
         trend_emoji = "📈" if trend_direction > 0.1 else "📉" if trend_direction < -0.1 else "➡️"
         trend_text = "Improving" if trend_direction > 0.1 else "Declining" if trend_direction < -0.1 else "Stable"
-        st.metric("Trend", f"{trend_emoji} {trend_text}")
+        latest_slope = trend_df['Trend_Slope'].iloc[-1]
+        st.metric("Trend", f"{trend_emoji} {trend_text}",
+                  help=None if pd.isna(latest_slope) else
+                  f"Least-squares slope over the last {risk_engine.trend_window} months: {latest_slope:+.2f} per month")
 
     # Performance trend chart (Your original charts)
     col1, col2 = st.columns(2)
 
     with col1:
         # Monthly performance trend
-        trend_df = pd.DataFrame({
-            'Month': months,
-            'Score': monthly_scores,
-            'Target': [target_score] * len(months),
-            'Gap': performance_gaps,
-            'Risk_Level': risk_levels
-        })
-
-        fig_trend = go.Figure()
+        def build_risk_trend():
+            fig_trend = go.Figure()
+
+            # Actual scores line
+            fig_trend.add_trace(go.Scatter(
+                x=trend_df['Month'],
+                y=trend_df['Score'],
+                mode='lines+markers',
+                name='Actual Score',
+                line=dict(color='blue', width=3),
+                marker=dict(size=8)
+            ))
 
-        # Actual scores line
-        fig_trend.add_trace(go.Scatter(
-            x=trend_df['Month'],
-            y=trend_df['Score'],
-            mode='lines+markers',
-            name='Actual Score',
-            line=dict(color='blue', width=3),
-            marker=dict(size=8)
-        ))
+            # Target line
+            fig_trend.add_trace(go.Scatter(
+                x=trend_df['Month'],
+                y=trend_df['Target'],
+                mode='lines',
+                name='Target',
+                line=dict(color='red', width=2, dash='dash')
+            ))
 
-        # Target line
-        fig_trend.add_trace(go.Scatter(
-            x=trend_df['Month'],
-            y=trend_df['Target'],
-            mode='lines',
-            name='Target',
-            line=dict(color='red', width=2, dash='dash')
-        ))
+            fig_trend.update_layout(
+                title=f"{selected_risk_metric} - Performance Trend",
+                xaxis_title="Month",
+                yaxis_title="Score",
+                height=400,
+                showlegend=True
+            )
+            return fig_trend
 
-        fig_trend.update_layout(
-            title=f"{selected_risk_metric} - Performance Trend",
-            xaxis_title="Month",
-            yaxis_title="Score",
-            height=400,
-            showlegend=True
-        )
+        fig_trend = figure_cache.get_or_build("risk_trend", risk_figure_key, build_risk_trend)
 
         st.plotly_chart(fig_trend, use_container_width=True)
 
     with col2:
         # Risk level distribution
-        fig_risk_bar = px.bar(
-            trend_df,
-            x='Month',
-            y='Gap',
-            color='Risk_Level',
-            title=f"{selected_risk_metric} - Performance Gap Analysis",
-            color_discrete_map={
-                'High Risk': '#ff4444',
-                'Medium Risk': '#ffaa00',
-                'Low Risk': '#00aa00'
-            }
-        )
+        def build_risk_gap():
+            fig_risk_bar = px.bar(
+                trend_df,
+                x='Month',
+                y='Gap',
+                color='Risk_Level',
+                title=f"{selected_risk_metric} - Performance Gap Analysis",
+                color_discrete_map={
+                    'High Risk': '#ff4444',
+                    'Medium Risk': '#ffaa00',
+                    'Low Risk': '#00aa00'
+                }
+            )
+
+            fig_risk_bar.add_hline(y=0, line_dash="solid", line_color="black")
+            fig_risk_bar.update_layout(height=400)
+            return fig_risk_bar
 
-        fig_risk_bar.add_hline(y=0, line_dash="solid", line_color="black")
-        fig_risk_bar.update_layout(height=400)
+        fig_risk_bar = figure_cache.get_or_build("risk_gap", risk_figure_key, build_risk_gap)
         st.plotly_chart(fig_risk_bar, use_container_width=True)
 
     # ALL THE REST OF YOUR ORIGINAL RISK ANALYSIS CODE CONTINUES HERE...
@@ -1184,69 +1493,62 @@ with tab4:
     # Comparative analysis across all metrics
     st.subheader("Comparative Risk Analysis - All Metrics")
 
-    # Create comprehensive comparison data
-    all_metrics_data = []
-    for metric, info in risk_metric_options.items():
-        current = info['current_scores'][-1]
-        avg = sum(info['current_scores']) / len(info['current_scores'])
-        gap = info['target'] - current
-        trend = info['current_scores'][-1] - info['current_scores'][0]
-
-        all_metrics_data.append({
-            'Metric': metric,
-            'Current_Score': current,
-            'Average_Score': avg,
-            'Performance_Gap': gap,
-            'Trend_Direction': trend,
-            'Risk_Level': 'High Risk' if gap > 0.5 else 'Medium Risk' if gap > 0.2 else 'Low Risk'
-        })
-
-    comparison_df = pd.DataFrame(all_metrics_data)
+    # Create comprehensive comparison data (one row per metric, straight from the risk engine)
+    comparison_df = risk_engine.summary(risk_segment, *risk_thresholds)
+    comparison_df.insert(0, 'Metric', comparison_df.pop('metric').map(METRIC_NAMES))
 
     # Comprehensive comparison charts
     col1, col2 = st.columns(2)
 
     with col1:
         # Current score comparison
-        fig_comparison = px.bar(
-            comparison_df.sort_values('Current_Score', ascending=True),
-            x='Current_Score',
-            y='Metric',
-            orientation='h',
-            color='Risk_Level',
-            title="Current Performance - All Metrics",
-            color_discrete_map={
-                'High Risk': '#ff4444',
-                'Medium Risk': '#ffaa00',
-                'Low Risk': '#00aa00'
-            }
-        )
+        def build_risk_comparison():
+            fig_comparison = px.bar(
+                comparison_df.sort_values('Current_Score', ascending=True),
+                x='Current_Score',
+                y='Metric',
+                orientation='h',
+                color='Risk_Level',
+                title="Current Performance - All Metrics",
+                color_discrete_map={
+                    'High Risk': '#ff4444',
+                    'Medium Risk': '#ffaa00',
+                    'Low Risk': '#00aa00'
+                }
+            )
 
-        fig_comparison.add_vline(x=9.0, line_dash="dash", line_color="red", 
-                               annotation_text="Target (9.0)")
-        fig_comparison.update_layout(height=500)
+            fig_comparison.add_vline(x=9.0, line_dash="dash", line_color="red", 
+                                   annotation_text="Target (9.0)")
+            fig_comparison.update_layout(height=500)
+            return fig_comparison
+
+        fig_comparison = figure_cache.get_or_build("risk_comparison", risk_view_key, build_risk_comparison)
         st.plotly_chart(fig_comparison, use_container_width=True)
 
     with col2:
         # Performance gap analysis
-        fig_gaps = px.scatter(
-            comparison_df,
-            x='Performance_Gap',
-            y='Trend_Direction',
-            size='Current_Score',
-            color='Risk_Level',
-            hover_data=['Metric', 'Average_Score'],
-            title="Risk vs Trend Analysis Matrix",
-            color_discrete_map={
-                'High Risk': '#ff4444',
-                'Medium Risk': '#ffaa00',
-                'Low Risk': '#00aa00'
-            }
-        )
+        def build_risk_matrix():
+            fig_gaps = px.scatter(
+                comparison_df,
+                x='Performance_Gap',
+                y='Trend_Direction',
+                size='Current_Score',
+                color='Risk_Level',
+                hover_data=['Metric', 'Average_Score', 'Trend_Slope', 'Volatility'],
+                title="Risk vs Trend Analysis Matrix",
+                color_discrete_map={
+                    'High Risk': '#ff4444',
+                    'Medium Risk': '#ffaa00',
+                    'Low Risk': '#00aa00'
+                }
+            )
+
+            fig_gaps.add_vline(x=0, line_dash="dash", line_color="gray")
+            fig_gaps.add_hline(y=0, line_dash="dash", line_color="gray")
+            fig_gaps.update_layout(height=500)
+            return fig_gaps
 
-        fig_gaps.add_vline(x=0, line_dash="dash", line_color="gray")
-        fig_gaps.add_hline(y=0, line_dash="dash", line_color="gray")
-        fig_gaps.update_layout(height=500)
+        fig_gaps = figure_cache.get_or_build("risk_matrix", risk_view_key, build_risk_matrix)
         st.plotly_chart(fig_gaps, use_container_width=True)
 
     # ===================================================================
@@ -1254,91 +1556,92 @@ with tab4:
     # ===================================================================
     st.subheader("📈 Performance Evolution - All Metrics")
 
-    # Create comprehensive performance evolution chart
-    months_evolution = ['May-June 2025', 'July 2025', 'August 2025', 'September 2025']
-
-    # All metrics data for evolution chart
+    # Monthly averages of every metric in the selected segment, from the risk engine
+    segment_means = risk_engine.means(risk_segment)
     all_metrics_evolution = {
-        'Overall Satisfaction': [9.48, 9.38, 9.36, 9.48],
-        'Likelihood to Buy Again': [9.58, 9.33, 9.21, 9.56],
-        'Likelihood to Recommend': [9.43, 9.25, 9.06, 9.60],
-        'Site Design': [9.68, 9.37, 9.26, 9.73],
-        'Ease of Finding': [9.63, 9.30, 9.21, 9.66],
-        'Product Information Clarity': [9.60, 9.28, 9.18, 9.63],
-        'Charges Stated Clearly': [9.48, 9.22, 9.16, 9.43],
-        'Checkout Process': [9.28, 9.07, 8.91, 9.31]
+        metric: segment_means[column].dropna()
+        for metric, column in SURVEY_METRICS.items()
+        if column in segment_means.columns and segment_means[column].notna().any()
     }
 
     # Create the evolution chart
-    fig_evolution = go.Figure()
-
-    # Define colors for each metric
-    colors = [
-        '#1f77b4',  # Overall Satisfaction - blue
-        '#ff7f0e',  # Likelihood to Buy Again - orange
-        '#2ca02c',  # Likelihood to Recommend - green
-        '#d62728',  # Site Design - red
-        '#9467bd',  # Ease of Finding - purple
-        '#8c564b',  # Product Information Clarity - brown
-        '#e377c2',  # Charges Stated Clearly - pink
-        '#7f7f7f'   # Checkout Process - gray
-    ]
+    def build_risk_evolution():
+        fig_evolution = go.Figure()
+
+        # Define colors for each metric, by name so a metric without data doesn't shift the others
+        colors = {
+            'Overall Satisfaction': '#1f77b4',  # blue
+            'Likelihood to Buy Again': '#ff7f0e',  # orange
+            'Likelihood to Recommend': '#2ca02c',  # green
+            'Site Design': '#d62728',  # red
+            'Ease of Finding': '#9467bd',  # purple
+            'Product Information Clarity': '#8c564b',  # brown
+            'Charges Stated Clearly': '#e377c2',  # pink
+            'Checkout Process': '#7f7f7f'  # gray
+        }
 
-    # Add each metric line
-    for i, (metric, scores) in enumerate(all_metrics_evolution.items()):
-        fig_evolution.add_trace(go.Scatter(
-            x=months_evolution,
-            y=scores,
-            mode='lines+markers',
-            name=metric,
-            line=dict(color=colors[i], width=2.5),
-            marker=dict(size=7, line=dict(width=1, color='white')),
-            hovertemplate=f'<b>{metric}</b><br>' +
-                          'Month: %{x}<br>' +
-                          'Score: %{y:.2f}<br>' +
-                          '<extra></extra>'
-        ))
+        # Add each metric line
+        for metric, scores in all_metrics_evolution.items():
+            fig_evolution.add_trace(go.Scatter(
+                x=scores.index.strftime('%B %Y'),
+                y=scores.values,
+                mode='lines+markers',
+                name=metric,
+                line=dict(color=colors.get(metric), width=2.5),
+                marker=dict(size=7, line=dict(width=1, color='white')),
+                hovertemplate=f'<b>{metric}</b><br>' +
+                              'Month: %{x}<br>' +
+                              'Score: %{y:.2f}<br>' +
+                              '<extra></extra>'
+            ))
 
-    # Add target line
-    fig_evolution.add_hline(
-        y=9.0,
-        line_dash="dash",
-        line_color="red",
-        line_width=2,
-        annotation_text="Target (9.0)",
-        annotation_position="top right"
-    )
+        # Add target line
+        fig_evolution.add_hline(
+            y=9.0,
+            line_dash="dash",
+            line_color="red",
+            line_width=2,
+            annotation_text="Target (9.0)",
+            annotation_position="top right"
+        )
+
+        # Keep the target line in view whatever the data range is
+        all_evolution_scores = np.concatenate([scores.values for scores in all_metrics_evolution.values()])
+        evolution_range = [min(all_evolution_scores.min(), 9.0) - 0.2, max(all_evolution_scores.max(), 9.0) + 0.2]
 
-    # Update layout for the evolution chart
-    fig_evolution.update_layout(
-        title="Performance Evolution - All Metrics Over Time",
-        xaxis_title="Month",
-        yaxis_title="Score",
-        height=600,
-        showlegend=True,
-        legend=dict(
-            orientation="v",
-            yanchor="top",
-            y=1,
-            xanchor="left", 
-            x=1.01,
-            bgcolor="rgba(255,255,255,0.8)",
-            bordercolor="rgba(0,0,0,0.2)",
-            borderwidth=1
-        ),
-        hovermode='x unified',
-        plot_bgcolor='rgba(248,250,252,0.8)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        xaxis=dict(
-            gridcolor='rgba(226,232,240,0.8)',
-            gridwidth=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(226,232,240,0.8)',
-            gridwidth=1,
-            range=[8.8, 9.8]
+        # Update layout for the evolution chart
+        fig_evolution.update_layout(
+            title="Performance Evolution - All Metrics Over Time",
+            xaxis_title="Month",
+            yaxis_title="Score",
+            height=600,
+            showlegend=True,
+            legend=dict(
+                orientation="v",
+                yanchor="top",
+                y=1,
+                xanchor="left", 
+                x=1.01,
+                bgcolor="rgba(255,255,255,0.8)",
+                bordercolor="rgba(0,0,0,0.2)",
+                borderwidth=1
+            ),
+            hovermode='x unified',
+            plot_bgcolor='rgba(248,250,252,0.8)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            xaxis=dict(
+                gridcolor='rgba(226,232,240,0.8)',
+                gridwidth=1
+            ),
+            yaxis=dict(
+                gridcolor='rgba(226,232,240,0.8)',
+                gridwidth=1,
+                range=evolution_range
+            )
         )
-    )
+        return fig_evolution
+
+    fig_evolution = figure_cache.get_or_build("risk_evolution", (daily_version, risk_segment), build_risk_evolution)
 
     st.plotly_chart(fig_evolution, use_container_width=True)
 
@@ -1348,7 +1651,7 @@ with tab4:
 
     with col1:
         # Best performing metrics
-        latest_scores = {metric: scores[-1] for metric, scores in all_metrics_evolution.items()}
+        latest_scores = {metric: scores.iloc[-1] for metric, scores in all_metrics_evolution.items()}
         best_metric = max(latest_scores, key=latest_scores.get)
         worst_metric = min(latest_scores, key=latest_scores.get)
 
@@ -1366,7 +1669,7 @@ with tab4:
         declining_metrics = []
 
         for metric, scores in all_metrics_evolution.items():
-            trend = scores[-1] - scores[0]
+            trend = scores.iloc[-1] - scores.iloc[0]
             if trend > 0.05:
                 improving_metrics.append(f"📈 {metric}")
             elif trend < -0.05:
@@ -1418,85 +1721,199 @@ with tab4:
 # NEW FEATURE 1: DATA UPLOAD & INTEGRATION SECTION (Added at the END)
 # ============================================================================
 
-st.markdown("---")
-st.markdown("## 📂 Data Upload & Integration")
+if active_view == "upload":
+    st.markdown("---")
+    st.markdown("## 📂 Data Upload & Integration")
 
-st.markdown("""
+    st.markdown("""
 <div class="upload-section">
     <h3 style="margin: 0 0 1rem 0; color: #667eea;">🔄 Extend Your Analytics with New Data</h3>
     <p style="margin: 0; color: #64748b;">Upload CSV or Excel files to seamlessly merge with existing datasets. New data will be automatically integrated and all dashboards will update dynamically.</p>
 </div>
 """, unsafe_allow_html=True)
 
-# Upload controls
-upload_col1, upload_col2 = st.columns([2, 1])
-
-with upload_col1:
-    uploaded_files = st.file_uploader(
-        "📁 Choose CSV or Excel files to upload",
-        accept_multiple_files=True,
-        type=['csv', 'xlsx', 'xls'],
-        help="Upload multiple files - they will be automatically merged with existing data",
-        key="data_upload_files"
-    )
+    # Upload controls
+    upload_col1, upload_col2 = st.columns([2, 1])
+
+    with upload_col1:
+        uploaded_files = st.file_uploader(
+            "📁 Choose CSV or Excel files to upload",
+            accept_multiple_files=True,
+            type=['csv', 'xlsx', 'xls'],
+            help="Upload multiple files - they will be automatically merged with existing data",
+            # A new key empties the uploader after "Clear", so its files are not ingested again
+            key=f"data_upload_files_{st.session_state.get('upload_widget_generation', 0)}"
+        )
 
-with upload_col2:
-    st.markdown("#### 📋 Upload Guidelines")
-    st.markdown("""
+    with upload_col2:
+        st.markdown("#### 📋 Upload Guidelines")
+        st.markdown("""
     - **Daily Data**: Must include 'date' column
     - **Events Data**: Must include 'date' and 'severity' columns  
     - **Duplicates**: Automatically removed by date
     - **Formats**: CSV, Excel (.xlsx, .xls) supported
     """)
 
-# Process uploaded files
-if uploaded_files:
-    with st.spinner("🔄 Processing uploaded files..."):
-        try:
+    # Process uploaded files
+    if uploaded_files:
+        with st.spinner("🔄 Processing uploaded files..."):
             new_daily_files = []
             new_events_files = []
             processed_files = []
-
+            failed_files = []
+
+            ledger = st.session_state["ingestion_ledger"]
+            # Only files newly re-uploaded in this rerun count as skipped (not the ones the uploader keeps)
+            hits_before = ledger.hits
+            skipped_files = 0
+            # Content key of each dataset after the uploads applied so far, and this batch's forks
+            lineage_keys = {name: handle.key for name, handle in dataset_handles.items()}
+            forked_datasets = {}
+            # Rows merged from each upload (by content hash), stored with the registered datasets
+            upload_rows = {name: handle.info.get('upload_rows', {}) for name, handle in dataset_handles.items()}
+            # Memory this batch's forks will hold once merged (not yet counted by the registry)
+            batch_bytes = 0
+
+            # Files already ingested (same content hash) are neither re-parsed nor re-appended
+            pending_files = []
+            batch_digests = set()
             for uploaded_file in uploaded_files:
-                # Read file based on extension
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                else:  # Excel files
-                    df = pd.read_excel(uploaded_file)
-
-                # Convert date columns to datetime
-                date_columns = [col for col in df.columns if 'date' in col.lower()]
-                for date_col in date_columns:
-                    df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
-
-                # Categorize file based on columns
-                if 'satisfaction_score' in df.columns or 'daily' in uploaded_file.name.lower():
-                    # Daily satisfaction data
-                    if 'date' in df.columns:
-                        new_daily_files.append(df)
-                        processed_files.append({'name': uploaded_file.name, 'type': 'Daily Data', 'rows': len(df), 'columns': len(df.columns)})
-                    else:
-                        st.error(f"❌ {uploaded_file.name}: Daily data files must include a 'date' column")
-
-                elif 'severity' in df.columns or 'event' in uploaded_file.name.lower():
-                    # Events data
-                    if 'date' in df.columns:
-                        new_events_files.append(df)
-                        processed_files.append({'name': uploaded_file.name, 'type': 'Events Data', 'rows': len(df), 'columns': len(df.columns)})
+                digest = ledger.digest(uploaded_file)
+                if ledger.is_ingested(digest, uploaded_file):
+                    continue
+                if digest in batch_digests:
+                    skipped_files += 1
+                    continue
+                batch_digests.add(digest)
+                pending_files.append((uploaded_file, digest))
+            skipped_files += ledger.hits - hits_before
+
+            # Parse every new file up front, concurrently; large CSVs are streamed in chunks later
+            parsed_frames = {}
+            parse_results = {}
+            to_parse = []
+            for uploaded_file, digest in pending_files:
+                df = ledger.cached_parse(digest)
+                if df is not None:
+                    parsed_frames[digest] = df
+                elif not should_stream(uploaded_file):
+                    to_parse.append((uploaded_file, digest))
+            if to_parse:
+                parser = upload_parser()
+                results = parser.parse([(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file, _ in to_parse])
+                for (uploaded_file, digest), result in zip(to_parse, results):
+                    ledger.account(result.nbytes, result.seconds)
+                    parse_results[digest] = result
+                    if result.ok:
+                        parsed_frames[digest] = result.df
+                        ledger.cache_parse(digest, result.df)
+                if len(to_parse) > 1:
+                    st.caption(
+                        f"⚡ Parsed {len(to_parse)} file(s) in {parser.last_batch_seconds:.2f}s using up to "
+                        f"{min(parser.max_workers, len(to_parse))} worker process(es) "
+                        f"({sum(result.seconds for result in results):.2f}s of parse time in total)"
+                    )
+
+            # Merge in upload order; a failing file is reported and left out, the rest still apply
+            for uploaded_file, digest in pending_files:
+                result = parse_results.get(digest)
+                if result is not None and not result.ok:
+                    st.error(f"❌ {uploaded_file.name}: could not be read ({result.error})")
+                    failed_files.append({'name': uploaded_file.name, 'error': result.error})
+                    continue
+
+                forks_before = dict(forked_datasets)
+                try:
+                    df = parsed_frames.get(digest)
+                    stream = None
+                    if df is not None:
+                        columns = list(df.columns)
                     else:
-                        st.error(f"❌ {uploaded_file.name}: Events data files must include a 'date' column")
-
-                else:
-                    # Try to auto-detect based on columns
-                    if 'date' in df.columns and len(df.columns) >= 3:
-                        # Default to daily data if ambiguous
-                        new_daily_files.append(df)
-                        processed_files.append({'name': uploaded_file.name, 'type': 'Daily Data (auto-detected)', 'rows': len(df), 'columns': len(df.columns)})
+                        stream = CsvChunkStream(uploaded_file)
+                        columns = stream.columns
+
+                    # Categorize file based on columns
+                    target, file_type, problem = pipeline.classify_upload(uploaded_file.name, columns)
+                    if problem is not None and file_type is None:
+                        st.warning(f"⚠️ {uploaded_file.name}: {problem}")
+                    elif problem is not None:
+                        st.error(f"❌ {uploaded_file.name}: {problem}")
+
+                    if target is None:
+                        if stream is not None:
+                            stream.close()
+                        continue
+
+                    next_key = derived_key(lineage_keys[target], target, digest)
+                    if target not in forked_datasets and next_key in registry:
+                        # Another session already applied this upload to the same data: share its result
+                        if stream is not None:
+                            stream.close()
+                        shared_handle = registry.acquire(next_key)
+                        dataset_handles[target].release()
+                        dataset_handles[target] = shared_handle
+                        upload_rows[target] = shared_handle.info.get('upload_rows', {})
+                        rows = upload_rows[target].get(digest, len(df) if df is not None else 0)
+                        parse_seconds = result.seconds if result is not None else 0.0
                     else:
-                        st.warning(f"⚠️ {uploaded_file.name}: Could not determine file type. Include 'satisfaction_score' for daily data or 'severity' for events data.")
+                        # The merged result is a new full frame: refuse the file up front if it cannot fit
+                        new_bytes = frame_nbytes(df) if df is not None else uploaded_file.size
+                        if target not in forked_datasets or stream is not None:
+                            new_bytes += dataset_handles[target].value.nbytes
+                        memory_accountant().reserve(batch_bytes + new_bytes)
+                        batch_bytes += new_bytes
+
+                        # Upsert into this session's fork (streamed files go chunk by chunk with progress)
+                        if target not in forked_datasets:
+                            forked_datasets[target] = dataset_handles[target].value.fork()
+                        elif stream is not None:
+                            # Streamed chunks go into a copy so a file failing halfway leaves no partial rows
+                            forked_datasets[target] = forked_datasets[target].fork()
+                        target_dataset = forked_datasets[target]
+                        if stream is not None:
+                            progress_bar = st.progress(0.0, text=f"Streaming {uploaded_file.name}...")
+
+                            def report_progress(fraction, rows, bar=progress_bar, name=uploaded_file.name):
+                                bar.progress(fraction or 0.0, text=f"Streaming {name}: {rows:,} rows")
+
+                            stream_start = time.perf_counter()
+                            try:
+                                with ledger.timing(uploaded_file.size):
+                                    rows = stream.ingest_into(target_dataset, progress=report_progress)
+                            finally:
+                                progress_bar.empty()
+                            parse_seconds = time.perf_counter() - stream_start
+                        else:
+                            target_dataset.upsert(df)
+                            rows = len(df)
+                            parse_seconds = result.seconds if result is not None else 0.0
+                except Exception as e:
+                    forked_datasets = forks_before
+                    st.error(f"❌ {uploaded_file.name}: {str(e)}")
+                    failed_files.append({'name': uploaded_file.name, 'error': str(e)})
+                    continue
+                lineage_keys[target] = next_key
+
+                file_summary = {'name': uploaded_file.name, 'type': file_type, 'rows': rows, 'columns': len(columns),
+                                'parse_seconds': round(parse_seconds, 3)}
+                processed_files.append(file_summary)
+                ledger.record(digest, file_summary, uploaded_file)
+                upload_rows[target] = {**upload_rows[target], digest: rows}
+                (new_daily_files if target == "daily" else new_events_files).append(file_summary)
+
+            # Register the forks as the new shared datasets and switch this session's handles
+            for target, target_dataset in forked_datasets.items():
+                target_dataset.frame  # compact before sharing
+                new_handle = registry.acquire(lineage_keys[target], lambda dataset=target_dataset: dataset,
+                                              info={'upload_rows': upload_rows[target]})
+                dataset_handles[target].release()
+                dataset_handles[target] = new_handle
+            merged_daily = dataset_handles["daily"].value
+            merged_events = dataset_handles["events"].value
 
             # Update session state if we have new files
             if new_daily_files or new_events_files:
+                # The merged store owns the data; session state only keeps per-file summaries
                 st.session_state["new_data"]["daily_uploads"].extend(new_daily_files)
                 st.session_state["new_data"]["events_uploads"].extend(new_events_files)
 
@@ -1509,14 +1926,14 @@ if uploaded_files:
                     st.dataframe(files_df, use_container_width=True, hide_index=True)
 
                 # Show updated data statistics
-                updated_daily = merge_data_with_uploads(base_daily_df, st.session_state["new_data"]["daily_uploads"])
-                updated_events = merge_data_with_uploads(base_events_df, st.session_state["new_data"]["events_uploads"])
+                updated_daily = merged_daily.frame
+                updated_events = merged_events.frame  # uploaded events only; detected events come from the daily data
 
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("📈 Total Daily Records", len(updated_daily), delta=f"+{len(updated_daily) - len(base_daily_df)}")
+                    st.metric("📈 Total Daily Records", len(updated_daily), delta=f"+{len(updated_daily) - st.session_state['base_rows']['daily']}")
                 with col2:
-                    st.metric("⚠️ Total Event Records", len(updated_events), delta=f"+{len(updated_events) - len(base_events_df)}")
+                    st.metric("⚠️ Uploaded Event Records", len(updated_events), delta=f"+{len(updated_events) - st.session_state['base_rows']['events']}")
                 with col3:
                     new_date_range = f"{updated_daily['date'].min().strftime('%b %Y')} - {updated_daily['date'].max().strftime('%b %Y')}"
                     st.metric("📅 Data Range", new_date_range)
@@ -1528,85 +1945,174 @@ if uploaded_files:
                 if st.button("🔄 Refresh Dashboard with New Data", type="primary"):
                     st.experimental_rerun()
 
-        except Exception as e:
-            st.error(f"❌ Error processing files: {str(e)}")
-            st.info("💡 Please check that your files have the correct format and required columns.")
-
-# Show current upload status
-if st.session_state["new_data"]["daily_uploads"] or st.session_state["new_data"]["events_uploads"]:
-    st.markdown("#### 📊 Currently Uploaded Data")
-
-    upload_status_col1, upload_status_col2, upload_status_col3 = st.columns(3)
-
-    with upload_status_col1:
-        daily_count = len(st.session_state["new_data"]["daily_uploads"])
-        st.metric("📈 Daily Data Files", daily_count)
-
-    with upload_status_col2:
-        events_count = len(st.session_state["new_data"]["events_uploads"])
-        st.metric("⚠️ Events Data Files", events_count)
+            if failed_files:
+                st.info(f"💡 {len(failed_files)} file(s) were not merged. Please check that they have the correct format and required columns; the other files were applied.")
+
+            if skipped_files:
+                st.caption(f"♻️ {skipped_files} file(s) already ingested - skipped without re-parsing")
+
+    # Show current upload status
+    if st.session_state["new_data"]["daily_uploads"] or st.session_state["new_data"]["events_uploads"]:
+        st.markdown("#### 📊 Currently Uploaded Data")
+
+        upload_status_col1, upload_status_col2, upload_status_col3 = st.columns(3)
+
+        with upload_status_col1:
+            daily_count = len(st.session_state["new_data"]["daily_uploads"])
+            st.metric("📈 Daily Data Files", daily_count)
+
+        with upload_status_col2:
+            events_count = len(st.session_state["new_data"]["events_uploads"])
+            st.metric("⚠️ Events Data Files", events_count)
+
+        with upload_status_col3:
+            if st.button("🗑️ Clear All Uploaded Data", type="secondary"):
+                st.session_state["new_data"] = {"daily_uploads": [], "events_uploads": []}
+                # Back to the base data for this session only; other sessions keep their datasets
+                for handle in st.session_state.pop("dataset_handles").values():
+                    handle.release()
+                st.session_state["ingestion_ledger"].forget_ingested()
+                st.session_state["upload_widget_generation"] = st.session_state.get("upload_widget_generation", 0) + 1
+                st.success("✅ All uploaded data cleared!")
+                st.experimental_rerun()
+
+        # Base data for every session (and after restarts): only when the deployment allows it
+        if persist_enabled:
+            persist_cols = st.columns(2)
+            if persist_cols[0].button("💾 Save as Base Data for All Sessions"):
+                try:
+                    dataset_store.save("daily", merged_daily.frame)
+                    dataset_store.save("events", merged_events.frame)
+                    st.success("✅ Saved: new sessions and restarts start from this data")
+                except (OSError, TypeError, ValueError) as e:
+                    st.warning(f"⚠️ Merged data could not be saved to disk ({str(e)}); it stays available in this session")
+            if dataset_store.exists("daily") and persist_cols[1].button("↩️ Restore Generated Base Data"):
+                dataset_store.clear()
+                st.success("✅ Saved base data removed: new sessions start from the generated data")
+        else:
+            st.caption("🔒 Uploads apply to this session only. To make them the base data for everyone, run "
+                       "`python -m cf_analytics ingest <files> --save` (or start the dashboard with CF_ALLOW_PERSIST=1).")
+
+        # Shared dataset registry (process-wide, all sessions)
+        registry_stats = registry.stats
+        st.caption(
+            f"🗂️ Shared datasets: {registry_stats['datasets']} held ({registry_stats['bytes'] / 1024 / 1024:,.1f} MB of "
+            f"{registry_stats['max_bytes'] / 1024 / 1024:,.0f} MB budget) | {registry_stats['references']} session reference(s) | "
+            f"{registry_stats['hits']} shared hit(s)"
+        )
 
-    with upload_status_col3:
-        if st.button("🗑️ Clear All Uploaded Data", type="secondary"):
-            st.session_state["new_data"] = {"daily_uploads": [], "events_uploads": []}
-            st.success("✅ All uploaded data cleared!")
-            st.experimental_rerun()
+        # Ingestion ledger statistics (content-hash cache of uploaded files)
+        ingest_stats = st.session_state["ingestion_ledger"].stats
+        st.caption(
+            f"🧾 Ingestion ledger: {ingest_stats['files_ingested']} file(s) ingested | "
+            f"{ingest_stats['hits']} re-upload hit(s) skipped | "
+            f"{ingest_stats['bytes_parsed'] / 1024 / 1024:.1f} MB parsed in {ingest_stats['parse_seconds']:.2f}s"
+        )
 
-else:
-    st.info("📁 No additional data uploaded yet. Upload files above to extend your analytics with new data!")
+    else:
+        st.info("📁 No additional data uploaded yet. Upload files above to extend your analytics with new data!")
+
+    # Memory usage of upload buffers (this session, and the whole process including shared datasets)
+    st.markdown("#### 💾 Memory Usage")
+    buffer_stats = st.session_state["ingestion_ledger"].buffers.stats
+    process_stats = memory_accountant().stats
+    process_bytes = process_stats['session_bytes'] + process_stats['shared_bytes']
+    memory_cols = st.columns(3)
+    with memory_cols[0]:
+        st.metric("Session Upload Buffers", f"{buffer_stats['resident_bytes'] / 1024 / 1024:,.1f} MB",
+                  help=f"Budget {buffer_stats['max_bytes'] / 1024 / 1024:,.0f} MB per session; colder parsed uploads spill to disk")
+        st.progress(min(buffer_stats['resident_bytes'] / buffer_stats['max_bytes'], 1.0))
+    with memory_cols[1]:
+        st.metric("Spilled to Disk", f"{buffer_stats['spilled_bytes'] / 1024 / 1024:,.1f} MB",
+                  help=f"{buffer_stats['spills']} spill(s), {buffer_stats['reloads']} lazy reload(s) in this session")
+    with memory_cols[2]:
+        st.metric("Process Total", f"{process_bytes / 1024 / 1024:,.1f} MB",
+                  help=f"Upload buffers of {process_stats['sessions']} session(s) plus shared datasets; "
+                       f"global budget {process_stats['max_bytes'] / 1024 / 1024:,.0f} MB; "
+                       f"{process_stats['refused']} upload(s) refused for lack of memory")
+        st.progress(min(process_bytes / process_stats['max_bytes'], 1.0))
+
+    # Per-dataset dtype layout (compact categoricals and small numbers vs pandas defaults)
+    if st.checkbox("Show dataset memory layout", key="show_memory_layout"):
+        layout_cols = st.columns(2)
+        for layout_col, (dataset_label, dataset_frame) in zip(layout_cols, [("Daily Data", merged_daily.frame), ("Events Data", events_df)]):
+            with layout_col:
+                layout_report = memory_report(dataset_frame)
+                compact_total = layout_report['bytes'].sum()
+                default_total = layout_report['default_layout_bytes'].sum()
+                st.markdown(f"**{dataset_label}**: {compact_total / 1024:,.0f} KB "
+                            f"(default dtypes: {default_total / 1024:,.0f} KB, "
+                            f"{(1 - compact_total / max(default_total, 1)) * 100:.0f}% saved)")
+                st.dataframe(layout_report, hide_index=True, use_container_width=True)
+
+profiler.section("exports")
+# Figure cache counters (Chart Settings placeholder)
+cache_stats = figure_cache.stats
+budget_stats = figure_budget().stats
+figure_cache_status.caption(
+    f"🧮 Figure cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+    f"{cache_stats['entries']} figures (~{cache_stats['bytes'] / 1024:,.0f} KB; all sessions "
+    f"~{budget_stats['bytes'] / 1024 / 1024:,.1f} of {budget_stats['max_bytes'] / 1024 / 1024:,.0f} MB)"
+)
 
-# Export functionality (Your original export functions - UNCHANGED)
+# Export functionality: encoded payloads are cached per dataset version, format and filter,
+# so repeated downloads of unchanged data skip the encoding
 st.sidebar.markdown("---")
 st.sidebar.subheader("📥 Export Data")
 
-if st.sidebar.button("Download Daily Data (CSV)"):
-    csv_buffer = io.StringIO()
-    daily_df.to_csv(csv_buffer, index=False)
-    st.sidebar.download_button(
-        label="Download CSV",
-        data=csv_buffer.getvalue(),
-        file_name=f"daily_satisfaction_data_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
-    )
+if "export_cache" not in st.session_state:
+    st.session_state["export_cache"] = ExportCache()
+export_cache = st.session_state["export_cache"]
 
-if st.sidebar.button("Download Events Data (CSV)"):
-    csv_buffer = io.StringIO()
-    events_df.to_csv(csv_buffer, index=False)
-    st.sidebar.download_button(
-        label="Download Events CSV",
-        data=csv_buffer.getvalue(),
-        file_name=f"events_analysis_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
-    )
-
-if st.sidebar.button("Download Risk Analysis (CSV)"):
-    # Create risk analysis summary for export (Your original export logic)
-    risk_summary_data = []
-    for metric, info in risk_metric_options.items():
-        current = info['current_scores'][-1]
-        gap = info['target'] - current
-        trend = info['current_scores'][-1] - info['current_scores'][0]
-        risk_level = 'High Risk' if gap > 0.5 else 'Medium Risk' if gap > 0.2 else 'Low Risk'
-
-        risk_summary_data.append({
-            'Metric': metric,
-            'Current_Score': current,
-            'Target_Score': info['target'],
-            'Performance_Gap': gap,
-            'Trend_Direction': trend,
-            'Risk_Level': risk_level,
-            'Business_Impact': info['business_impact']
-        })
-
-    risk_summary_df = pd.DataFrame(risk_summary_data)
-    csv_buffer = io.StringIO()
-    risk_summary_df.to_csv(csv_buffer, index=False)
-    st.sidebar.download_button(
-        label="Download Risk CSV",
-        data=csv_buffer.getvalue(),
-        file_name=f"risk_analysis_summary_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
-    )
+export_format = st.sidebar.selectbox(
+    "Export format",
+    options=available_formats(),
+    format_func=lambda fmt: EXPORT_FORMATS[fmt][0],
+    key="export_format"
+)
+export_filtered = st.sidebar.checkbox(
+    "Apply date filter to exports",
+    value=False,
+    key="export_filtered",
+    disabled=date_filter_key is None,
+    help="Export only the rows inside the active start/end date filter"
+)
+export_filter_key = date_filter_key if export_filtered else None
+format_label, format_extension, format_mime = EXPORT_FORMATS[export_format]
+
+def risk_summary_frame(engine):
+    """Risk analysis summary for export: one row per segment and metric"""
+    summary = pipeline.risk_summary(engine, *risk_thresholds)
+    summary['Business_Impact'] = summary['Metric'].map(
+        {metric: info['business_impact'] for metric, info in risk_metric_options.items()})
+    return summary.drop(columns='Average_Score')
+
+def filtered_risk_summary():
+    if export_filter_key is None:
+        return risk_summary_frame(risk_engine)
+    # Scored from the filtered rows only
+    return risk_summary_frame(pipeline.build_risk_engine(daily_df_display))
+
+export_specs = [
+    ("daily", "Daily Data", daily_version, lambda: daily_df_display if export_filter_key else daily_df,
+     "daily_satisfaction_data"),
+    ("events", "Events Data", events_dataset.version, lambda: events_df_display if export_filter_key else events_df,
+     "events_analysis"),
+    ("risk", "Risk Analysis", (daily_version, risk_thresholds), filtered_risk_summary, "risk_analysis_summary"),
+]
+for export_name, export_label, export_version, build_export_frame, file_stem in export_specs:
+    export_key = (export_name, export_version, export_format, export_filter_key)
+    payload = export_cache.get(export_key)
+    if payload is None and st.sidebar.button(f"Prepare {export_label} ({format_label})", key=f"prepare_{export_name}_export"):
+        payload = export_cache.get_or_encode(export_key, build_export_frame, export_format)
+    if payload is not None:
+        st.sidebar.download_button(
+            label=f"Download {export_label} ({format_label}, {len(payload) / 1024:,.0f} KB)",
+            data=payload,
+            file_name=f"{file_stem}_{datetime.now().strftime('%Y%m%d')}{format_extension}",
+            mime=format_mime,
+            key=f"download_{export_name}_export"
+        )
 
 # Enhanced Footer
 st.markdown("---")
@@ -1626,3 +2132,62 @@ st.markdown("""
     </div>
 </div>
 """, unsafe_allow_html=True)
+
+# Performance panel: section timings, chart payload sizes and peak RSS (sampled per section) of this rerun
+for chart_name, chart_bytes in figure_cache.served.items():
+    profiler.record_chart(chart_name, chart_bytes)
+profile_record = profiler.finish(view=active_view, data_version=list(data_version), daily_rows=len(merged_daily))
+if profile_record is not None:
+    append_log(profile_record)
+    profile_history = st.session_state.setdefault("profile_history", [])
+    profile_history.append(profile_record)
+    del profile_history[:-20]
+
+    if st.session_state.get("show_profiler"):
+        with st.expander("🩺 Performance Profile (this rerun)", expanded=True):
+            perf_cols = st.columns(3)
+            perf_cols[0].metric("Rerun Time", f"{profile_record['total_seconds'] * 1000:,.0f} ms")
+            perf_cols[1].metric("Chart Payload", f"{profile_record['chart_bytes'] / 1024:,.1f} KB")
+            if profile_record['rss_bytes'] is not None:
+                perf_cols[2].metric("Peak Memory (RSS)", f"{profile_record['peak_rss_bytes'] / 1024 / 1024:,.1f} MB",
+                                    delta=f"{profile_record['peak_rss_delta_bytes'] / 1024 / 1024:+,.1f} MB this rerun",
+                                    delta_color="inverse",
+                                    help=f"Highest RSS sampled at the section boundaries; "
+                                         f"{profile_record['rss_bytes'] / 1024 / 1024:,.1f} MB at the end "
+                                         f"({profile_record['rss_delta_bytes'] / 1024 / 1024:+,.1f} MB)")
+
+            section_cols = st.columns(2)
+            with section_cols[0]:
+                st.markdown("**Sections**")
+                st.dataframe(
+                    pd.DataFrame(list(profile_record['sections'].items()), columns=['Section', 'Seconds'])
+                    .sort_values('Seconds', ascending=False),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            with section_cols[1]:
+                st.markdown("**Charts (serialized size)**")
+                st.dataframe(
+                    pd.DataFrame(list(profile_record['charts'].items()), columns=['Chart', 'Bytes']),
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+            st.markdown("**Recent reruns**")
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        'Time': record['timestamp'],
+                        'View': record['view'],
+                        'Seconds': record['total_seconds'],
+                        'Chart KB': round(record['chart_bytes'] / 1024, 1),
+                        'Peak RSS MB': None if record['rss_bytes'] is None else round(record['peak_rss_bytes'] / 1024 / 1024, 1),
+                        'Peak Δ MB': None if record['rss_bytes'] is None else round(record['peak_rss_delta_bytes'] / 1024 / 1024, 1),
+                        'End RSS MB': None if record['rss_bytes'] is None else round(record['rss_bytes'] / 1024 / 1024, 1)
+                    }
+                    for record in reversed(profile_history)
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
+            st.caption(f"Every profiled rerun is appended to `{DEFAULT_LOG_PATH}` (JSON lines)")
@@ -0,0 +1,197 @@
+"""Process-wide registry of shared, immutable datasets.
+
+Every browser session runs in the same Streamlit process, so identical data
+(the base dataset, or the same uploads applied in the same order) only needs
+to be held once. Datasets are keyed by content hash: the base frames are
+hashed directly, and a dataset produced by an upload is keyed by its parent's
+key plus the upload's digest. Sessions hold small `DatasetHandle`s; each
+handle counts as one reference, released explicitly or when the session state
+holding it is garbage collected. Unreferenced datasets stay cached for reuse
+and are evicted least-recently-used first once the memory budget is exceeded.
+
+Registered values must be treated as read-only; derive a new dataset (e.g.
+`MergedDataset.fork()`) and register it under a new key instead of mutating.
+An entry's `info` is kept with it for sessions that reuse it; the dashboard
+stores the rows merged from each upload there, by content hash.
+
+Only the datasets are shared: structures derived from them are built per
+session by the dashboard.
+"""
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+DEFAULT_BUDGET_BYTES = int(float(os.environ.get('CF_REGISTRY_BUDGET_MB', 2048)) * 1024 * 1024)
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame (column names, dtypes and values; the index is ignored)"""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(column), str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def derived_key(parent_key, *parts):
+    """Key of a dataset derived from `parent_key` by applying `parts` (e.g. an upload digest)"""
+    return hashlib.sha256('|'.join((parent_key,) + tuple(str(part) for part in parts)).encode()).hexdigest()
+
+
+def estimate_nbytes(value):
+    nbytes = getattr(value, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    return 0
+
+
+class _Entry:
+    __slots__ = ('value', 'nbytes', 'refs', 'info')
+
+    def __init__(self, value, nbytes, info):
+        self.value = value
+        self.nbytes = nbytes
+        self.refs = 0
+        self.info = info or {}
+
+
+class DatasetHandle:
+    """A session's reference to one registry entry"""
+
+    __slots__ = ('key', 'registry', '_finalizer', '__weakref__')
+
+    def __init__(self, registry, key):
+        self.key = key
+        self.registry = registry
+        self._finalizer = weakref.finalize(self, registry._release, key)
+
+    @property
+    def value(self):
+        return self.registry.get(self)
+
+    @property
+    def info(self):
+        return self.registry.info(self.key)
+
+    @property
+    def alive(self):
+        return self._finalizer.alive
+
+    def release(self):
+        """Drop this reference now (idempotent)"""
+        self._finalizer()
+
+
+class DatasetRegistry:
+    """Reference-counted, content-keyed dataset cache with an LRU memory budget"""
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def acquire(self, key, build=None, info=None):
+        """Handle to the dataset stored under `key`, registering build() on a miss.
+
+        build() runs outside the lock; if another session registered the same key
+        meanwhile, the existing dataset wins and the freshly built one is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return self._reference(key, entry)
+        if build is None:
+            raise KeyError(key)
+
+        value = build()
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                entry = _Entry(value, nbytes, info)
+                self._entries[key] = entry
+                self.total_bytes += nbytes
+            else:
+                self.hits += 1
+            handle = self._reference(key, entry)
+            self._evict()
+            return handle
+
+    def _reference(self, key, entry):
+        entry.refs += 1
+        self._entries.move_to_end(key)
+        return DatasetHandle(self, key)
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                self._evict()
+
+    def get(self, handle):
+        with self._lock:
+            entry = self._entries[handle.key]
+            self._entries.move_to_end(handle.key)
+            return entry.value
+
+    def info(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry.info) if entry is not None else {}
+
+    def valid(self, handle):
+        """True when `handle` still points at a live entry of this registry"""
+        return handle is not None and handle.registry is self and handle.alive and handle.key in self
+
+    def _evict(self):
+        """Drop least-recently-used unreferenced datasets until the budget is met"""
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.total_bytes -= self._entries.pop(key).nbytes
+            self.evictions += 1
+
+    def reclaim(self, nbytes):
+        """Evict unreferenced datasets (least recently used first) to free up to `nbytes`; returns bytes freed"""
+        freed = 0
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry.refs == 0]:
+                if freed >= nbytes:
+                    break
+                entry = self._entries.pop(key)
+                self.total_bytes -= entry.nbytes
+                self.evictions += 1
+                freed += entry.nbytes
+        return freed
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                'datasets': len(self._entries),
+                'referenced': sum(1 for entry in self._entries.values() if entry.refs),
+                'references': sum(entry.refs for entry in self._entries.values()),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
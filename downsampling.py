@@ -0,0 +1,77 @@
+"""Server-side downsampling for long time-series charts.
+
+Largest-Triangle-Three-Buckets (LTTB) picks the visually most significant
+point of each bucket, so a multi-year series can be drawn with about one point
+per horizontal pixel. `downsample_indices` adds the points the dashboard must
+never lose: the global extremes and the below-target days.
+"""
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """Indices of the `n_out` points chosen by Largest-Triangle-Three-Buckets"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Twice the triangle area between the anchor, each candidate and the next bucket's average
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor]) -
+            (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+    return selected
+
+
+def bucket_extreme_indices(y, n_buckets, lowest=True):
+    """Index of the minimum (or maximum) of each of `n_buckets` equal-width buckets"""
+    n = len(y)
+    buckets = np.arange(n) * n_buckets // max(n, 1)
+    order = np.lexsort((y if lowest else -y, buckets))
+    first_of_bucket = np.r_[True, buckets[order][1:] != buckets[order][:-1]]
+    return order[first_of_bucket]
+
+
+def downsample_indices(x, y, n_out, threshold=None):
+    """Row indices to draw: LTTB selection plus global extremes and below-threshold points.
+
+    When there are more below-threshold points than `n_out`, the lowest one of each
+    bucket is kept instead, so every below-target excursion stays visible while the
+    output remains proportional to `n_out`. Missing values are skipped.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.flatnonzero(~np.isnan(y))
+    if len(valid) <= n_out:
+        return valid
+
+    xv = np.asarray(x, dtype=np.float64)[valid]
+    yv = y[valid]
+    keep = [lttb_indices(xv, yv, n_out), [np.argmin(yv), np.argmax(yv)]]
+
+    if threshold is not None:
+        below = np.flatnonzero(yv < threshold)
+        if len(below) <= n_out:
+            keep.append(below)
+        else:
+            keep.append(below[bucket_extreme_indices(yv[below], n_out, lowest=True)])
+
+    return valid[np.unique(np.concatenate(keep))]
@@ -0,0 +1,176 @@
+"""Memoization layer for Plotly figures.
+
+Figures are keyed by a name, the dataset version(s) they were built from and
+the widget values that shape them, so a rerun caused by an unrelated widget
+reuses the already-built figure instead of rebuilding it. Each session's cache
+is an LRU bounded by entry count; all caches in the process share one byte
+budget (`FigureBudget`), which evicts the least recently used figures across
+sessions once it is exceeded.
+
+Only the figure build is avoided: `st.plotly_chart` converts whatever it is
+given to JSON itself, so every displayed chart is still serialized on each
+rerun. The cache skips the pandas work and trace construction behind it.
+
+Figure sizes are estimated from the traces' data arrays (numeric arrays are
+sent base64-encoded, dates and text as JSON strings) instead of serializing
+every new figure just to measure it.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_PROCESS_BUDGET_BYTES = int(float(os.environ.get('CF_FIGURE_BUDGET_MB', 256)) * 1024 * 1024)
+_SAMPLE_ITEMS = 64
+
+
+def _value_bytes(value):
+    """Approximate JSON size of one property value (arrays are sized from their length and a sample)"""
+    if isinstance(value, dict):
+        return 2 + sum(len(str(key)) + 4 + _value_bytes(item) for key, item in value.items())
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'biuf':
+            return 4 * -(-value.nbytes // 3) + 40  # typed array: {"dtype": ..., "bdata": base64}
+        values = value.ravel()
+    elif isinstance(value, (list, tuple)):
+        values = value
+    else:
+        return len(str(value)) + 2
+    if not len(values):
+        return 2
+    sample = values[::max(1, len(values) // _SAMPLE_ITEMS)]
+    return 2 + int(len(values) * sum(_value_bytes(item) + 1 for item in sample) / len(sample))
+
+
+def estimate_figure_bytes(figure):
+    """Approximate serialized size of a figure, from the properties set on its traces and layout"""
+    # _props holds only the properties that were set; to_plotly_json() would deep-copy every array
+    return (sum(_value_bytes(trace._props or {}) for trace in figure.data)
+            + _value_bytes(figure.layout._props or {}))
+
+
+class FigureBudget:
+    """Process-wide byte budget shared by every session's FigureCache"""
+
+    def __init__(self, max_bytes=DEFAULT_PROCESS_BUDGET_BYTES):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._caches = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, cache):
+        with self._lock:
+            self._caches.add(cache)
+
+    def enforce(self):
+        """Evict the least recently used figures across all sessions until the budget is met"""
+        with self._lock:
+            caches = list(self._caches)
+            excess = sum(cache.total_bytes for cache in caches) - self.max_bytes
+            if excess <= 0:
+                return
+            candidates = sorted(
+                ((last_used, id(cache), cache, cache_key)
+                 for cache in caches for cache_key, last_used in cache.last_used_items()),
+                key=lambda candidate: candidate[:2]
+            )
+            for _, _, cache, cache_key in candidates:
+                if excess <= 0:
+                    break
+                freed = cache.discard(cache_key)
+                excess -= freed
+                self.evictions += bool(freed)
+
+    @property
+    def stats(self):
+        with self._lock:
+            caches = list(self._caches)
+            return {
+                'sessions': len(caches),
+                'bytes': sum(cache.total_bytes for cache in caches),
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
+
+
+class FigureCache:
+    """One session's LRU cache of built figures with hit/miss counters"""
+
+    def __init__(self, max_entries=64, budget=None):
+        self.max_entries = max_entries
+        self.budget = budget
+        self._entries = OrderedDict()  # (name, key) -> (figure, estimated size, last used)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.served = {}  # name -> estimated size of each figure served since begin_rerun()
+        if budget is not None:
+            budget.register(self)
+
+    def begin_rerun(self):
+        self.served = {}
+
+    def get_or_build(self, name, key, build):
+        """Return the cached figure for (name, key), calling build() on a miss"""
+        cache_key = (name, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                figure, nbytes, _ = entry
+                self._entries[cache_key] = (figure, nbytes, time.monotonic())
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                self.served[name] = nbytes
+                return figure
+
+        self.misses += 1
+        figure = build()
+        nbytes = estimate_figure_bytes(figure)
+        with self._lock:
+            self._entries[cache_key] = (figure, nbytes, time.monotonic())
+            self.total_bytes += nbytes
+            self.served[name] = nbytes
+            while len(self._entries) > self.max_entries:
+                self.total_bytes -= self._entries.popitem(last=False)[1][1]
+                self.evictions += 1
+        # Outside our lock: the budget takes every session's lock in turn
+        if self.budget is not None:
+            self.budget.enforce()
+        return figure
+
+    def last_used_items(self):
+        with self._lock:
+            return [(cache_key, entry[2]) for cache_key, entry in self._entries.items()]
+
+    def discard(self, cache_key):
+        """Drop one figure (e.g. evicted by the process budget); returns its estimated size"""
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is None:
+                return 0
+            self.total_bytes -= entry[1]
+            self.evictions += 1
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,109 @@
+"""Lightweight per-rerun profiler for the Streamlit script.
+
+A Streamlit script runs top to bottom on every interaction, so sections are
+marked sequentially: `section(name)` closes the running section and opens the
+next one, and `finish()` closes the last one. Each finished rerun becomes one
+record (section timings, chart payload sizes, peak memory) that can be
+appended to a JSON-lines log to spot regressions as uploads grow.
+
+Memory is the process's resident set size, read from the OS rather than traced,
+so profiling one session never slows down or interferes with the others. It is
+sampled at the start of the rerun, at every section boundary and at the end;
+the record keeps the peak of those samples and the end value, each with its
+change from the start. A spike that rises and falls inside one section is not
+seen. The figures are process-wide, so concurrent sessions show up in them too.
+"""
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+DEFAULT_LOG_PATH = os.environ.get('CF_PROFILE_LOG', '.cf_profile.jsonl')
+
+
+def current_rss_bytes():
+    """Resident set size of this process (None where /proc is not available)"""
+    try:
+        with open('/proc/self/statm', 'rb') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return None
+    # Fall back to the peak, which is what getrusage reports
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RerunProfiler:
+    """Times named script sections and collects chart sizes for one rerun"""
+
+    def __init__(self, enabled=True, measure_memory=True):
+        self.enabled = enabled
+        self._rss_started = current_rss_bytes() if enabled and measure_memory else None
+        self._rss_peak = self._rss_started
+        self.sections = {}
+        self.charts = {}
+        self._current = None
+        self._started = time.perf_counter()
+        self._section_started = self._started
+
+    def section(self, name):
+        """Close the running section (if any) and start timing `name`"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._close(now)
+        self._sample_memory()
+        self._current = name
+        self._section_started = now
+
+    def _sample_memory(self):
+        """Read the RSS and keep the highest value seen in this rerun (returns the reading)"""
+        if self._rss_started is None:
+            return None
+        rss = current_rss_bytes()
+        if rss is not None:
+            self._rss_peak = max(self._rss_peak, rss)
+        return rss
+
+    def _close(self, now):
+        if self._current is not None:
+            # A section marked twice in one rerun accumulates
+            self.sections[self._current] = self.sections.get(self._current, 0.0) + now - self._section_started
+            self._current = None
+
+    def record_chart(self, name, nbytes):
+        if self.enabled:
+            self.charts[name] = nbytes
+
+    def finish(self, **context):
+        """Close the last section and return this rerun's record (None when disabled)"""
+        if not self.enabled:
+            return None
+        now = time.perf_counter()
+        self._close(now)
+        rss = self._sample_memory()
+        record = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'total_seconds': round(now - self._started, 6),
+            'sections': {name: round(seconds, 6) for name, seconds in self.sections.items()},
+            'charts': dict(self.charts),
+            'chart_bytes': sum(self.charts.values()),
+            'rss_bytes': rss,
+            'rss_delta_bytes': rss - self._rss_started if rss is not None else None,
+            'peak_rss_bytes': self._rss_peak if rss is not None else None,
+            'peak_rss_delta_bytes': self._rss_peak - self._rss_started if rss is not None else None
+        }
+        record.update(context)
+        return record
+
+
+def append_log(record, path=DEFAULT_LOG_PATH):
+    """Append one rerun record to the JSON-lines log"""
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write(json.dumps(record, default=str) + '\n')
+
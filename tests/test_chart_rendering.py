@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from chart_rendering import WEBGL_POINT_THRESHOLD, render_mode, scatter_trace
+
+
+def test_traces_switch_to_webgl_above_the_threshold():
+    assert type(scatter_trace(WEBGL_POINT_THRESHOLD, x=[1], y=[1])) is go.Scatter
+    assert type(scatter_trace(WEBGL_POINT_THRESHOLD + 1, x=[1], y=[1])) is go.Scattergl
+    assert type(scatter_trace(501, 500, x=[1], y=[1])) is go.Scattergl
+
+
+def test_trace_properties_pass_through_unchanged():
+    kwargs = dict(x=[1, 2, 3], y=[8.5, 9.1, 8.7], mode='lines+markers', name='Score',
+                  line=dict(color='#1f77b4', width=2), hovertemplate='%{y:.2f}<extra></extra>')
+    svg, gl = scatter_trace(3, **kwargs), scatter_trace(3, 2, **kwargs)
+    expected = go.Scatter(**kwargs).to_plotly_json()
+    assert svg.to_plotly_json() == expected
+    assert {**gl.to_plotly_json(), 'type': 'scatter'} == expected
+
+
+def test_render_mode_for_plotly_express():
+    df = pd.DataFrame({'x': np.arange(20), 'y': np.linspace(8, 9, 20)})
+    assert render_mode(20) == 'svg' and render_mode(20, 10) == 'webgl'
+    assert px.scatter(df, x='x', y='y', render_mode=render_mode(len(df), 10)).data[0].type == 'scattergl'
+    assert px.scatter(df, x='x', y='y', render_mode=render_mode(len(df))).data[0].type == 'scatter'
@@ -0,0 +1,61 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from cf_analytics import pipeline
+from cf_analytics.cli import main
+from cf_analytics.columnar_store import ColumnarStore
+from cf_analytics.survey_metrics import METRIC_COLUMNS
+
+
+def run(capsys, *argv):
+    code = main(list(argv))
+    return code, capsys.readouterr().out
+
+
+def sample_daily(tmp_path):
+    """What the CLI loads from an empty data directory"""
+    daily_df, _ = pipeline.load_data(ColumnarStore(str(tmp_path / 'empty')))
+    return daily_df
+
+
+def test_load_reports_the_sample_data(tmp_path, capsys):
+    code, out = run(capsys, '--data-dir', str(tmp_path), 'load')
+    summary = json.loads(out)
+    daily = sample_daily(tmp_path)
+    assert code == 0 and summary['source'] == {'daily': 'sample', 'events': 'sample'}
+    assert summary['daily_rows'] == len(daily) and summary['last_date'].startswith(str(daily['date'].max().date()))
+
+
+def test_filter_and_aggregate_match_pandas(tmp_path, capsys):
+    daily = sample_daily(tmp_path)
+    _, out = run(capsys, '--data-dir', str(tmp_path), 'filter', '--start', '2025-07-01', '--end', '2025-07-31')
+    filtered = pd.read_csv(io.StringIO(out), parse_dates=['date'])
+    expected = daily[(daily['date'] >= '2025-07-01') & (daily['date'] <= '2025-07-31')]
+    assert filtered['date'].tolist() == expected['date'].tolist()
+    np.testing.assert_allclose(filtered['satisfaction_score'], expected['satisfaction_score'])
+
+    _, out = run(capsys, '--data-dir', str(tmp_path), 'aggregate', '--granularity', 'month')
+    monthly = pd.read_csv(io.StringIO(out), parse_dates=['period_start']).set_index('period_start')
+    reference = daily.groupby(daily['date'].dt.to_period('M').dt.start_time)[METRIC_COLUMNS].mean()
+    np.testing.assert_allclose(monthly[METRIC_COLUMNS].to_numpy(), reference.to_numpy())
+
+
+def test_ingest_saves_and_reports_bad_files(tmp_path, capsys):
+    data_dir = str(tmp_path / 'data')
+    new_days = tmp_path / 'daily_new.csv'
+    pd.DataFrame({'date': pd.date_range('2026-01-01', periods=10), 'satisfaction_score': 9.0}).to_csv(new_days, index=False)
+    broken = tmp_path / 'broken.xlsx'
+    broken.write_bytes(b'not a workbook')
+
+    code, out = run(capsys, '--data-dir', data_dir, 'ingest', str(new_days), str(broken), '--workers', '1', '--save')
+    result = json.loads(out)
+    assert code == 1 and [('error' in summary) for summary in result['files']] == [False, True]
+    assert result['files'][0]['rows'] == 10 and result['daily_rows'] == len(sample_daily(tmp_path)) + 10
+
+    code, out = run(capsys, '--data-dir', data_dir, 'load', '--output', str(tmp_path / 'daily.parquet'))
+    summary = json.loads(out)
+    assert code == 0 and summary['source']['daily'] == 'persisted' and summary['daily_rows'] == result['daily_rows']
+    assert len(pd.read_parquet(tmp_path / 'daily.parquet')) == result['daily_rows']
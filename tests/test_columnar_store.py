@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.columnar_store import ColumnarStore
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.frame_layout import compact_daily
+from cf_analytics.merge_store import MergedDataset
+
+
+def test_round_trip_keeps_values_and_compact_dtypes(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    df = compact_daily(generate_daily_data('2025-01-01', '2025-02-28', stores=3, seed=5))
+    assert store.save('daily', df)
+    loaded = store.load('daily')
+    pd.testing.assert_frame_equal(loaded, df)
+    assert isinstance(loaded['store'].dtype, pd.CategoricalDtype)
+
+
+def test_numeric_columns_stay_memory_mapped(tmp_path):
+    store = ColumnarStore(str(tmp_path))
+    store.save('daily', generate_daily_data('2025-01-01', '2025-03-31', seed=5))
+    loaded = store.load('daily')
+    scores = loaded['satisfaction_score'].to_numpy()
+    # A zero-copy view of the map is read-only; a decoded copy would be writeable
+    assert not scores.flags.writeable
+    dataset = MergedDataset(loaded)
+    assert np.shares_memory(dataset.frame['satisfaction_score'].to_numpy(), scores)
+
+
+def test_signature_tracks_saves_and_clear(tmp_path):
+    store = ColumnarStore(str(tmp_path / 'data'))
+    assert store.signature() == () and store.load('daily') is None
+    store.save('daily', pd.DataFrame({'date': pd.date_range('2025-01-01', periods=3), 'x': 1.0}))
+    first = store.signature()
+    store.save('daily', pd.DataFrame({'date': pd.date_range('2025-01-01', periods=4), 'x': 1.0}))
+    assert store.signature() != first
+    store.clear()
+    assert store.signature() == () and not store.exists('daily')
@@ -0,0 +1,42 @@
+import gc
+
+import pandas as pd
+
+from dataset_registry import DatasetRegistry, derived_key, frame_digest
+
+
+def frame(rows, value=1.0):
+    return pd.DataFrame({'date': pd.date_range('2025-01-01', periods=rows), 'x': value})
+
+
+def test_frame_digest_ignores_index_but_not_values_or_dtypes():
+    df = frame(5)
+    assert frame_digest(df) == frame_digest(df.set_axis(range(10, 15)))
+    assert frame_digest(df) != frame_digest(frame(5, 2.0))
+    assert frame_digest(df) != frame_digest(df.astype({'x': 'float32'}))
+    assert derived_key('base', 'daily', 'abc') != derived_key('base', 'daily', 'abd')
+
+
+def test_sessions_share_one_copy_and_its_info():
+    registry = DatasetRegistry()
+    builds = []
+    first = registry.acquire('k', lambda: builds.append(1) or frame(10), info={'upload_rows': {'abc': 10}})
+    second = registry.acquire('k', lambda: builds.append(1) or frame(10))
+    assert builds == [1] and first.value is second.value
+    assert second.info == {'upload_rows': {'abc': 10}}
+    assert registry.stats['references'] == 2 and registry.stats['hits'] == 1
+
+
+def test_unreferenced_datasets_are_evicted_lru_first():
+    size = frame(100).memory_usage(index=True, deep=True).sum()
+    registry = DatasetRegistry(max_bytes=int(size * 2.5))
+    handles = [registry.acquire(key, lambda: frame(100)) for key in 'abc']
+    assert registry.stats['datasets'] == 3  # all referenced, nothing can go
+    handles[0].release()
+    handles[1].release()
+    assert 'a' not in registry and 'b' in registry and 'c' in registry
+
+    del handles
+    gc.collect()
+    assert registry.stats['references'] == 0
+    assert registry.reclaim(1) > 0 and 'b' not in registry
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.dimension_slices import ALL_SLICE, DimensionSlices, slice_label
+from cf_analytics.survey_metrics import METRIC_COLUMNS
+
+
+def test_slices_match_groupby_means():
+    df = generate_daily_data('2025-01-01', '2025-02-28', stores=5, channels=True, seed=4)
+    df.loc[df.sample(50, random_state=1).index, 'satisfaction_score'] = np.nan
+    slices = DimensionSlices(df, METRIC_COLUMNS)
+
+    expected = df.groupby('date')['satisfaction_score'].mean()
+    got = slices.frame(ALL_SLICE).set_index('date')['satisfaction_score']
+    pd.testing.assert_series_equal(got, expected, check_names=False, check_index_type=False)
+
+    for store, rows in df.groupby('store'):
+        expected = rows.groupby('date')['satisfaction_score'].mean()
+        got = slices.frame(slice_label('store', store)).set_index('date')['satisfaction_score']
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+    assert slice_label('channel', 'web') in slices.options
+    assert 'store' not in slices.frame(ALL_SLICE).columns
+
+
+def test_date_slice_inside_a_slice():
+    df = generate_daily_data('2025-01-01', '2025-02-28', stores=3, seed=4)
+    slices = DimensionSlices(df, METRIC_COLUMNS)
+    label = slice_label('store', 'Store 002')
+    got = slices.date_slice(label, '2025-01-10', '2025-01-20')
+    frame = slices.frame(label)
+    expected = frame[(frame['date'] >= '2025-01-10') & (frame['date'] <= '2025-01-20')]
+    assert got['date'].tolist() == expected['date'].tolist()
+    assert len(got) == 11
+
+
+def test_frames_without_dimensions_pass_through_with_intraday_rows():
+    df = pd.DataFrame({'date': pd.date_range('2025-01-01', periods=48, freq='h'), 'satisfaction_score': 1.0})
+    slices = DimensionSlices(df, METRIC_COLUMNS)
+    assert slices.options == [ALL_SLICE]
+    assert len(slices.frame()) == 48
+    assert len(slices.date_slice(ALL_SLICE, '2025-01-02', '2025-01-02')) == 24
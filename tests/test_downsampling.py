@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from downsampling import bucket_extreme_indices, downsample_indices, lttb_indices
+
+
+def daily_scores(days=3000, seed=5, level=9.2):
+    rng = np.random.default_rng(seed)
+    x = np.arange(days, dtype=np.float64)
+    y = level + 0.2 * np.sin(x / 90) + rng.normal(0, 0.05, days)
+    y[rng.random(days) < 0.05] = np.nan
+    return x, y
+
+
+def test_lttb_keeps_the_endpoints_and_one_point_per_bucket():
+    x, y = daily_scores()
+    y = np.nan_to_num(y, nan=9.2)
+    y[1234] = 12.0  # a single spike must win its bucket
+    selected = lttb_indices(x, y, 300)
+    assert len(selected) == 300 and selected[0] == 0 and selected[-1] == len(y) - 1
+    assert (np.diff(selected) > 0).all() and 1234 in selected
+    assert (lttb_indices(x, y, len(y) + 1) == np.arange(len(y))).all()
+
+
+def test_extremes_and_below_target_days_are_always_drawn():
+    x, y = daily_scores(level=9.6)
+    y[[400, 1800, 2500]] = [8.4, 8.6, 8.1]
+    kept = downsample_indices(x, y, 200, threshold=9.0)
+    valid = pd.Series(y).dropna()
+    assert not np.isnan(y[kept]).any() and (np.diff(kept) > 0).all()
+    assert {valid.idxmin(), valid.idxmax()} <= set(kept)
+    below = valid.index[valid < 9.0]
+    assert below.tolist() == [400, 1800, 2500] and set(below) <= set(kept)
+    assert len(kept) < len(valid) // 5
+
+
+def test_many_below_target_days_keep_the_lowest_of_each_bucket():
+    x, y = daily_scores()
+    kept = downsample_indices(x, y, 100, threshold=9.3)
+    valid = pd.Series(y).dropna()
+    below = valid[valid < 9.3]
+    assert len(below) > 100
+    # Equal-width buckets over the below-target days, as bucket_extreme_indices splits them
+    buckets = np.arange(len(below)) * 100 // len(below)
+    assert set(below.groupby(buckets).idxmin()) <= set(kept)
+    assert len(kept) <= 100 + 2 + 100
+
+    scores = below.to_numpy()
+    np.testing.assert_array_equal(
+        np.sort(bucket_extreme_indices(scores, 10, lowest=False)),
+        pd.Series(scores).groupby(np.arange(len(scores)) * 10 // len(scores)).idxmax().to_numpy()
+    )
+
+
+def test_short_series_are_returned_whole():
+    x, y = daily_scores(days=150)
+    assert downsample_indices(x, y, 200, threshold=9.0).tolist() == np.flatnonzero(~np.isnan(y)).tolist()
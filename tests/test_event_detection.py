@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics import pipeline
+from cf_analytics.event_detection import SEVERITY_LEVELS, EventDetector, rolling_z_scores, severity_codes
+from cf_analytics.metric_matrix import DailyMetricMatrix
+from cf_analytics.survey_metrics import METRIC_COLUMNS, metric_targets
+
+
+def sample_events():
+    detector = EventDetector(metric_targets())
+    detector.update(pipeline.build_metric_matrix(pipeline.sample_daily_data()))
+    return detector.events()
+
+
+def test_sample_data_events_are_rare_and_every_severity_occurs():
+    events = sample_events()
+    # 16 of the sample's 124 days: keep the view about real outliers, not most of the calendar
+    assert len(events) == 16
+    assert events['severity'].value_counts().to_dict() == {'High': 6, 'Critical': 5, 'Medium': 4, 'Low': 1}
+
+
+def test_severity_bands():
+    levels = SEVERITY_LEVELS[severity_codes(np.array([0.0, 37.5, 50.0, 62.5, 75.0, 87.5, 100.0]))]
+    assert levels.tolist() == ['Low', 'Low', 'Medium', 'Medium', 'High', 'High', 'Critical']
+
+
+def test_rolling_z_scores_match_pandas():
+    rng = np.random.default_rng(3)
+    values = rng.normal(8, 0.5, size=(120, 3))
+    values[10, 1] = np.nan
+    expected = pd.DataFrame(values)
+    trailing = expected.shift(1).rolling(30, min_periods=15)
+    expected = ((expected - trailing.mean()) / trailing.std(ddof=0)).to_numpy()
+    np.testing.assert_allclose(rolling_z_scores(values, 30), expected, atol=1e-9)
+    np.testing.assert_allclose(rolling_z_scores(values, 30, start=70), expected[70:], atol=1e-9)
+
+
+def test_incremental_update_matches_full_rebuild():
+    daily = pipeline.sample_daily_data()
+    changed = daily.copy()
+    changed.loc[changed.index[-20:], 'satisfaction_score'] = 6.0
+
+    detector = EventDetector(metric_targets())
+    detector.update(DailyMetricMatrix.from_frame(daily, METRIC_COLUMNS))
+    first_changed = detector.update(DailyMetricMatrix.from_frame(changed, METRIC_COLUMNS))
+    assert first_changed == len(daily) - 20
+
+    fresh = EventDetector(metric_targets())
+    fresh.update(DailyMetricMatrix.from_frame(changed, METRIC_COLUMNS))
+    pd.testing.assert_frame_equal(detector.events(), fresh.events())
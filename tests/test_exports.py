@@ -0,0 +1,51 @@
+import gzip
+import io
+
+import pandas as pd
+import pytest
+
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.exports import ExportCache, available_formats, encode_frame
+
+
+def daily():
+    return generate_daily_data('2025-01-01', '2025-03-31', stores=2, seed=9)
+
+
+def test_chunked_csv_matches_a_single_to_csv():
+    df = daily()
+    expected = df.to_csv(index=False).encode()
+    assert encode_frame(df, 'csv', chunk_rows=7) == expected
+    compressed = encode_frame(df, 'csv.gz', chunk_rows=7)
+    assert gzip.decompress(compressed) == expected
+    assert encode_frame(df, 'csv.gz', chunk_rows=7) == compressed  # byte-identical for identical data
+
+
+def test_parquet_round_trip_with_one_row_group_per_chunk():
+    if 'parquet' not in available_formats():
+        pytest.skip('pyarrow is not installed')
+    import pyarrow.parquet as pq
+
+    df = daily()
+    payload = encode_frame(df, 'parquet', chunk_rows=50)
+    assert pq.ParquetFile(io.BytesIO(payload)).num_row_groups == -(-len(df) // 50)
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(payload)), df)
+
+
+def test_empty_frame_keeps_its_header():
+    assert encode_frame(daily().iloc[:0], 'csv').decode().strip() == ','.join(daily().columns)
+    with pytest.raises(ValueError):
+        encode_frame(daily(), 'xml')
+
+
+def test_cache_encodes_once_per_key_and_stays_under_budget():
+    df = daily()
+    size = len(encode_frame(df, 'csv'))
+    cache = ExportCache(max_bytes=int(size * 1.5))
+    builds = []
+    first = cache.get_or_encode(('daily', 1, 'csv'), lambda: builds.append(1) or df, 'csv')
+    assert cache.get_or_encode(('daily', 1, 'csv'), lambda: builds.append(1) or df, 'csv') is first
+    assert builds == [1]
+
+    cache.get_or_encode(('daily', 2, 'csv'), lambda: df, 'csv')
+    assert cache.get(('daily', 1, 'csv')) is None and cache.total_bytes == size
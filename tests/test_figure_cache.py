@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from figure_cache import FigureBudget, FigureCache, estimate_figure_bytes
+
+
+def scatter(points, seed=0):
+    rng = np.random.default_rng(seed)
+    return go.Figure(go.Scatter(
+        x=pd.date_range('2025-01-01', periods=points, freq='h'), y=rng.random(points),
+        text=[f'point {i}' for i in range(points)], mode='markers'
+    )).update_layout(title='Scores')
+
+
+def test_estimate_is_close_to_the_serialized_size():
+    for points in (10, 1000, 50_000):
+        figure = scatter(points)
+        actual = len(pio.to_json(figure, validate=False))
+        assert abs(estimate_figure_bytes(figure) - actual) <= 0.15 * actual
+
+
+def test_cache_hits_skip_the_build():
+    cache = FigureCache()
+    builds = []
+    for _ in range(3):
+        cache.get_or_build('timeline', ('v1',), lambda: builds.append(1) or scatter(10))
+    assert builds == [1] and cache.stats['hits'] == 2 and cache.served['timeline'] == cache.total_bytes
+
+
+def test_budget_evicts_least_recently_used_figures_across_sessions():
+    size = estimate_figure_bytes(scatter(1000))
+    budget = FigureBudget(max_bytes=int(size * 2.5))
+    sessions = [FigureCache(budget=budget) for _ in range(3)]
+    for i, cache in enumerate(sessions):
+        cache.get_or_build('timeline', i, lambda i=i: scatter(1000, i))
+    assert budget.stats['bytes'] <= budget.max_bytes and budget.stats['evictions'] == 1
+    # The first session's figure was the coldest
+    assert len(sessions[0]) == 0 and len(sessions[1]) == len(sessions[2]) == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.frame_layout import (compact_daily, compact_events, failed_metrics_label, memory_report,
+                                       to_float32)
+
+
+def events(rows=200, seed=6):
+    rng = np.random.default_rng(seed)
+    failed = rng.integers(0, 9, rows)
+    return pd.DataFrame({
+        'date': pd.date_range('2025-01-01', periods=rows),
+        'day_of_week': pd.date_range('2025-01-01', periods=rows).day_name(),
+        'severity': rng.choice(['Low', 'Medium', 'High', 'Critical'], rows),
+        'failed_metrics': [f'{n}/8' for n in failed],
+        'failure_percentage': failed / 8 * 100,
+    })
+
+
+def test_failed_metrics_split_round_trips():
+    df = events()
+    df.loc[[3, 7], 'failed_metrics'] = ['n/a', None]
+    compact = compact_events(df)
+    assert 'failed_metrics' not in compact.columns and 'failed_metrics' in df.columns  # input left alone
+    parts = df['failed_metrics'].str.split('/', expand=True)
+    expected_count = pd.to_numeric(parts[0], errors='coerce').drop([3, 7]).astype(int)
+    assert str(compact['failed_metrics_count'].dtype) == 'Int8' and compact['failed_metrics_count'].isna().sum() == 2
+    assert compact['failed_metrics_count'].drop([3, 7]).astype(int).tolist() == expected_count.tolist()
+
+    labels = failed_metrics_label(compact)
+    assert labels.drop([3, 7]).tolist() == df['failed_metrics'].drop([3, 7]).tolist()
+    assert labels[[3, 7]].tolist() == ['n/a', 'n/a']
+
+    # Without missing values both columns are plain int8, and compacting again changes nothing
+    clean = compact_events(events())
+    assert clean[['failed_metrics_count', 'metrics_evaluated']].dtypes.tolist() == [np.int8, np.int8]
+    assert compact_events(clean) is clean
+
+
+def test_eighths_are_stored_exactly_in_float32():
+    df = events()
+    compact = compact_events(df)
+    assert compact['failure_percentage'].dtype == np.float32
+    np.testing.assert_array_equal(compact['failure_percentage'].astype(np.float64), df['failure_percentage'])
+    assert compact['severity'].dtype == 'category' and compact['severity'].astype(str).tolist() == df['severity'].tolist()
+
+    # One-decimal scores are not exact in float32, so they stay float64
+    scores = pd.Series([8.7, 9.1, np.nan])
+    assert to_float32(scores) is scores
+
+
+def test_memory_report_compares_with_the_default_layout():
+    daily = pd.DataFrame({'store': ['North', 'South'] * 100, 'week': np.arange(200) % 53,
+                          'satisfaction_score': np.linspace(8, 9, 200)})
+    compact = compact_daily(daily)
+    assert compact['week'].dtype == np.int8 and compact['satisfaction_score'].dtype == np.float64
+    report = memory_report(compact).set_index('column')
+    expected = daily.memory_usage(index=False, deep=True)
+    assert report['default_layout_bytes'].to_dict() == expected.to_dict()
+    assert (report['saved_bytes'] > 0).sum() == 2
+
+    events_report = memory_report(compact_events(events())).set_index('column')
+    assert events_report.loc['failed_metrics', 'default_layout_bytes'] == events()['failed_metrics'].memory_usage(index=False, deep=True)
@@ -0,0 +1,105 @@
+import io
+
+import pandas as pd
+
+from cf_analytics.ingestion import CsvChunkStream, IngestionLedger, UploadParser, infer_schema, read_upload
+from cf_analytics.merge_store import MergedDataset
+
+
+def csv_upload(text, name='upload.csv'):
+    source = io.BytesIO(text.encode())
+    source.name = name
+    source.size = len(text.encode())
+    return source
+
+
+def sample_csv(rows=50):
+    lines = ['date,store,satisfaction_score,is_weekend,comment']
+    for i in range(rows):
+        day = pd.Timestamp('2025-01-01') + pd.Timedelta(days=i)
+        comment = f'"line one\nline two, with a comma {i}"' if i % 7 == 0 else f'note {i}'
+        lines.append(f'{day:%Y-%m-%d},{"00" + str(i % 3)},{8 + (i % 5) / 10},{day.dayofweek >= 5},{comment}')
+    return '\n'.join(lines) + '\n'
+
+
+def test_chunks_match_a_single_read_with_multiline_fields():
+    text = sample_csv()
+    stream = CsvChunkStream(csv_upload(text), chunk_rows=8)
+    streamed = pd.concat(list(stream), ignore_index=True)
+    expected = read_upload(csv_upload(text))
+
+    assert stream.rows_read == len(expected) == 50
+    assert streamed['comment'].tolist() == expected['comment'].tolist()
+    assert (streamed['date'] == expected['date']).all()
+    assert streamed['satisfaction_score'].tolist() == expected['satisfaction_score'].tolist()
+    assert streamed['is_weekend'].dtype == bool and streamed['is_weekend'].tolist() == expected['is_weekend'].tolist()
+
+
+def test_schema_is_pinned_by_the_first_chunk():
+    # 'store' looks numeric later in the file, but the first chunk makes it text
+    text = 'date,store,x\n2025-01-01,A1,1\n2025-01-02,B2,2\n2025-01-03,007,3\n2025-01-04,008,\n'
+    stream = CsvChunkStream(csv_upload(text), chunk_rows=2)
+    assert stream.schema['store'] == ('str', None) and stream.schema['x'] == ('int', None)
+    chunks = list(stream)
+    assert chunks[1]['store'].tolist() == ['007', '008']
+    # An integer column with a gap in a later chunk becomes float for that chunk only
+    assert chunks[0]['x'].dtype == 'int64' and chunks[1]['x'].dtype == 'float64'
+
+
+def test_text_schema_matches_read_csv_inference():
+    text = 'a,b,c,d,e\n1,1.5,true,x,\n2,2,False,y,\n'
+    typed = infer_schema(pd.read_csv(io.StringIO(text)))
+    as_text = infer_schema(pd.read_csv(io.StringIO(text), dtype=str))
+    assert typed == as_text
+
+
+def test_stream_reads_paths_and_upserts(tmp_path):
+    path = tmp_path / 'daily.csv'
+    path.write_text(sample_csv(30))
+    # The base already holds the first five days; re-sent rows replace them
+    dataset = MergedDataset(read_upload(csv_upload(sample_csv(5))))
+    progress = []
+    stream = CsvChunkStream(str(path), chunk_rows=10)
+    assert stream.ingest_into(dataset, lambda fraction, rows: progress.append((fraction, rows))) == 30
+    assert len(dataset.frame) == 30 and [rows for _, rows in progress] == [10, 20, 30]
+    assert progress[-1][0] == 1.0 and stream.source.closed
+
+
+def test_parser_matches_single_file_reads():
+    uploads = [(f'day_{i}.csv', sample_csv(10 + i).encode()) for i in range(3)] + [('bad.xlsx', b'not a workbook')]
+    parser = UploadParser(max_workers=2)
+    try:
+        results = parser.parse(uploads)
+    finally:
+        parser.shutdown()
+    assert [result.name for result in results] == [name for name, _ in uploads]
+    for (name, data), result in zip(uploads[:3], results):
+        pd.testing.assert_frame_equal(result.df, read_upload(csv_upload(data.decode(), name)))
+    assert not results[3].ok and results[3].df is None
+
+
+def test_ledger_digests_by_content():
+    ledger = IngestionLedger()
+    first, same = csv_upload(sample_csv(5)), csv_upload(sample_csv(5))
+    assert ledger.digest(first) == ledger.digest(same)
+    assert ledger.digest(csv_upload(sample_csv(6))) != ledger.digest(first)
+
+
+def test_ledger_counts_each_re_upload_once():
+    ledger = IngestionLedger()
+    upload = csv_upload(sample_csv(5))
+    upload.file_id = 'first'
+    digest = ledger.digest(upload)
+    assert not ledger.is_ingested(digest, upload)
+    ledger.record(digest, {'name': upload.name}, upload)
+
+    # The uploader keeps the file across reruns: skipped, but not a re-upload
+    assert ledger.is_ingested(digest, upload) and ledger.hits == 0
+    again = csv_upload(sample_csv(5))
+    again.file_id = 'second'
+    for _ in range(3):
+        assert ledger.is_ingested(ledger.digest(again), again)
+    assert ledger.hits == 1
+
+    ledger.forget_ingested()
+    assert not ledger.is_ingested(digest, upload)
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cf_analytics.memory_budget import MemoryAccountant, SpillPool, frame_nbytes
+
+
+def frame(rows, value=0.0):
+    return pd.DataFrame({'date': pd.date_range('2025-01-01', periods=rows), 'x': np.full(rows, value)})
+
+
+def test_pool_spills_coldest_frames_and_reloads_them(tmp_path):
+    accountant = MemoryAccountant(max_bytes=10**9, spill_dir=str(tmp_path))
+    size = frame_nbytes(frame(1000))
+    pool = SpillPool(accountant, max_bytes=int(size * 2.5))
+    for i in range(4):
+        pool.put(i, frame(1000, float(i)))
+    assert pool.resident_bytes <= pool.max_bytes
+    assert pool.stats['spills'] == 2 and pool.spilled_bytes == 2 * size
+
+    reloaded = pool.get(0)
+    pd.testing.assert_frame_equal(reloaded, frame(1000, 0.0))
+    assert pool.stats['reloads'] == 1 and pool.resident_bytes <= pool.max_bytes
+
+
+def test_global_budget_spills_across_sessions(tmp_path):
+    size = frame_nbytes(frame(1000))
+    accountant = MemoryAccountant(max_bytes=int(size * 2.5), spill_dir=str(tmp_path))
+    pools = [SpillPool(accountant, max_bytes=10**9) for _ in range(3)]
+    for i, pool in enumerate(pools):
+        pool.put('upload', frame(1000, float(i)))
+    assert accountant.session_bytes() <= accountant.max_bytes
+    # The first session's frame was the coldest
+    assert not pools[0].resident_items() and pools[2].resident_items()
+
+
+def test_reserve_reclaims_shared_data_then_refuses(tmp_path):
+    shared = {'bytes': 800}
+
+    def reclaim(nbytes):
+        freed = min(nbytes, shared['bytes'] - 500)  # 500 bytes are still referenced
+        shared['bytes'] -= freed
+        return freed
+
+    accountant = MemoryAccountant(max_bytes=1000, spill_dir=str(tmp_path),
+                                  shared_usage=lambda: shared['bytes'], reclaim_shared=reclaim)
+    accountant.reserve(400)
+    assert shared['bytes'] == 600
+    with pytest.raises(MemoryError):
+        accountant.reserve(600)
+    assert accountant.stats['refused'] == 1
+
+
+def test_own_spill_directory_is_removed():
+    accountant = MemoryAccountant()
+    spill_dir = accountant.spill_dir
+    assert os.path.isdir(spill_dir)
+    del accountant
+    assert not os.path.exists(spill_dir)
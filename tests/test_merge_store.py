@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.dimension_slices import DIMENSION_COLUMNS
+from cf_analytics.merge_store import MergedDataset
+
+
+def reference_merge(base, uploads, keys):
+    """Concatenate and keep the last row per key: what the dashboard did before the merge store"""
+    merged = base
+    for upload in uploads:
+        merged = pd.concat([merged, upload]).drop_duplicates(keys, keep='last')
+    return merged.sort_values(keys).reset_index(drop=True)
+
+
+def daily(start, periods, value, freq='D'):
+    return pd.DataFrame({'date': pd.date_range(start, periods=periods, freq=freq), 'satisfaction_score': value})
+
+
+def test_upsert_matches_concat_reference():
+    base = daily('2025-01-01', 60, np.arange(60.0))
+    uploads = [daily('2025-02-15', 30, -1.0),      # overlaps the end and extends it
+               daily('2025-01-10', 5, -2.0),       # replaces rows in the middle
+               daily('2025-03-20', 3, -3.0),       # inserts a gap-filling future range
+               daily('2024-12-25', 3, -4.0)]       # inserts before the history
+    dataset = MergedDataset(base)
+    for upload in uploads:
+        assert dataset.upsert(upload)
+
+    expected = reference_merge(base, uploads, ['date'])
+    pd.testing.assert_frame_equal(dataset.frame, expected, check_dtype=False)
+    assert dataset.date_index.equals(pd.DatetimeIndex(expected['date']))
+
+
+def test_last_row_wins_within_one_upload_and_bad_dates_are_dropped():
+    dataset = MergedDataset(daily('2025-01-01', 3, 0.0))
+    upload = pd.DataFrame({'date': ['2025-01-02', '2025-01-02', 'not a date'], 'satisfaction_score': [1.0, 2.0, 3.0]})
+    dataset.upsert(upload)
+    assert dataset.frame['satisfaction_score'].tolist() == [0.0, 2.0, 0.0]
+
+
+def test_version_changes_only_on_real_updates():
+    dataset = MergedDataset(daily('2025-01-01', 3, 0.0))
+    version = dataset.version
+    assert not dataset.upsert(pd.DataFrame({'date': [], 'satisfaction_score': []}))
+    assert dataset.version == version
+    dataset.upsert(daily('2025-01-02', 1, 5.0))
+    assert dataset.version != version
+
+
+def test_date_slice_matches_mask():
+    frame = daily('2025-01-01 06:00', 24 * 40, 1.0, freq='h')
+    dataset = MergedDataset(frame)
+    got = dataset.date_slice('2025-01-05', '2025-01-09')
+    dates = frame['date']
+    expected = frame[(dates >= '2025-01-05') & (dates < '2025-01-10')]
+    assert got['date'].tolist() == expected['date'].tolist()
+    assert dataset.date_slice('2025-03-01', '2025-03-02').empty
+
+
+def test_fork_and_reset_leave_the_original_untouched():
+    base = daily('2025-01-01', 10, 0.0)
+    dataset = MergedDataset(base)
+    fork = dataset.fork()
+    fork.upsert(daily('2025-01-05', 10, 1.0))
+    assert len(dataset) == 10 and dataset.frame['satisfaction_score'].eq(0.0).all()
+    assert len(fork) == 14
+    fork.reset()
+    pd.testing.assert_frame_equal(fork.frame, dataset.frame)
+
+
+def test_keyed_upsert_matches_reference():
+    base = generate_daily_data('2025-01-01', '2025-03-31', stores=20, channels=True, seed=1)
+    replaced = base.sample(500, random_state=0).assign(satisfaction_score=-1.0)
+    new_store = generate_daily_data('2025-02-01', '2025-04-10', stores=['Store 999', 'Store 001'], channels=True,
+                                    seed=3)
+    dataset = MergedDataset(base, key_cols=DIMENSION_COLUMNS)
+    dataset.upsert(replaced)
+    dataset.upsert(new_store)
+
+    keys = ['date', 'store', 'channel']
+    expected = reference_merge(base, [replaced, new_store], keys)
+    got = dataset.frame.sort_values(keys).reset_index(drop=True)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    # The primary keys stay sorted by date so date slices keep working
+    assert np.all(np.diff(dataset.keys) >= 0)
+
+
+def test_keyed_dataset_keeps_intraday_rows():
+    dataset = MergedDataset(daily('2025-01-01', 5, 1.0), key_cols=DIMENSION_COLUMNS)
+    hourly = daily('2025-01-06', 24 * 10, np.arange(240.0), freq='h')
+    dataset.upsert(hourly)
+    assert len(dataset) == 5 + 240
+
+    two = pd.DataFrame({'date': pd.to_datetime(['2025-01-02 09:00', '2025-01-02 15:00']),
+                        'satisfaction_score': [5.0, 6.0]})
+    dataset.upsert(two)
+    day = dataset.date_slice('2025-01-02', '2025-01-02')
+    assert day['satisfaction_score'].tolist() == [1.0, 5.0, 6.0]
+
+
+def test_dimension_less_rows_are_rejected_by_store_level_data():
+    stores = generate_daily_data('2025-01-01', '2025-01-10', stores=3, seed=1)
+    dataset = MergedDataset(stores, key_cols=DIMENSION_COLUMNS)
+    version = dataset.version
+    with pytest.raises(ValueError):
+        dataset.upsert(daily('2025-01-05', 2, 0.0))
+    partial = stores.head(4).copy()
+    partial.loc[partial.index[1], 'store'] = None
+    with pytest.raises(ValueError):
+        dataset.upsert(partial)
+    assert dataset.version == version and len(dataset) == len(stores)
+
+
+def test_store_rows_replace_dimension_less_rows_of_their_days():
+    dataset = MergedDataset(daily('2025-01-01', 5, 1.0), key_cols=DIMENSION_COLUMNS)
+    dataset.upsert(generate_daily_data('2025-01-02', '2025-01-03', stores=3, seed=2))
+    frame = dataset.frame
+    assert frame['store'].isna().tolist() == [True] + [False] * 6 + [True, True]
+    assert frame.loc[frame['store'].isna(), 'date'].dt.day.tolist() == [1, 4, 5]
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.metric_matrix import DailyMetricMatrix
+
+METRICS = ['satisfaction_score', 'site_design']
+
+
+def frame(start, days, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'date': pd.date_range(start, periods=days),
+        'satisfaction_score': 8.5 + rng.normal(0, 0.3, days),
+        'site_design': 8.8 + rng.normal(0, 0.3, days),
+    })
+    df.loc[df.index[::4], 'site_design'] = np.nan
+    return df
+
+
+def reference(df):
+    """Daily means per metric on a gap-free date axis, as pandas computes them"""
+    means = df.groupby(df['date'].dt.floor('D'))[METRICS].mean()
+    return means.reindex(pd.date_range(means.index.min(), means.index.max()))
+
+
+def test_rows_sharing_a_day_are_averaged():
+    df = frame('2025-03-01', 30)
+    # A second batch of readings on the same days, with a few timestamps inside the day
+    extra = frame('2025-03-01', 30, seed=1)
+    extra['date'] += pd.Timedelta(hours=13)
+    both = pd.concat([df, extra.iloc[::2]], ignore_index=True).sample(frac=1, random_state=0)
+
+    matrix = DailyMetricMatrix.from_frame(both, METRICS + ['not_a_column'])
+    expected = reference(both)
+    assert len(matrix) == len(expected) and matrix.dates.tolist() == expected.index.date.tolist()
+    np.testing.assert_allclose(matrix.values[:, :2], expected.to_numpy(), rtol=1e-6)
+    assert np.isnan(matrix.column('not_a_column')).all()
+
+
+def test_fill_grows_the_axis_and_keeps_existing_days():
+    matrix = DailyMetricMatrix.from_frame(frame('2025-03-10', 10), METRICS)
+    later = frame('2025-04-01', 5, seed=2)
+    earlier = frame('2025-03-01', 5, seed=3)
+    assert matrix.fill(later) == 5 and matrix.fill(earlier) == 5
+
+    # Missing values in a new batch leave the stored ones alone
+    gaps = frame('2025-03-10', 3, seed=4)
+    gaps['satisfaction_score'] = np.nan
+    matrix.fill(gaps)
+
+    combined = pd.concat([frame('2025-03-10', 10), later, earlier])
+    expected = reference(combined)
+    # ...while the values it does have replace them
+    new_design = gaps.set_index('date')['site_design']
+    expected.loc[new_design.index, 'site_design'] = new_design.combine_first(expected['site_design'])
+    assert matrix.dates[0] == np.datetime64('2025-03-01') and len(matrix) == len(expected)
+    np.testing.assert_allclose(matrix.values, expected.to_numpy(), rtol=1e-6)
+
+
+def test_per_day_counts_and_lookup():
+    df = frame('2025-03-01', 20)
+    matrix = DailyMetricMatrix.from_frame(df, METRICS)
+    targets = {'satisfaction_score': 8.5}
+    below = matrix.below_target_counts(targets)
+    expected = (df['satisfaction_score'].astype(np.float32) < 8.5).astype(int) + (df['site_design'].astype(np.float32) < 9.0).astype(int)
+    assert below.tolist() == expected.tolist()
+    assert matrix.tracked_counts().tolist() == df[METRICS].notna().sum(axis=1).tolist()
+
+    dates = np.array(['2025-02-28', '2025-03-05', '2025-04-30'], dtype='datetime64[D]')
+    assert matrix.lookup(dates, below).tolist() == [-1, below[4], -1]
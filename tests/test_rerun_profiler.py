@@ -0,0 +1,32 @@
+import time
+
+import numpy as np
+import pytest
+
+from rerun_profiler import RerunProfiler
+
+
+def test_sections_accumulate_and_disabled_profiler_records_nothing():
+    profiler = RerunProfiler(measure_memory=False)
+    for name in ('load', 'render', 'load'):
+        profiler.section(name)
+        time.sleep(0.01)
+    profiler.record_chart('timeline', 1000)
+    record = profiler.finish(view='daily')
+    assert set(record['sections']) == {'load', 'render'} and record['sections']['load'] >= 0.02
+    assert record['chart_bytes'] == 1000 and record['view'] == 'daily' and record['peak_rss_bytes'] is None
+    assert RerunProfiler(enabled=False).finish() is None
+
+
+def test_peak_keeps_memory_freed_before_the_rerun_ends():
+    profiler = RerunProfiler()
+    if profiler.finish()['rss_bytes'] is None:
+        pytest.skip('RSS is not available on this platform')
+    profiler = RerunProfiler()
+    profiler.section('build')
+    spike = np.ones(64 * 1024 * 1024 // 8)  # 64 MB, every page touched
+    profiler.section('render')
+    del spike
+    record = profiler.finish()
+    assert record['peak_rss_delta_bytes'] >= 48 * 1024 * 1024
+    assert record['peak_rss_bytes'] - record['rss_bytes'] >= 48 * 1024 * 1024
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.risk_engine import RiskEngine, least_squares_slope, risk_levels
+
+METRICS = ['satisfaction_score', 'checkout_process']
+
+
+def daily():
+    df = generate_daily_data('2025-01-01', '2025-08-31', metrics=METRICS, seed=11)
+    df.loc[df.index[::9], 'checkout_process'] = np.nan
+    return df
+
+
+def test_period_means_match_groupby():
+    df = daily()
+    segments = np.where(df['date'].dt.dayofweek >= 5, 'Weekend', 'Weekday')
+    engine = RiskEngine(df, METRICS, segments=segments)
+    month = df['date'].dt.to_period('M').dt.start_time
+
+    for segment, rows in [('All', df), ('Weekend', df[segments == 'Weekend'])]:
+        grouped = rows.groupby(month[rows.index])
+        for metric in METRICS:
+            frame = engine.metric_frame(metric, segment)
+            expected = grouped[metric]
+            np.testing.assert_allclose(frame['Score'], expected.mean().to_numpy())
+            np.testing.assert_allclose(frame['Volatility'], expected.std(ddof=0).to_numpy(), atol=1e-9)
+            assert frame['count'].tolist() == expected.count().tolist()
+
+
+def test_trend_slope_matches_polyfit():
+    df = daily()
+    engine = RiskEngine(df, METRICS, trend_window=3)
+    frame = engine.metric_frame('satisfaction_score')
+    for end in range(2, len(frame)):
+        window = frame['Score'].iloc[end - 2:end + 1]
+        expected = np.polyfit(np.arange(3), window, 1)[0]
+        assert np.isclose(frame['Trend_Slope'].iloc[end], expected)
+
+    overall = least_squares_slope(np.array([[[1.0], [np.nan], [3.0], [4.0]]]))[0, 0]
+    assert np.isclose(overall, np.polyfit([0, 2, 3], [1.0, 3.0, 4.0], 1)[0])
+
+
+def test_risk_levels_and_missing_segments():
+    assert risk_levels([0.1, 0.3, 0.6, np.nan], 0.2, 0.5).tolist() == ['Low Risk', 'Medium Risk', 'High Risk', 'Low Risk']
+    df = daily()
+    segments = pd.Series('Weekday', index=df.index)
+    engine = RiskEngine(df, METRICS, segments=segments)
+    assert engine.has_data('satisfaction_score', 'Weekday')
+    assert not engine.has_data('satisfaction_score', 'Weekend')
+    assert not engine.has_data('unknown_metric')
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from cf_analytics.rolling_stats import RollingStats, ewma
+
+
+def series(days=400, seed=4):
+    rng = np.random.default_rng(seed)
+    values = 8.5 + rng.normal(0, 0.3, days)
+    values[rng.random(days) < 0.1] = np.nan
+    values[50:60] = np.nan
+    return values
+
+
+def test_windows_match_pandas_rolling():
+    values = series()
+    stats = RollingStats()
+    stats.sync(np.datetime64('2024-01-01'), values)
+    reference = pd.Series(values)
+    for window in (7, 30):
+        rolling = reference.rolling(window, min_periods=window // 2)
+        np.testing.assert_allclose(stats.mean(window), rolling.mean(), atol=1e-9)
+        np.testing.assert_allclose(stats.std(window), rolling.std(), atol=1e-9)
+
+
+def test_ewma_matches_pandas_across_blocks_and_gaps():
+    values = series()
+    expected = pd.Series(values).ewm(span=14, adjust=False, ignore_na=True).mean()
+    np.testing.assert_allclose(ewma(values, 14), expected, atol=1e-9)
+
+
+def test_appends_and_history_changes_match_a_full_rebuild():
+    values = series()
+    stats = RollingStats()
+    start = np.datetime64('2024-01-01')
+    stats.sync(start, values[:300])
+    stats.append(values[300:])
+    changed = values.copy()
+    changed[350] = 6.0
+    stats.days_recomputed = 0
+    assert stats.sync(start, changed) == 350 and stats.days_recomputed == 50
+
+    rebuilt = RollingStats()
+    rebuilt.sync(start, changed)
+    np.testing.assert_allclose(stats.mean(30), rebuilt.mean(30))
+    np.testing.assert_allclose(stats.std(7), rebuilt.std(7))
+    np.testing.assert_allclose(stats.ewma(), rebuilt.ewma())
+
+    positions = stats.positions(np.array(['2024-01-31', '2024-06-01'], dtype='datetime64[D]'))
+    np.testing.assert_allclose(stats.mean(7, positions), rebuilt.mean(7)[positions])
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cf_analytics.data_generator import generate_daily_data
+from cf_analytics.rollup_cube import RollupCube
+
+METRICS = ['satisfaction_score', 'site_design']
+FREQUENCIES = {'day': 'D', 'month': 'M', 'quarter': 'Q'}
+
+
+def daily():
+    df = generate_daily_data('2024-11-01', '2025-07-15', metrics=METRICS, seed=3)
+    df.loc[df.index[::5], 'site_design'] = np.nan
+    # Shuffled rows: the cube sorts by date itself
+    return df.sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('granularity', ['day', 'week', 'month', 'quarter'])
+def test_frames_match_groupby(granularity):
+    df = daily()
+    cube = RollupCube(df, METRICS, targets={'satisfaction_score': 8.2})
+    if granularity == 'week':  # weeks start on Monday
+        period = df['date'] - pd.to_timedelta(df['date'].dt.dayofweek, unit='D')
+    else:
+        period = df['date'].dt.to_period(FREQUENCIES[granularity]).dt.start_time
+
+    for metric, target in [('satisfaction_score', 8.2), ('site_design', 9.0)]:
+        frame = cube.frame(granularity, metric)
+        grouped = df.groupby(period)[metric]
+        expected = grouped.agg(['count', 'mean', 'min', 'max']).query('count > 0')
+        assert frame['period_start'].tolist() == expected.index.tolist()
+        assert frame['count'].tolist() == expected['count'].tolist()
+        np.testing.assert_allclose(frame['mean'], expected['mean'])
+        np.testing.assert_allclose(frame['std'], grouped.std(ddof=0).loc[expected.index], atol=1e-9)
+        np.testing.assert_allclose(frame['min'], expected['min'])
+        np.testing.assert_allclose(frame['max'], expected['max'])
+        below = df[metric].lt(target).groupby(period).sum().loc[expected.index]
+        assert frame['days_below_target'].tolist() == below.tolist()
+
+
+def test_means_cover_every_metric_and_skip_unknown_ones():
+    df = daily()
+    cube = RollupCube(df, METRICS + ['not_a_column'])
+    assert cube.metrics == METRICS and not cube.has_metric('not_a_column')
+    means = cube.means('month')
+    expected = df.groupby(df['date'].dt.to_period('M').dt.start_time)[METRICS].mean()
+    np.testing.assert_allclose(means.to_numpy(), expected.to_numpy())